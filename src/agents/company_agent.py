@@ -2,16 +2,16 @@
 Company Research Agent - AI-powered company analysis
 Uses LangChain's DeepAgent for pre-interview company research
 """
-import json
-import os
 from typing import Dict, List, Optional
 
 from deepagents import create_deep_agent
-from langchain_groq import ChatGroq
 
 from src.automators.base import BaseAgent
 from src.core.console import console
-from src.core.config import settings
+from src.core.llm_provider import LLMProvider, get_llm
+from src.core.structured_output import parse_or_repair
+from src.core.llm_clients import get_pooled_chat_model
+from src.core.model_routing import model_router
 
 
 # ============================================
@@ -34,13 +34,7 @@ def search_company_info(
     """
     console.step(1, 4, f"Researching {company}")
     
-    api_key = settings.groq_api_key_fallback.get_secret_value() if settings.groq_api_key_fallback else settings.groq_api_key.get_secret_value()
-    
-    llm = ChatGroq(
-        model="llama-3.1-8b-instant",
-        temperature=0.3,
-        api_key=api_key
-    )
+    llm = get_llm(temperature=0.3, task="extraction")
     
     prompt = f"""
     Provide a company research summary for {company}.
@@ -77,13 +71,9 @@ def search_company_info(
         result = llm.invoke([
             SystemMessage(content="You are a company research expert. Provide accurate, helpful information. Output only valid JSON."),
             HumanMessage(content=prompt)
-        ])
-        
-        content = result.content.strip()
-        if "```" in content:
-            content = content.split("```")[1].replace("json", "").strip()
+        ], caller="company")
         
-        parsed = json.loads(content)
+        parsed = parse_or_repair(llm, result, caller="company")
         console.success(f"Found info for {company}")
         return parsed
         
@@ -108,13 +98,7 @@ def analyze_company_culture(
     """
     console.step(2, 4, "Analyzing company culture")
     
-    api_key = settings.groq_api_key_fallback.get_secret_value() if settings.groq_api_key_fallback else settings.groq_api_key.get_secret_value()
-    
-    llm = ChatGroq(
-        model="llama-3.1-8b-instant",
-        temperature=0.4,
-        api_key=api_key
-    )
+    llm = get_llm(temperature=0.4, task="classification")
     
     prompt = f"""
     Analyze the work culture at {company} for someone interviewing for {role or 'a tech role'}.
@@ -160,13 +144,9 @@ def analyze_company_culture(
         result = llm.invoke([
             SystemMessage(content="You are an HR and culture analyst. Be balanced and realistic. Output only valid JSON."),
             HumanMessage(content=prompt)
-        ])
+        ], caller="company")
         
-        content = result.content.strip()
-        if "```" in content:
-            content = content.split("```")[1].replace("json", "").strip()
-        
-        parsed = json.loads(content)
+        parsed = parse_or_repair(llm, result, caller="company")
         console.success(f"Culture analysis complete")
         return parsed
         
@@ -191,13 +171,7 @@ def identify_red_flags(
     """
     console.step(3, 4, "Checking for red flags")
     
-    api_key = settings.groq_api_key_fallback.get_secret_value() if settings.groq_api_key_fallback else settings.groq_api_key.get_secret_value()
-    
-    llm = ChatGroq(
-        model="llama-3.1-8b-instant",
-        temperature=0.3,
-        api_key=api_key
-    )
+    llm = get_llm(temperature=0.3, task="classification")
     
     jd_context = f"\n\nJob Description:\n{job_description[:1500]}" if job_description else ""
     
@@ -243,13 +217,9 @@ def identify_red_flags(
         result = llm.invoke([
             SystemMessage(content="You are a career counselor helping candidates avoid bad job situations. Be thorough but fair. Output only valid JSON."),
             HumanMessage(content=prompt)
-        ])
-        
-        content = result.content.strip()
-        if "```" in content:
-            content = content.split("```")[1].replace("json", "").strip()
+        ], caller="company")
         
-        parsed = json.loads(content)
+        parsed = parse_or_repair(llm, result, caller="company")
         
         risk = parsed.get("overall_risk_level", "unknown")
         if risk == "low":
@@ -282,13 +252,7 @@ def get_interview_insights(
     """
     console.step(4, 4, "Getting interview insights")
     
-    api_key = settings.groq_api_key_fallback.get_secret_value() if settings.groq_api_key_fallback else settings.groq_api_key.get_secret_value()
-    
-    llm = ChatGroq(
-        model="llama-3.1-8b-instant",
-        temperature=0.5,
-        api_key=api_key
-    )
+    llm = get_llm(temperature=0.5, task="extraction")
     
     prompt = f"""
     Provide interview insights for {role} at {company}.
@@ -340,13 +304,9 @@ def get_interview_insights(
         result = llm.invoke([
             SystemMessage(content="You are an interview coach with knowledge of tech company hiring. Output only valid JSON."),
             HumanMessage(content=prompt)
-        ])
-        
-        content = result.content.strip()
-        if "```" in content:
-            content = content.split("```")[1].replace("json", "").strip()
+        ], caller="company")
         
-        parsed = json.loads(content)
+        parsed = parse_or_repair(llm, result, caller="company")
         console.success("Interview insights ready")
         return parsed
         
@@ -402,17 +362,11 @@ class CompanyAgent(BaseAgent):
     def __init__(self):
         super().__init__()
         
-        if settings.groq_api_key_fallback:
-            api_key = settings.groq_api_key_fallback.get_secret_value()
-        else:
-            api_key = settings.groq_api_key.get_secret_value()
-        
-        os.environ["GROQ_API_KEY"] = api_key
-        
-        llm = ChatGroq(
-            model="llama-3.1-8b-instant",
-            temperature=0.4,
-            api_key=api_key
+        # Calls are spread over every Groq key in the pool
+        llm = get_pooled_chat_model(
+            LLMProvider.GROQ,
+            model=model_router.model("orchestration", LLMProvider.GROQ, "llama-3.1-8b-instant"),
+            temperature=0.4
         )
         
         self.agent = create_deep_agent(
@@ -2,11 +2,9 @@
 Cover Letter Agent - Deep Agent with LangGraph for personalized cover letters
 Uses planning, multi-step generation, and Human-in-the-Loop verification
 """
-import json
+import re
 from typing import Dict, Optional, TypedDict, Literal
 
-from langchain_groq import ChatGroq
-from langchain_core.messages import SystemMessage, HumanMessage
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 
@@ -14,6 +12,9 @@ from src.automators.base import BaseAgent
 from src.models.profile import UserProfile
 from src.models.job import JobAnalysis
 from src.core.console import console
+from src.core.llm_provider import UnifiedLLM
+from src.core.structured_output import aparse_or_repair
+from src.core.prompts import COVER_LETTER_CULTURE, COVER_LETTER_CONTENT
 
 
 # ============================================
@@ -66,11 +67,14 @@ class CoverLetterAgent(BaseAgent):
     
     def __init__(self):
         super().__init__()
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
+        self.llm = UnifiedLLM(
             temperature=0.6,  # Higher for creative writing
-            api_key=self.settings.groq_api_key.get_secret_value()
+            task="creative_writing",
+            caller="cover_letter"
         )
+        # The culture guess is a short classification - small model. The user
+        # is waiting on this letter and the call is not streamed, so hedge it
+        self.fast_llm = UnifiedLLM(temperature=0.3, task="classification", caller="cover_letter", hedge=True)
         self.memory = MemorySaver()
         self.graph = self._build_graph()
     
@@ -139,35 +143,16 @@ class CoverLetterAgent(BaseAgent):
         company = job.get("company", "the company")
         
         # Use LLM to infer company characteristics
-        prompt = f"""
-        Based on this job posting, infer the company culture:
-        
-        Company: {company}
-        Role: {job.get('role', '')}
-        Tech Stack: {', '.join(job.get('tech_stack', []))}
-        
-        Return JSON:
-        {{
-            "culture_type": "startup/corporate/tech-forward/traditional",
-            "values": ["likely company values"],
-            "communication_style": "formal/casual/technical",
-            "unique_aspects": ["what makes them stand out"]
-        }}
-        
-        Output ONLY valid JSON.
-        """
+        messages = COVER_LETTER_CULTURE.messages({
+            "company": company,
+            "role": job.get('role', ''),
+            "tech_stack": ', '.join(job.get('tech_stack', [])),
+        })
         
         try:
-            result = self.llm.invoke([
-                SystemMessage(content="You analyze company culture from job postings."),
-                HumanMessage(content=prompt)
-            ])
-            
-            content = result.content.strip()
-            if "```" in content:
-                content = content.split("```")[1].replace("json", "").strip()
+            result = await self.fast_llm.ainvoke(messages)
             
-            research = json.loads(content)
+            research = await aparse_or_repair(self.fast_llm, result)
             console.info(f"Culture: {research.get('culture_type', 'unknown')}")
             
             return {**state, "company_research": research, "current_step": 1}
@@ -195,57 +180,38 @@ class CoverLetterAgent(BaseAgent):
         
         feedback_instruction = ""
         if feedback:
-            feedback_instruction = f"\n\nADDRESS THIS FEEDBACK:\n{feedback}\n"
-        
-        prompt = f"""
-        Write a compelling cover letter for this job.
-        
-        JOB:
-        - Position: {job.get('role', '')}
-        - Company: {job.get('company', '')}
-        - Tech Stack: {', '.join(job.get('tech_stack', []))}
-        
-        COMPANY CULTURE:
-        - Type: {research.get('culture_type', 'professional')}
-        - Values: {', '.join(research.get('values', []))}
-        
-        CANDIDATE:
-        - Name: {personal.get('full_name', '')}
-        - Current Role: {recent_exp.get('title', '')}
-        - Key Skills: {', '.join(list(skills.get('technical', skills.get('primary', [])))[:5])}
-        
-        MATCHING SKILLS: {', '.join(job.get('matching_skills', []))}
-        
-        TONE: {tone_instruction}
-        {feedback_instruction}
-        Generate a cover letter with:
-        1. Opening: Hook + genuine interest in THIS specific company/role
-        2. Body: 2-3 specific achievements that match job requirements
-        3. Closing: Enthusiasm + clear call to action
-        
-        Return JSON:
-        {{
-            "greeting": "Dear Hiring Manager," or personalized,
-            "opening": "Opening paragraph (2-3 compelling sentences)...",
-            "body": "Body paragraph (3-4 sentences with specific examples)...",
-            "closing": "Closing paragraph (2 sentences with call to action)...",
-            "signature": "Sincerely,\\n\\n[Name]"
-        }}
-        
-        Output ONLY valid JSON.
-        """
+            feedback_instruction = f"\nADDRESS THIS FEEDBACK:\n{feedback}"
+        
+        # Candidate block is the same for every letter; per-job details go last
+        candidate = "\n".join([
+            f"- Name: {personal.get('full_name', '')}",
+            f"- Current Role: {recent_exp.get('title', '')}",
+            f"- Key Skills: {', '.join(list(skills.get('technical', skills.get('primary', [])))[:5])}",
+        ])
+        messages = COVER_LETTER_CONTENT.messages(
+            {
+                "role": job.get('role', ''),
+                "company": job.get('company', ''),
+                "tech_stack": ', '.join(job.get('tech_stack', [])),
+                "culture_type": research.get('culture_type', 'professional'),
+                "values": ', '.join(research.get('values', [])),
+                "matching_skills": ', '.join(job.get('matching_skills', [])),
+                "tone": tone_instruction,
+                "feedback": feedback_instruction,
+            },
+            profile=candidate
+        )
         
         try:
-            result = self.llm.invoke([
-                SystemMessage(content="You write personalized cover letters. Be authentic and compelling."),
-                HumanMessage(content=prompt)
-            ])
-            
-            content = result.content.strip()
-            if "```" in content:
-                content = content.split("```")[1].replace("json", "").strip()
+            # Stream the plain-text draft so the reviewer reads it from the first token
+            console.stream_start("Drafting...")
+            result = ""
+            async for chunk in self.llm.astream(messages):
+                console.stream_chunk(chunk)
+                result += chunk
+            console.stream_end()
             
-            parsed = json.loads(content)
+            parsed = self._split_letter(result)
             
             # Ensure name in signature
             name = personal.get("full_name", "")
@@ -272,6 +238,35 @@ class CoverLetterAgent(BaseAgent):
                 "current_step": 2
             }
     
+    @staticmethod
+    def _split_letter(text: str) -> Dict[str, str]:
+        """Split a plain-text letter into greeting/opening/body/closing/signature."""
+        paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text.strip()) if p.strip()]
+        
+        greeting = "Dear Hiring Manager,"
+        if paragraphs and len(paragraphs[0]) <= 80 and paragraphs[0].endswith((",", ":")):
+            greeting = paragraphs.pop(0)
+        
+        # Sign-off: "Sincerely,\n[Name]" or "Sincerely," and the name as separate paragraphs
+        signature = "Sincerely,\n\n[Name]"
+        if len(paragraphs) >= 2 and len(paragraphs[-2]) <= 40 and paragraphs[-2].endswith(","):
+            name = paragraphs.pop()
+            signature = f"{paragraphs.pop()}\n\n{name}"
+        elif paragraphs and len(paragraphs[-1]) <= 80 and "\n" in paragraphs[-1]:
+            closing_line, name = paragraphs.pop().split("\n", 1)
+            signature = f"{closing_line.strip()}\n\n{name.strip()}"
+        
+        if not paragraphs:
+            raise ValueError("Cover letter draft has no content")
+        
+        return {
+            "greeting": greeting,
+            "opening": paragraphs[0],
+            "body": "\n\n".join(paragraphs[1:-1]),
+            "closing": paragraphs[-1] if len(paragraphs) > 1 else "",
+            "signature": signature,
+        }
+    
     async def _format_letter_node(self, state: CoverLetterState) -> CoverLetterState:
         """Format content into full letter."""
         console.step(4, 5, "Formatting document")
@@ -323,7 +318,8 @@ class CoverLetterAgent(BaseAgent):
         
         console.box("Target", f"{job.get('role', 'Position')} at {job.get('company', 'Company')}")
         
-        # Show full letter
+        # The draft already streamed in _generate_content_node (which reruns for
+        # every revision asked for here); approval needs the complete letter
         console.divider()
         print("\n" + full_text + "\n")
         console.divider()
@@ -3,18 +3,22 @@ Interview Prep Agent - AI-powered interview preparation
 Uses LangChain's DeepAgent for personalized interview coaching
 """
 import json
-import os
+import re
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 from deepagents import create_deep_agent
-from langchain_groq import ChatGroq
 
 from src.automators.base import BaseAgent
 from src.models.profile import UserProfile
 from src.models.job import JobAnalysis
 from src.core.console import console
-from src.core.config import settings
+from src.core.llm_provider import LLMProvider, get_llm
+from src.core.structured_output import parse_or_repair
+from src.core.hedging import hedged_requests, hedging_requested
+from src.core.llm_metrics import llm_metrics
+from src.core.llm_clients import get_pooled_chat_model
+from src.core.model_routing import model_router
 
 
 # ============================================
@@ -280,6 +284,74 @@ def get_interview_resources(
     return resources
 
 
+def _stream_to_console(llm, messages: list, caller: str = "interview") -> str:
+    """
+    Generate with the LLM, echoing text as it streams in. Returns the full response.
+    
+    Only for plain-text prompts - JSON output is generated silently and
+    rendered once parsed. Inside hedged_requests() (quick prep) a hedged
+    invoke is used instead, since streams cannot be hedged.
+    """
+    if hedging_requested():
+        return llm.invoke(messages, caller=caller)
+    
+    console.stream_start()
+    result = ""
+    for chunk in llm.stream(messages, caller=caller):
+        console.stream_chunk(chunk)
+        result += chunk
+    console.stream_end()
+    return result
+
+
+def _show_questions(questions: List[Dict]):
+    """Print the generated questions once they are parsed."""
+    for i, q in enumerate(questions, 1):
+        console.info(f"{i}. {q.get('question', '')}")
+
+
+# Section headings of the plain-text STAR answer, and the keys they map to
+STAR_SECTIONS = {
+    "SITUATION": "situation",
+    "TASK": "task",
+    "ACTION": "action",
+    "RESULT": "result",
+    "FULL ANSWER": "full_answer",
+    "KEY POINTS": "key_points_to_emphasize",
+    "FOLLOW-UPS": "potential_follow_ups",
+    "TIPS": "tips",
+}
+_STAR_HEADING = re.compile(
+    r"^[ \t*#]*(" + "|".join(STAR_SECTIONS) + r")[ \t*]*:[ \t*]*",
+    re.MULTILINE | re.IGNORECASE
+)
+
+
+def _split_star(text: str, question: str) -> Dict:
+    """Split a plain-text STAR answer into the structured response."""
+    parts = _STAR_HEADING.split(text)
+    sections = {
+        STAR_SECTIONS[heading.upper()]: body.strip()
+        for heading, body in zip(parts[1::2], parts[2::2])
+    }
+    if not sections:
+        raise ValueError("STAR response has no recognisable sections")
+    
+    def bullets(key: str) -> List[str]:
+        lines = (line.strip().lstrip("-*•").strip() for line in sections.get(key, "").splitlines())
+        return [line for line in lines if line]
+    
+    star = {key: sections.get(key, "") for key in ("situation", "task", "action", "result")}
+    return {
+        "question": question,
+        "star_response": star,
+        "full_answer": sections.get("full_answer") or "\n\n".join(v for v in star.values() if v),
+        "key_points_to_emphasize": bullets("key_points_to_emphasize"),
+        "potential_follow_ups": bullets("potential_follow_ups"),
+        "tips": bullets("tips"),
+    }
+
+
 def generate_behavioral_questions(
     role: str,
     company: str,
@@ -301,13 +373,7 @@ def generate_behavioral_questions(
     console.step(2, 5, "Generating behavioral questions")
     
     # Use Groq LLM for generation
-    api_key = settings.groq_api_key_fallback.get_secret_value() if settings.groq_api_key_fallback else settings.groq_api_key.get_secret_value()
-    
-    llm = ChatGroq(
-        model="llama-3.1-8b-instant",
-        temperature=0.7,
-        api_key=api_key
-    )
+    llm = get_llm(temperature=0.7, task="drafting")
     
     seniority = "senior/leadership" if is_senior else "individual contributor"
     focus = ", ".join(focus_areas) if focus_areas else "general professional skills"
@@ -348,14 +414,10 @@ def generate_behavioral_questions(
         result = llm.invoke([
             SystemMessage(content="You are an expert interview coach. Output only valid JSON."),
             HumanMessage(content=prompt)
-        ])
+        ], caller="interview")
         
-        content = result.content.strip()
-        if "```" in content:
-            content = content.split("```")[1].replace("json", "").strip()
-        
-        # Validate JSON
-        parsed = json.loads(content)
+        parsed = parse_or_repair(llm, result, caller="interview")
+        _show_questions(parsed.get("questions", []))
         console.success(f"Generated {len(parsed.get('questions', []))} behavioral questions")
         return json.dumps(parsed)
         
@@ -382,13 +444,7 @@ def generate_technical_questions(
     """
     console.step(3, 5, "Generating technical questions")
     
-    api_key = settings.groq_api_key_fallback.get_secret_value() if settings.groq_api_key_fallback else settings.groq_api_key.get_secret_value()
-    
-    llm = ChatGroq(
-        model="llama-3.1-8b-instant",
-        temperature=0.5,
-        api_key=api_key
-    )
+    llm = get_llm(temperature=0.5, task="drafting")
     
     tech_list = ", ".join(tech_stack[:6])
     
@@ -426,13 +482,10 @@ def generate_technical_questions(
         result = llm.invoke([
             SystemMessage(content="You are a senior technical interviewer. Output only valid JSON."),
             HumanMessage(content=prompt)
-        ])
+        ], caller="interview")
         
-        content = result.content.strip()
-        if "```" in content:
-            content = content.split("```")[1].replace("json", "").strip()
-        
-        parsed = json.loads(content)
+        parsed = parse_or_repair(llm, result, caller="interview")
+        _show_questions(parsed.get("technical_questions", []))
         console.success(f"Generated {len(parsed.get('technical_questions', []))} technical questions")
         return json.dumps(parsed)
         
@@ -464,13 +517,7 @@ def create_star_response(
     except json.JSONDecodeError:
         return json.dumps({"error": "Invalid profile JSON"})
     
-    api_key = settings.groq_api_key_fallback.get_secret_value() if settings.groq_api_key_fallback else settings.groq_api_key.get_secret_value()
-    
-    llm = ChatGroq(
-        model="llama-3.1-8b-instant",
-        temperature=0.6,
-        api_key=api_key
-    )
+    llm = get_llm(temperature=0.6, task="drafting")
     
     # Extract relevant experience
     experience = profile.get("experience", [])
@@ -495,35 +542,36 @@ def create_star_response(
     3. Quantifies impact where possible
     4. Is 1-2 minutes when spoken
     
-    Return ONLY valid JSON:
-    {{
-        "question": "the question",
-        "star_response": {{
-            "situation": "Specific context from their experience",
-            "task": "Their responsibility",
-            "action": "Specific steps they took",
-            "result": "Measurable outcome"
-        }},
-        "full_answer": "Complete spoken answer (2-3 paragraphs)",
-        "key_points_to_emphasize": ["point1", "point2"],
-        "potential_follow_ups": ["follow up 1", "follow up 2"],
-        "tips": ["delivery tip 1"]
-    }}
+    Write it as plain text (no JSON, no markdown), using exactly these section headings:
+    
+    SITUATION: Specific context from their experience
+    TASK: Their responsibility
+    ACTION: Specific steps they took
+    RESULT: Measurable outcome
+    
+    FULL ANSWER:
+    Complete spoken answer (2-3 paragraphs)
+    
+    KEY POINTS:
+    - point to emphasize
+    
+    FOLLOW-UPS:
+    - likely follow-up question
+    
+    TIPS:
+    - delivery tip
     """
     
     try:
         from langchain_core.messages import SystemMessage, HumanMessage
         
-        result = llm.invoke([
-            SystemMessage(content="You are an expert interview coach. Create compelling, authentic answers. Output only valid JSON."),
+        # Plain text reads well as it streams; it is split into sections afterwards
+        result = _stream_to_console(llm, [
+            SystemMessage(content="You are an expert interview coach. Create compelling, authentic answers."),
             HumanMessage(content=prompt)
         ])
         
-        content = result.content.strip()
-        if "```" in content:
-            content = content.split("```")[1].replace("json", "").strip()
-        
-        parsed = json.loads(content)
+        parsed = _split_star(result, question)
         console.success("Created personalized STAR response")
         return json.dumps(parsed)
         
@@ -681,18 +729,11 @@ class InterviewAgent(BaseAgent):
     def __init__(self):
         super().__init__()
         
-        # Use fallback key if available
-        if settings.groq_api_key_fallback:
-            api_key = settings.groq_api_key_fallback.get_secret_value()
-        else:
-            api_key = settings.groq_api_key.get_secret_value()
-        
-        os.environ["GROQ_API_KEY"] = api_key
-        
-        llm = ChatGroq(
-            model="llama-3.1-8b-instant",
-            temperature=0.5,
-            api_key=api_key
+        # Calls are spread over every Groq key in the pool
+        llm = get_pooled_chat_model(
+            LLMProvider.GROQ,
+            model=model_router.model("orchestration", LLMProvider.GROQ, "llama-3.1-8b-instant"),
+            temperature=0.5
         )
         
         self.agent = create_deep_agent(
@@ -767,9 +808,10 @@ class InterviewAgent(BaseAgent):
         """
         
         try:
-            result = self.agent.invoke({
-                "messages": [{"role": "user", "content": task_message}]
-            })
+            result = self.agent.invoke(
+                {"messages": [{"role": "user", "content": task_message}]},
+                config={"callbacks": [llm_metrics.callback("interview")]}
+            )
             
             final_message = result.get("messages", [{}])[-1]
             
@@ -795,33 +837,35 @@ class InterviewAgent(BaseAgent):
         """Quick preparation without full profile - generates generic questions and resources."""
         console.subheader("🎯 Quick Interview Prep")
         
-        # Analyze requirements
-        analysis = analyze_job_requirements(role, company, tech_stack)
-        
-        # Get interview resources
-        resources = get_interview_resources(
-            role, tech_stack,
-            include_system_design=analysis.get("is_senior_role", False)
-        )
-        
-        # Generate questions
-        behavioral = generate_behavioral_questions(
-            role, company, 
-            analysis.get("is_senior_role", False),
-            analysis.get("soft_skills_focus", [])
-        )
-        
-        technical = generate_technical_questions(
-            role, tech_stack, "medium"
-        )
-        
-        return {
-            "success": True,
-            "analysis": analysis,
-            "resources": resources,
-            "behavioral_questions": json.loads(behavioral),
-            "technical_questions": json.loads(technical)
-        }
+        # A user is waiting on the terminal, so hedge slow LLM calls
+        with hedged_requests():
+            # Analyze requirements
+            analysis = analyze_job_requirements(role, company, tech_stack)
+            
+            # Get interview resources
+            resources = get_interview_resources(
+                role, tech_stack,
+                include_system_design=analysis.get("is_senior_role", False)
+            )
+            
+            # Generate questions
+            behavioral = generate_behavioral_questions(
+                role, company, 
+                analysis.get("is_senior_role", False),
+                analysis.get("soft_skills_focus", [])
+            )
+            
+            technical = generate_technical_questions(
+                role, tech_stack, "medium"
+            )
+            
+            return {
+                "success": True,
+                "analysis": analysis,
+                "resources": resources,
+                "behavioral_questions": json.loads(behavioral),
+                "technical_questions": json.loads(technical)
+            }
 
 
 # Singleton instance
@@ -4,19 +4,22 @@ Uses LangChain's DeepAgent with planning, file system tools, and subagents
 https://docs.langchain.com/oss/python/deepagents/
 """
 import json
-import os
 from typing import Dict, Optional, List
 from pydantic import BaseModel, Field
 
 from deepagents import create_deep_agent
-from langchain_groq import ChatGroq
 
 from src.automators.base import BaseAgent
 from src.models.profile import UserProfile
 from src.models.job import JobAnalysis
 from src.services.resume_service import resume_service
 from src.core.console import console
-from src.core.config import settings
+from src.core.llm_provider import LLMProvider, get_llm
+from src.core.structured_output import parse_or_repair
+from src.core.prompts import RESUME_TAILORING, canonical_profile
+from src.core.llm_metrics import llm_metrics
+from src.core.llm_clients import get_pooled_chat_model
+from src.core.model_routing import model_router
 
 
 # ============================================
@@ -86,100 +89,40 @@ def tailor_resume_content(
     
     feedback_instruction = ""
     if feedback:
-        feedback_instruction = f"\n\nADDRESS THIS FEEDBACK:\n{feedback}\n"
-    
-    prompt = f"""
-    Tailor this resume for the job. Make it ATS-optimized.
-    
-    JOB:
-    - Role: {requirements.get('role', '')}
-    - Company: {requirements.get('company', '')}
-    - Keywords: {', '.join(requirements.get('keywords', []))}
-    - Must Have: {', '.join(requirements.get('must_have', []))}
-    
-    PROFILE:
-    {json.dumps(profile, indent=2)[:3000]}
-    {feedback_instruction}
-    INSTRUCTIONS:
-    1. Write a compelling 2-3 sentence summary targeting this role
-    2. Rewrite experience bullets to highlight relevant achievements
-    3. Prioritize matching skills at the top
-    4. Use action verbs and quantified results
-    5. Include keywords naturally throughout
-    
-    Return ONLY valid JSON with this structure:
-    {{
-        "personal_information": {{...from profile...}},
-        "summary": "Tailored professional summary",
-        "skills": {{
-            "primary": ["most relevant skills"],
-            "secondary": ["other skills"],
-            "tools": ["relevant tools/tech"]
-        }},
-        "experience": [
-            {{
-                "company": "...",
-                "title": "...",
-                "dates": "...",
-                "location": "...",
-                "highlights": ["Tailored bullet 1", "Tailored bullet 2"]
-            }}
-        ],
-        "projects": [...],
-        "education": [...],
-        "tailoring_notes": "Key changes made for this role"
-    }}
-    """
+        feedback_instruction = f"\nADDRESS THIS FEEDBACK:\n{feedback}"
+    
+    # Static instructions, then the profile, then the job - repeat calls share a cacheable prefix
+    messages = RESUME_TAILORING.messages(
+        {
+            "role": requirements.get('role', ''),
+            "company": requirements.get('company', ''),
+            "keywords": ', '.join(requirements.get('keywords', [])),
+            "must_have": ', '.join(requirements.get('must_have', [])),
+            "feedback": feedback_instruction,
+        },
+        profile=canonical_profile(profile, limit=3000)
+    )
     
-    # Try fallback API key first (primary may be exhausted), then primary
-    api_keys = []
-    if settings.groq_api_key_fallback:
-        api_keys.append(settings.groq_api_key_fallback.get_secret_value())
-    api_keys.append(settings.groq_api_key.get_secret_value())
+    # The unified LLM handles key/provider fallback on rate limits
+    llm = get_llm(temperature=0.3, task="creative_writing")
     
-    from langchain_core.messages import SystemMessage, HumanMessage
+    try:
+        result = llm.invoke(messages, caller="resume")
+        
+        tailored = parse_or_repair(llm, result, caller="resume")
+        
+        # Preserve original data if not in response
+        if "personal_information" not in tailored:
+            tailored["personal_information"] = profile.get("personal_information", {})
+        if not tailored.get("education"):
+            tailored["education"] = profile.get("education", [])
+        
+        console.success("Content tailored successfully")
+        return json.dumps(tailored)
     
-    for i, api_key in enumerate(api_keys):
-        try:
-            llm = ChatGroq(
-                model="llama-3.1-8b-instant",
-                temperature=0.3,
-                api_key=api_key
-            )
-            
-            result = llm.invoke([
-                SystemMessage(content="You are an ATS resume expert. Output only valid JSON."),
-                HumanMessage(content=prompt)
-            ])
-            
-            content = result.content.strip()
-            if "```" in content:
-                content = content.split("```")[1].replace("json", "").strip()
-            
-            # Validate JSON
-            tailored = json.loads(content)
-            
-            # Preserve original data if not in response
-            if "personal_information" not in tailored:
-                tailored["personal_information"] = profile.get("personal_information", {})
-            if not tailored.get("education"):
-                tailored["education"] = profile.get("education", [])
-            
-            console.success("Content tailored successfully")
-            return json.dumps(tailored)
-            
-        except Exception as e:
-            error_str = str(e).lower()
-            # Check if it's a rate limit error and we have more keys to try
-            if ("rate_limit" in error_str or "rate limit" in error_str) and i < len(api_keys) - 1:
-                console.warning(f"Rate limited on API key {i+1}, trying fallback...")
-                continue
-            else:
-                console.error(f"Failed to tailor content: {e}")
-                return json.dumps({**profile, "tailoring_notes": f"Tailoring failed: {str(e)}"})
-    
-    # If all keys exhausted
-    return json.dumps({**profile, "tailoring_notes": "All API keys exhausted"})
+    except Exception as e:
+        console.error(f"Failed to tailor content: {e}")
+        return json.dumps({**profile, "tailoring_notes": f"Tailoring failed: {str(e)}"})
 
 
 def generate_latex_resume(
@@ -386,20 +329,11 @@ class ResumeAgent(BaseAgent):
     def __init__(self):
         super().__init__()
         
-        # Use fallback key if available (to avoid rate limits on primary)
-        if settings.groq_api_key_fallback:
-            api_key = settings.groq_api_key_fallback.get_secret_value()
-        else:
-            api_key = settings.groq_api_key.get_secret_value()
-        
-        # Set Groq API key as environment variable (required by deepagents)
-        os.environ["GROQ_API_KEY"] = api_key
-        
-        # Create LLM model using ChatGroq - using 8b-instant for higher rate limits
-        llm = ChatGroq(
-            model="llama-3.1-8b-instant",
-            temperature=0.3,
-            api_key=api_key
+        # Calls are spread over every Groq key in the pool - using 8b-instant for higher rate limits
+        llm = get_pooled_chat_model(
+            LLMProvider.GROQ,
+            model=model_router.model("orchestration", LLMProvider.GROQ, "llama-3.1-8b-instant"),
+            temperature=0.3
         )
         
         # Create the DeepAgent with our custom tools
@@ -476,9 +410,10 @@ class ResumeAgent(BaseAgent):
         
         try:
             # Run the DeepAgent
-            result = self.agent.invoke({
-                "messages": [{"role": "user", "content": task_message}]
-            })
+            result = self.agent.invoke(
+                {"messages": [{"role": "user", "content": task_message}]},
+                config={"callbacks": [llm_metrics.callback("resume")]}
+            )
             
             # Extract the final message
             final_message = result.get("messages", [{}])[-1]
@@ -3,17 +3,18 @@ Salary Negotiator Agent - AI-powered salary research and negotiation
 Uses LangChain's DeepAgent for market research and negotiation strategies
 """
 import json
-import os
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 from deepagents import create_deep_agent
-from langchain_groq import ChatGroq
 
 from src.automators.base import BaseAgent
 from src.models.job import JobAnalysis
 from src.core.console import console
-from src.core.config import settings
+from src.core.llm_provider import LLMProvider, get_llm
+from src.core.structured_output import parse_or_repair
+from src.core.llm_clients import get_pooled_chat_model
+from src.core.model_routing import model_router
 
 
 # ============================================
@@ -40,14 +41,8 @@ def search_market_salary(
     """
     console.step(1, 4, "Researching market salaries")
     
-    # Use Groq LLM to estimate based on knowledge
-    api_key = settings.groq_api_key_fallback.get_secret_value() if settings.groq_api_key_fallback else settings.groq_api_key.get_secret_value()
-    
-    llm = ChatGroq(
-        model="llama-3.1-8b-instant",
-        temperature=0.3,
-        api_key=api_key
-    )
+    # Use the LLM to estimate based on knowledge
+    llm = get_llm(temperature=0.3, task="extraction")
     
     prompt = f"""
     Provide salary data for this role based on current market knowledge:
@@ -90,13 +85,9 @@ def search_market_salary(
         result = llm.invoke([
             SystemMessage(content="You are a compensation analyst with access to current salary data. Be realistic and accurate. Output only valid JSON."),
             HumanMessage(content=prompt)
-        ])
-        
-        content = result.content.strip()
-        if "```" in content:
-            content = content.split("```")[1].replace("json", "").strip()
+        ], caller="salary")
         
-        parsed = json.loads(content)
+        parsed = parse_or_repair(llm, result, caller="salary")
         
         console.success(f"Market range: ${parsed['salary_range']['p25']:,} - ${parsed['salary_range']['p90']:,}")
         return parsed
@@ -217,13 +208,7 @@ def generate_negotiation_script(
     """
     console.step(3, 4, "Creating negotiation scripts")
     
-    api_key = settings.groq_api_key_fallback.get_secret_value() if settings.groq_api_key_fallback else settings.groq_api_key.get_secret_value()
-    
-    llm = ChatGroq(
-        model="llama-3.1-8b-instant",
-        temperature=0.6,
-        api_key=api_key
-    )
+    llm = get_llm(temperature=0.6, task="drafting")
     
     increase_pct = ((target_salary - current_offer) / current_offer) * 100
     reasons = ", ".join(reasoning) if reasoning else "market data, relevant experience"
@@ -274,13 +259,9 @@ def generate_negotiation_script(
         result = llm.invoke([
             SystemMessage(content="You are an expert salary negotiation coach. Create persuasive, professional scripts. Output only valid JSON."),
             HumanMessage(content=prompt)
-        ])
-        
-        content = result.content.strip()
-        if "```" in content:
-            content = content.split("```")[1].replace("json", "").strip()
+        ], caller="salary")
         
-        parsed = json.loads(content)
+        parsed = parse_or_repair(llm, result, caller="salary")
         console.success("Negotiation scripts created")
         return json.dumps(parsed)
         
@@ -410,17 +391,11 @@ class SalaryAgent(BaseAgent):
     def __init__(self):
         super().__init__()
         
-        if settings.groq_api_key_fallback:
-            api_key = settings.groq_api_key_fallback.get_secret_value()
-        else:
-            api_key = settings.groq_api_key.get_secret_value()
-        
-        os.environ["GROQ_API_KEY"] = api_key
-        
-        llm = ChatGroq(
-            model="llama-3.1-8b-instant",
-            temperature=0.4,
-            api_key=api_key
+        # Calls are spread over every Groq key in the pool
+        llm = get_pooled_chat_model(
+            LLMProvider.GROQ,
+            model=model_router.model("orchestration", LLMProvider.GROQ, "llama-3.1-8b-instant"),
+            temperature=0.4
         )
         
         self.agent = create_deep_agent(
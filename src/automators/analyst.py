@@ -1,13 +1,17 @@
 
-import json
+import re
+import asyncio
+from typing import Dict, List, Optional
+
 import requests
 from bs4 import BeautifulSoup
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage
 
 from src.automators.base import BaseAgent
-from src.models.job import JobAnalysis
+from src.models.job import JobAnalysis, JobTriage
 from src.core.console import console
+from src.core.llm_provider import LLMError, UnifiedLLM
+from src.core.structured_output import aparse_or_repair
+from src.core.prompts import ANALYST_SCORING, ANALYST_TRIAGE, canonical_profile
 
 class AnalystAgent(BaseAgent):
     """
@@ -15,12 +19,10 @@ class AnalystAgent(BaseAgent):
     """
     def __init__(self):
         super().__init__()
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0.0,
-            api_key=self.settings.groq_api_key.get_secret_value()
-        )
-
+        # Background scoring yields to interactive calls (review steps, chat)
+        self.llm = UnifiedLLM(temperature=0.0, task="scoring", caller="analyst", priority="bulk")
+        self.triage_llm = UnifiedLLM(temperature=0.0, task="triage", caller="analyst_triage", priority="bulk")
+    
     def _fetch_page_content(self, url: str) -> str:
         """Helper to fetch and clean HTML content."""
         try:
@@ -43,82 +45,234 @@ class AnalystAgent(BaseAgent):
         except Exception as e:
             self.logger.error(f"Error fetching page {url}: {e}")
             return ""
-
-    async def run(self, url: str, resume_text: str) -> JobAnalysis:
+    
+    # ============================================
+    # Triage
+    # ============================================
+    
+    @staticmethod
+    def _resume_skills(resume_text: str) -> List[str]:
+        """Skills listed in the SKILLS section of UserProfile.to_resume_text()."""
+        skills = []
+        in_skills = False
+        for line in resume_text.splitlines():
+            if line.strip().isupper() and line.strip().endswith(":"):
+                in_skills = line.strip() == "SKILLS:"
+                continue
+            if in_skills and ":" in line:
+                skills += [s.strip() for s in line.split(":", 1)[1].split(",") if s.strip()]
+        return skills
+    
+    @staticmethod
+    def _compress_job(job_text: str, limit: int) -> str:
+        """
+        Head of the posting (title, company, summary) plus requirement lines,
+        cut to `limit` characters.
+        """
+        head = job_text[:limit // 2]
+        keywords = re.compile(r"require|qualif|experience|skill|must|stack|responsib", re.IGNORECASE)
+        budget = limit - len(head)
+        extra = []
+        for line in job_text[limit // 2:].splitlines():
+            if keywords.search(line) and len(line) + 1 <= budget:
+                extra.append(line)
+                budget -= len(line) + 1
+        return "\n".join([head] + extra)
+    
+    @staticmethod
+    def _keyword_triage(job_text: str, skills: List[str]) -> JobTriage:
+        """Deterministic fallback: share of profile skills the posting mentions."""
+        found = [
+            skill for skill in skills
+            if re.search(rf"(?<!\w){re.escape(skill)}(?!\w)", job_text, re.IGNORECASE)
+        ]
+        expected = max(1, min(len(skills), 8))
+        return JobTriage(
+            match_score=min(100, round(100 * len(found) / expected)),
+            matching_skills=found,
+            reasoning=f"Keyword triage: {len(found)} of {len(skills)} profile skills mentioned"
+        )
+    
+    async def triage(self, url: str, job_text: str, resume_text: str) -> Optional[JobTriage]:
+        """
+        Cheap first-pass score on a compressed posting and the skill list only.
+        
+        Runs on the small model (or the local tier, see LOCAL_LLM_TASKS);
+        falls back to keyword overlap when the call fails. Returns None
+        when the resume lists no skills, since there is nothing to score
+        against - the job then goes straight to the full analysis.
+        """
+        skills = self._resume_skills(resume_text)
+        if not skills:
+            self.logger.info("No SKILLS section in the resume, skipping triage")
+            return None
+        
+        summary = self._compress_job(job_text, self.settings.analyst_triage_chars)
+        
+        messages = ANALYST_TRIAGE.messages(
+            {"url": url, "summary": summary},
+            profile=", ".join(skills)
+        )
+        
+        try:
+            result = await self.triage_llm.ainvoke(messages)
+            return await aparse_or_repair(self.triage_llm, result, JobTriage)
+        except Exception as e:
+            self.logger.warning(f"Triage LLM failed, using keyword overlap: {e}")
+            return self._keyword_triage(job_text, skills)
+    
+    def _needs_full_analysis(self, triage: Optional[JobTriage], min_match_score: Optional[int]) -> bool:
+        if triage is None or min_match_score is None or not self.settings.analyst_triage_enabled:
+            return True
+        return triage.match_score >= min_match_score - self.settings.analyst_triage_margin
+    
+    def _from_triage(self, triage: JobTriage, min_match_score: int) -> JobAnalysis:
+        console.info(
+            f"Triage score {triage.match_score} is well below {min_match_score} - skipping full analysis"
+        )
+        return JobAnalysis(
+            role=triage.role,
+            company=triage.company,
+            match_score=triage.match_score,
+            matching_skills=triage.matching_skills,
+            reasoning=f"Triage: {triage.reasoning or 'low fit'}"
+        )
+    
+    # ============================================
+    # Full Analysis
+    # ============================================
+    
+    def _build_messages(self, url: str, job_text: str, resume_text: str) -> list:
+        # Instructions and resume first (same for every job of a run), posting last
+        return ANALYST_SCORING.messages(
+            {"url": url, "job_text": job_text},
+            profile=canonical_profile(resume_text)
+        )
+    
+    async def _parse(self, result: str) -> JobAnalysis:
+        # Validated against JobAnalysis; a malformed response gets one repair request
+        analysis = await aparse_or_repair(self.llm, result, JobAnalysis)
+        
+        # Display rich formatted results
+        console.analyst_results(
+            role=analysis.role,
+            company=analysis.company,
+            salary=analysis.salary or 'Not mentioned',
+            match_score=analysis.match_score,
+            tech_stack=analysis.tech_stack,
+            matching_skills=analysis.matching_skills,
+            missing_skills=analysis.missing_skills,
+            analysis=analysis.reasoning or ""
+        )
+        
+        return analysis
+    
+    def _failed(self, error: Exception):
+        self.logger.error(f"Analysis Failed: {error}")
+        console.error(f"Analysis failed: {str(error)}")
+    
+    async def run(
+        self,
+        url: str,
+        resume_text: str,
+        min_match_score: Optional[int] = None,
+        job_text: Optional[str] = None
+    ) -> JobAnalysis:
         """
         Analyzes the job at `url` matches the `resume_text`.
         Returns a JobAnalysis object.
+        
+        With `min_match_score`, a cheap triage runs first and the full
+        analysis only happens when the triage score is within
+        ANALYST_TRIAGE_MARGIN of the threshold (or above it). Pass
+        `job_text` when the description is already known (ATS board
+        postings) to skip fetching the page.
+        
+        Raises when the page cannot be fetched or the model call fails, so
+        a failed job is never mistaken for a scored one.
         """
         # Rich console output
         console.analyst_header(url)
         self.logger.info(f"🧠 AnalystAgent: Analyzing {url}...")
         
-        job_text = self._fetch_page_content(url)
+        job_text = job_text or self._fetch_page_content(url)
         if not job_text:
             console.error(f"Could not fetch content from URL")
             raise ValueError(f"Could not fetch content from {url}")
-
-        prompt = f"""
-        You are an expert HR Analyst. Analyze the following JOB POSTING text against the CANDIDATE RESUME.
-        
-        JOB POSTING URL: {url}
-        JOB POSTING TEXT:
-        {job_text}
-        
-        CANDIDATE RESUME:
-        {resume_text}
-        
-        Return a valid JSON object (NO markdown) with fields:
-        - role: (str) Job Title
-        - company: (str) Company Name
-        - salary: (str) Salary Range or "Not mentioned"
-        - tech_stack: (list[str]) Key technologies required (max 8)
-        - matching_skills: (list[str]) Skills candidate has that match the job (max 6)
-        - missing_skills: (list[str]) Skills required but candidate is missing (max 6)
-        - match_score: (int) 0-100 score based on overall fit
-        - reasoning: (str) Brief explanation for the match score (2-3 sentences)
-        """
         
-        messages = [
-            SystemMessage(content="You are a precise data extractor. Output ONLY valid JSON."),
-            HumanMessage(content=prompt)
-        ]
+        if min_match_score is not None and self.settings.analyst_triage_enabled:
+            triage = await self.triage(url, job_text, resume_text)
+            if not self._needs_full_analysis(triage, min_match_score):
+                return self._from_triage(triage, min_match_score)
+        
+        messages = self._build_messages(url, job_text, resume_text)
         
         try:
-            result = self.llm.invoke(messages)
-            content = result.content.strip()
-            if "```" in content:
-                content = content.replace("```json", "").replace("```", "")
-            
-            data = json.loads(content)
-            # Validate with Pydantic model
-            analysis = JobAnalysis(**data)
-            
-            # Display rich formatted results
-            console.analyst_results(
-                role=analysis.role,
-                company=analysis.company,
-                salary=data.get('salary', 'Not mentioned'),
-                match_score=analysis.match_score,
-                tech_stack=data.get('tech_stack', []),
-                matching_skills=analysis.matching_skills,
-                missing_skills=analysis.missing_skills,
-                analysis=analysis.reasoning or ""
-            )
-            
-            return analysis
-            
+            result = await self.llm.ainvoke(messages)
+            return await self._parse(result)
+        
         except Exception as e:
-            self.logger.error(f"Analysis Failed: {e}")
-            console.error(f"Analysis failed: {str(e)}")
-            
-            # Return a dummy failure object
-            return JobAnalysis(
-                role="Unknown",
-                company="Unknown",
-                match_score=0,
-                matching_skills=[],
-                missing_skills=[],
-                reasoning=f"Analysis failed: {str(e)}"
-            )
-
+            self._failed(e)
+            raise
+    
+    async def run_bulk(
+        self,
+        urls: List[str],
+        resume_text: str,
+        min_match_score: Optional[int] = None,
+        job_texts: Optional[Dict[str, str]] = None
+    ) -> Dict[str, JobAnalysis]:
+        """
+        Analyze many jobs in one provider batch (offline bulk scoring).
+        
+        Slower than `run` but billed at batch rates on a separate quota.
+        Requests that fail inside the batch are retried synchronously;
+        URLs whose page cannot be fetched, or whose analysis still fails,
+        are left out of the result.
+        With `min_match_score`, jobs are triaged first as in `run`.
+        Pages already in `job_texts` are not fetched.
+        """
+        self.logger.info(f"🧠 AnalystAgent: Batch-analyzing {len(urls)} jobs...")
+        
+        job_texts = job_texts or {}
+        pages = await asyncio.gather(*(
+            asyncio.sleep(0, job_texts[url]) if job_texts.get(url) else asyncio.to_thread(self._fetch_page_content, url)
+            for url in urls
+        ))
+        fetched = [(url, text) for url, text in zip(urls, pages) if text]
+        for url, text in zip(urls, pages):
+            if not text:
+                self.logger.warning(f"Could not fetch content from {url}")
+        if not fetched:
+            return {}
+        
+        analyses = {}
+        if min_match_score is not None and self.settings.analyst_triage_enabled:
+            triages = await asyncio.gather(*(self.triage(url, text, resume_text) for url, text in fetched))
+            promising = []
+            for (url, text), triage in zip(fetched, triages):
+                if self._needs_full_analysis(triage, min_match_score):
+                    promising.append((url, text))
+                else:
+                    analyses[url] = self._from_triage(triage, min_match_score)
+            fetched = promising
+            if not fetched:
+                return analyses
+        
+        batch = [self._build_messages(url, text, resume_text) for url, text in fetched]
+        try:
+            responses = await self.llm.abatch_invoke(batch)
+        except LLMError as e:
+            self.logger.warning(f"Batch analysis failed, falling back to per-job calls: {e}")
+            responses = [None] * len(batch)
+        
+        for (url, _), messages, response in zip(fetched, batch, responses):
+            console.analyst_header(url)
+            try:
+                if response is None:
+                    response = await self.llm.ainvoke(messages)
+                analyses[url] = await self._parse(response)
+            except Exception as e:
+                self._failed(e)
+        
+        return analyses
@@ -0,0 +1,362 @@
+"""
+ATS Board Scout - Pull postings straight from Greenhouse, Lever and Ashby job board APIs
+Watchlist boards are fetched concurrently with conditional requests; postings carry their full description
+"""
+import json
+import time
+import html
+import sqlite3
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from bs4 import BeautifulSoup
+
+from src.automators.base import BaseAgent
+from src.core.console import console
+from src.models.job import JobPosting
+from src.core.job_prefilter import SnippetPrefilter, matching_terms
+from src.core.scout_watermarks import SearchWatermarks, get_search_watermarks, search_key, fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def _plain_text(markup: str) -> str:
+    """Greenhouse sends escaped HTML; flatten it to text lines."""
+    soup = BeautifulSoup(html.unescape(markup or ""), "html.parser")
+    lines = (line.strip() for line in soup.get_text("\n").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _iso_from_millis(value: Any) -> Optional[str]:
+    if not isinstance(value, (int, float)):
+        return None
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc).isoformat()
+
+
+# ============================================
+# Board APIs
+# ============================================
+
+def _greenhouse_postings(slug: str, data: Any) -> List[JobPosting]:
+    return [
+        JobPosting(
+            url=f"https://job-boards.greenhouse.io/{slug}/jobs/{job['id']}",
+            platform="greenhouse",
+            company=slug,  # Board slug for every platform, as in the canonical JobKey
+            posting_id=str(job["id"]),
+            title=job.get("title", ""),
+            location=(job.get("location") or {}).get("name", ""),
+            description=_plain_text(job.get("content", "")),
+            updated_at=job.get("updated_at"),
+        )
+        for job in (data or {}).get("jobs", [])
+    ]
+
+
+def _lever_postings(slug: str, data: Any) -> List[JobPosting]:
+    postings = []
+    for job in data or []:
+        sections = [job.get("descriptionPlain", "")]
+        for block in job.get("lists", []):
+            sections.append(f"{block.get('text', '')}\n{_plain_text(block.get('content', ''))}")
+        sections.append(job.get("additionalPlain", ""))
+        postings.append(JobPosting(
+            url=f"https://jobs.lever.co/{slug}/{job['id']}",
+            platform="lever",
+            company=slug,
+            posting_id=job["id"],
+            title=job.get("text", ""),
+            location=(job.get("categories") or {}).get("location", ""),
+            description="\n\n".join(s.strip() for s in sections if s and s.strip()),
+            updated_at=_iso_from_millis(job.get("updatedAt") or job.get("createdAt")),
+        ))
+    return postings
+
+
+def _ashby_postings(slug: str, data: Any) -> List[JobPosting]:
+    return [
+        JobPosting(
+            url=f"https://jobs.ashbyhq.com/{slug}/{job['id']}",
+            platform="ashby",
+            company=slug,
+            posting_id=job["id"],
+            title=job.get("title", ""),
+            location=job.get("location", ""),
+            description=job.get("descriptionPlain") or _plain_text(job.get("descriptionHtml", "")),
+            updated_at=job.get("updatedAt") or job.get("publishedAt"),
+        )
+        for job in (data or {}).get("jobs", [])
+        if job.get("isListed", True)
+    ]
+
+
+# Words that say nothing about whether a posting fits ("senior python developer remote")
+QUERY_FILLER = {
+    "remote", "hybrid", "onsite", "on-site", "senior", "sr", "junior", "jr", "mid", "lead",
+    "staff", "principal", "entry", "level", "and", "or", "in", "of", "for", "the", "a",
+}
+
+
+def _query_terms(query: str) -> List[str]:
+    return [word for word in query.lower().split() if word not in QUERY_FILLER]
+
+
+# platform -> (board URL template, parser)
+BOARD_APIS: Dict[str, Tuple[str, Callable[[str, Any], List[JobPosting]]]] = {
+    "greenhouse": ("https://boards-api.greenhouse.io/v1/boards/{slug}/jobs?content=true", _greenhouse_postings),
+    "lever": ("https://api.lever.co/v0/postings/{slug}?mode=json", _lever_postings),
+    "ashby": ("https://api.ashbyhq.com/posting-api/job-board/{slug}", _ashby_postings),
+}
+
+
+def parse_watchlist(entries: Sequence[str]) -> List[Tuple[str, str]]:
+    """Parse "platform:slug" entries (e.g. "greenhouse:stripe", "lever:netflix")."""
+    boards = []
+    for entry in entries:
+        platform, _, slug = entry.strip().partition(":")
+        platform = platform.lower()
+        if platform not in BOARD_APIS or not slug:
+            raise ValueError(f"Invalid watchlist entry '{entry}' (expected one of {sorted(BOARD_APIS)}:<slug>)")
+        boards.append((platform, slug.strip()))
+    return list(dict.fromkeys(boards))
+
+
+# ============================================
+# Conditional request store
+# ============================================
+
+class BoardStore:
+    """
+    Last response per board (ETag, Last-Modified and the raw JSON), so
+    unchanged boards are answered with 304 and parsed from the copy.
+    Memory-only without a path.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self._memory: Dict[str, Tuple[Dict[str, str], str]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        
+        if self._conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS ats_boards (
+                        board TEXT PRIMARY KEY,
+                        validators TEXT NOT NULL,
+                        body TEXT NOT NULL,
+                        fetched_at REAL NOT NULL
+                    )
+                    """
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"ATS board store unavailable ({self.path}): {e}")
+                self.path = None
+                self._conn = None
+        
+        return self._conn
+    
+    def get(self, board: str) -> Optional[Tuple[Dict[str, str], str]]:
+        """(validators, body) of the last 200 response for `board`."""
+        with self._lock:
+            if board in self._memory:
+                return self._memory[board]
+            
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute("SELECT validators, body FROM ats_boards WHERE board = ?", (board,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"ATS board store read failed: {e}")
+                return None
+            if row is None:
+                return None
+            
+            entry = (json.loads(row[0]), row[1])
+            self._memory[board] = entry
+            return entry
+    
+    def set(self, board: str, validators: Dict[str, str], body: str):
+        with self._lock:
+            self._memory[board] = (validators, body)
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ats_boards (board, validators, body, fetched_at) VALUES (?, ?, ?, ?)",
+                    (board, json.dumps(validators), body, time.time())
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"ATS board store write failed: {e}")
+
+
+# ============================================
+# Agent
+# ============================================
+
+class ATSBoardScout(BaseAgent):
+    """
+    Scout source that reads company job boards directly instead of
+    searching.
+    
+    Boards in the watchlist are pulled concurrently (ATS_BOARD_CONCURRENCY)
+    with If-None-Match / If-Modified-Since, so unchanged boards cost a 304.
+    Every posting comes with its full description, so the analyst does
+    not need to scrape the posting page. An optional `prefilter` screens
+    postings on title and description before they reach the analyst.
+    """
+    
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        store: Optional[BoardStore] = None,
+        api_urls: Optional[Dict[str, str]] = None,
+        watermarks: Optional[SearchWatermarks] = None,
+        prefilter: Optional[SnippetPrefilter] = None
+    ):
+        super().__init__()
+        self.http_client = http_client
+        self.store = store or BoardStore(self.settings.ats_board_cache_path or None)
+        self.api_urls = {platform: url for platform, (url, _) in BOARD_APIS.items()}
+        self.api_urls.update(api_urls or {})
+        self.watermarks = watermarks or get_search_watermarks()
+        self.prefilter = prefilter
+        self.dropped: List[Tuple[str, str]] = []  # (url, reason) for the last run
+        self.watermark_search: Optional[str] = None  # saved search of the last since_last_run run
+        self.not_modified = 0
+    
+    async def run(
+        self,
+        watchlist: Optional[Sequence[str]] = None,
+        query: str = "",
+        since_last_run: bool = False,
+        resurface_changed: bool = False
+    ) -> List[JobPosting]:
+        """
+        Postings from every board in `watchlist` (default: ATS_WATCHLIST).
+        
+        With `query`, only postings whose title or description mention
+        every query word (as a whole word, seniority and work-mode words
+        ignored) are kept; synonyms and acronyms are left to the
+        prefilter and triage. `since_last_run` and
+        `resurface_changed` work as in ScoutAgent.run, keyed by the
+        watchlist and query (see `commit_watermark`).
+        """
+        boards = parse_watchlist(watchlist if watchlist is not None else self.settings.ats_watchlist)
+        if not boards:
+            return []
+        
+        self.logger.info(f"🔎 ATSBoardScout: Reading {len(boards)} job boards...")
+        postings = await self.fetch_boards(boards)
+        
+        terms = _query_terms(query)
+        if terms:
+            postings = [
+                p for p in postings
+                if len(matching_terms(terms, f"{p.title}\n{p.description}".lower())) == len(terms)
+            ]
+        
+        self.dropped = []
+        self.watermark_search = None
+        if self.prefilter is not None:
+            kept = []
+            for p in postings:
+                reason = self.prefilter.check(p.title, p.description)
+                if reason:
+                    self.dropped.append((p.url, reason))
+                else:
+                    kept.append(p)
+            postings = kept
+        
+        if since_last_run and postings:
+            search = self.watermark_search = search_key(
+                "boards", [f"{platform}:{slug}" for platform, slug in boards], [query]
+            )
+            fresh = set(self.watermarks.select(search, {
+                p.url: fingerprint(p.title, p.location, p.description) for p in postings
+            }, resurface_changed))
+            postings = [p for p in postings if p.url in fresh]
+        
+        self.logger.info(
+            f"✅ ATSBoardScout: {len(postings)} postings from {len(boards)} boards "
+            f"({self.not_modified} unchanged since last pull, {len(self.dropped)} prefiltered)"
+        )
+        return postings
+    
+    def commit_watermark(self, urls: Sequence[str]):
+        """Mark postings from the last `since_last_run` run as processed."""
+        if self.watermark_search is not None:
+            self.watermarks.commit(self.watermark_search, urls)
+    
+    async def fetch_boards(self, boards: Sequence[Tuple[str, str]]) -> List[JobPosting]:
+        """Fetch boards concurrently; a failing board is logged and skipped."""
+        semaphore = asyncio.Semaphore(max(1, self.settings.ats_board_concurrency))
+        client = self.http_client or httpx.AsyncClient(
+            timeout=self.settings.scout_timeout,
+            headers={"Accept": "application/json"},
+            follow_redirects=True
+        )
+        self.not_modified = 0
+        
+        async def fetch(platform: str, slug: str) -> List[JobPosting]:
+            try:
+                async with semaphore:
+                    return await self._fetch_board(client, platform, slug)
+            except Exception as e:
+                self.logger.warning(f"ATSBoardScout: {platform}:{slug} failed: {e}")
+                console.warning(f"Could not read {platform} board '{slug}': {e}")
+                return []
+        
+        try:
+            results = await asyncio.gather(*(fetch(platform, slug) for platform, slug in boards))
+        finally:
+            if self.http_client is None:
+                await client.aclose()
+        
+        return [posting for board in results for posting in board]
+    
+    async def _fetch_board(self, client: httpx.AsyncClient, platform: str, slug: str) -> List[JobPosting]:
+        board = f"{platform}:{slug}"
+        cached = self.store.get(board)
+        
+        headers = {}
+        if cached is not None:
+            validators = cached[0]
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        
+        response = await client.get(self.api_urls[platform].format(slug=slug), headers=headers)
+        
+        if response.status_code == 304 and cached is not None:
+            self.not_modified += 1
+            return BOARD_APIS[platform][1](slug, json.loads(cached[1]))
+        if response.status_code != 200:
+            # Redirects are followed, so a 3xx here (or a 304 with nothing cached) is an error too
+            raise RuntimeError(f"HTTP {response.status_code}")
+        
+        body = response.text
+        postings = BOARD_APIS[platform][1](slug, json.loads(body))
+        validators = {
+            "etag": response.headers.get("etag", ""),
+            "last_modified": response.headers.get("last-modified", ""),
+        }
+        self.store.set(board, validators, body)
+        return postings
@@ -1,74 +1,290 @@
+import asyncio
+from collections import Counter
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+import httpx
 
-from typing import List, Set
-from langchain_community.utilities import SerpAPIWrapper
 from src.automators.base import BaseAgent
 from src.core.console import console
+from src.core.scout_cache import ScoutCache, get_scout_cache
+from src.core.job_urls import SeenJobs, canonicalize, get_seen_jobs
+from src.core.job_prefilter import SnippetPrefilter
+from src.core.scout_watermarks import SearchWatermarks, get_search_watermarks, search_key, fingerprint
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+
 
 class ScoutAgent(BaseAgent):
     """
     Agent responsible for finding job listings.
+    
+    Searches fan out across query variants and locations concurrently
+    (capped by SCOUT_CONCURRENCY), each paging through SerpAPI up to
+    SCOUT_MAX_RESULTS; URLs are merged and de-duplicated as pages arrive.
+    Recent searches are served from the scout result cache. URLs are
+    canonicalized per ATS; postings processed in earlier runs, and ones
+    the `prefilter` rejects on title and snippet, are dropped before
+    anything fetches them.
     """
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[ScoutCache] = None,
+        seen_jobs: Optional[SeenJobs] = None,
+        watermarks: Optional[SearchWatermarks] = None,
+        prefilter: Optional[SnippetPrefilter] = None
+    ):
         super().__init__()
-        # Initialize SerpAPI with key from secure settings
-        self.search = SerpAPIWrapper(
-            serpapi_api_key=self.settings.serpapi_api_key.get_secret_value(),
-            params={
-                "engine": "google",
-                "google_domain": "google.com", 
-                "gl": "us", 
-                "hl": "en",
-                "num": 20
-            }
-        )
+        self.api_key = self.settings.serpapi_api_key.get_secret_value()
+        self.params = {
+            "engine": "google",
+            "google_domain": "google.com",
+            "gl": "us",
+            "hl": "en",
+        }
+        self.http_client = http_client
+        self.cache = cache or (get_scout_cache() if self.settings.scout_cache_enabled else None)
+        self.seen_jobs = seen_jobs or (get_seen_jobs() if self.settings.scout_skip_seen else None)
+        self.watermarks = watermarks or get_search_watermarks()
+        self.prefilter = prefilter
+        self.dropped: List[Tuple[str, str]] = []  # (url, reason) for the last run
+        self.results: Dict[str, dict] = {}  # canonical url -> organic result, for the last run
+        self.watermark_search: Optional[str] = None  # saved search of the last since_last_run run
         self.ats_domains = ["site:greenhouse.io", "site:lever.co", "site:ashbyhq.com"]
         self.valid_domains = ["greenhouse.io", "lever.co", "ashbyhq.com"]
-
-    async def run(self, query: str, location: str = "") -> List[str]:
+    
+    async def run(
+        self,
+        query: str,
+        location: str = "",
+        queries: Sequence[str] = (),
+        locations: Sequence[str] = (),
+        max_results: Optional[int] = None,
+        refresh: bool = False,
+        include_seen: bool = False,
+        since_last_run: bool = False,
+        resurface_changed: bool = False
+    ) -> List[str]:
         """
         Searches for jobs targeting ATS domains.
+        
+        `queries` and `locations` add variants to the primary query and
+        location; every (query, location) pair is searched. `refresh`
+        bypasses the result cache and re-queries SerpAPI; `include_seen`
+        keeps postings that earlier runs already processed.
+        
+        With `since_last_run`, only postings this saved search (same
+        queries and locations) has not returned before come back;
+        `resurface_changed` also returns ones whose title or snippet
+        changed since. The watermark only moves past postings handed to
+        `commit_watermark`.
         """
-        full_query = f'{query} {location}'.strip()
-        target_query = f'{full_query} ({" OR ".join(self.ats_domains)})'
+        all_queries = list(dict.fromkeys([query, *queries]))
+        all_locations = list(dict.fromkeys([location, *locations]))
         
         # Rich console output
         console.scout_header()
-        self.logger.info(f"🔎 ScoutAgent: Searching for '{full_query}'...")
+        self.logger.info(
+            f"🔎 ScoutAgent: Searching for {all_queries} in {all_locations} "
+            f"({len(all_queries) * len(all_locations)} searches)..."
+        )
         
+        valid_urls = []
+        self.watermark_search = None
         try:
-            # Synchronous call to SerpAPI (wrapped if needed, but simple enough here)
-            raw_results = self.search.results(target_query)
-            organic_results = raw_results.get('organic_results', [])
-            
-            if not organic_results:
-                self.logger.warning("Search returned no results.")
-                console.scout_results(query, location, [])
-                return []
+            async for url in self.search_stream(all_queries, all_locations, max_results, refresh, include_seen):
+                valid_urls.append(url)
+        except Exception as e:
+            self.logger.error(f"ScoutAgent Error: {str(e)}")
+            console.error(f"Search failed: {str(e)}")
+        
+        if since_last_run and valid_urls:
+            found = len(valid_urls)
+            search = self.watermark_search = search_key("serpapi", all_queries, all_locations)
+            valid_urls = self.watermarks.select(search, {
+                url: fingerprint(self.results[url].get("title"), self.results[url].get("snippet"))
+                for url in valid_urls
+            }, resurface_changed)
+            self.logger.info(f"ScoutAgent: {len(valid_urls)} of {found} postings are new since the last run.")
+        
+        if not valid_urls:
+            self.logger.warning("Search returned no results.")
+        else:
+            self.logger.info(f"✅ ScoutAgent: Found {len(valid_urls)} valid jobs.")
+        if self.dropped:
+            reasons = Counter("already processed" if reason == "seen" else "prefilter" for _, reason in self.dropped)
+            self.logger.info(
+                f"ScoutAgent: Dropped {len(self.dropped)} postings "
+                f"({', '.join(f'{n} {why}' for why, n in reasons.items())})."
+            )
+        
+        # Display rich formatted results
+        console.scout_results(", ".join(all_queries), ", ".join(all_locations), valid_urls)
+        return valid_urls
+    
+    def commit_watermark(self, urls: Sequence[str]):
+        """Mark postings from the last `since_last_run` run as processed."""
+        if self.watermark_search is not None:
+            self.watermarks.commit(self.watermark_search, urls)
+    
+    async def search_stream(
+        self,
+        queries: Sequence[str],
+        locations: Sequence[str],
+        max_results: Optional[int] = None,
+        refresh: bool = False,
+        include_seen: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Yield unique ATS URLs as soon as any search page returns them.
+        
+        Searches answered by the result cache cost no SerpAPI quota; fresh
+        ones are cached once fully paged. A failing search is logged and
+        skipped; the others carry on.
+        """
+        limit = max_results or self.settings.scout_max_results
+        semaphore = asyncio.Semaphore(max(1, self.settings.scout_concurrency))
+        pages: asyncio.Queue = asyncio.Queue()
+        seen: Set[str] = set()
+        self.dropped = []
+        self.results = {}
+        
+        skip_seen = self.seen_jobs is not None and not include_seen
+        if skip_seen and not self.seen_jobs.warmed:
+            await asyncio.to_thread(self.seen_jobs.warm_from_discovered_jobs)
+        
+        client = self.http_client or httpx.AsyncClient(timeout=self.settings.scout_timeout)
+        
+        async def search(query: str, location: str):
+            if not refresh:
+                cached = self.cache.get(query, location, self.ats_domains, limit) if self.cache is not None else None
+                if cached is not None:
+                    self.logger.debug(f"ScoutAgent: cache hit for '{query}' in '{location}'")
+                    await pages.put(cached.results[:limit])
+                    return
             
-            valid_urls = self._filter_results(organic_results)
+            full_query = f"{query} {location}".strip()
+            fetched: List[dict] = []
+            pages_read = 0
+            try:
+                async for organic in self._paginate(client, semaphore, full_query, limit):
+                    fetched.extend(organic)
+                    pages_read += 1
+                    await pages.put(organic)
+            except Exception as e:
+                self.logger.warning(f"ScoutAgent: search '{full_query}' failed: {e}")
+                return
             
-            # Display rich formatted results
-            console.scout_results(query, location, valid_urls)
+            if self.cache is not None:
+                complete = pages_read * self._page_size(limit) < limit
+                self.cache.set(query, location, self.ats_domains, fetched, limit, complete)
+            await self._record_search(query, location)
+        
+        tasks = [asyncio.create_task(search(q, loc)) for q in queries for loc in locations]
+        done = asyncio.gather(*tasks)
+        done.add_done_callback(lambda _: pages.put_nowait(None))
+        
+        try:
+            while (organic := await pages.get()) is not None:
+                for url in self._filter_results(organic, seen, skip_seen):
+                    yield url
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.http_client is None:
+                await client.aclose()
+    
+    async def _paginate(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        full_query: str,
+        limit: int
+    ) -> AsyncIterator[List[dict]]:
+        """Page through one search until `limit` results or the last page."""
+        target_query = f'{full_query} ({" OR ".join(self.ats_domains)})'
+        page_size = self._page_size(limit)
+        start = 0
+        
+        while start < limit:
+            async with semaphore:
+                response = await client.get(SERPAPI_URL, params={
+                    **self.params,
+                    "q": target_query,
+                    "num": page_size,
+                    "start": start,
+                    "api_key": self.api_key,
+                })
+            if response.status_code >= 400:
+                # Not raise_for_status(): its message carries the URL, api_key included
+                raise RuntimeError(f"SerpAPI returned HTTP {response.status_code}")
+            raw_results = response.json()
+            if raw_results.get("error"):
+                raise RuntimeError(raw_results["error"])
             
-            return valid_urls
+            organic_results = raw_results.get("organic_results", [])
+            if not organic_results:
+                return
+            yield organic_results
             
+            start += page_size
+            if not raw_results.get("serpapi_pagination", {}).get("next"):
+                return
+    
+    def _page_size(self, limit: int) -> int:
+        return max(1, min(self.settings.scout_page_size, limit))
+    
+    async def _record_search(self, query: str, location: str):
+        """Log a fresh search to the job_searches table when a history user is configured."""
+        user_id = self.settings.scout_history_user_id
+        if not user_id:
+            return
+        
+        try:
+            from src.services.supabase_client import save_job_search
+            platforms = [d.removeprefix("site:").split(".")[0] for d in self.ats_domains]
+            await save_job_search(user_id, query, location, platforms)
         except Exception as e:
-            self.logger.error(f"ScoutAgent Error: {str(e)}")
-            console.error(f"Search failed: {str(e)}")
-            return []
-
-    def _filter_results(self, results: List[dict]) -> List[str]:
+            self.logger.warning(f"ScoutAgent: could not record search history: {e}")
+    
+    def _filter_results(
+        self,
+        results: List[dict],
+        seen: Optional[Set[str]] = None,
+        skip_seen: bool = False
+    ) -> List[str]:
+        """
+        Canonical ATS posting URLs from organic results, de-duplicated by
+        posting key against `seen` (and the seen-jobs index if `skip_seen`),
+        then screened by the prefilter.
+        """
         valid_links = []
-        seen: Set[str] = set()
+        seen = set() if seen is None else seen
         
         for r in results:
             link = r.get('link', '').strip()
-            if not link or link in seen:
+            if not link:
                 continue
-                
-            if any(domain in link for domain in self.valid_domains):
-                valid_links.append(link)
-                seen.add(link)
-                
-        self.logger.info(f"✅ ScoutAgent: Found {len(valid_links)} valid jobs.")
+            
+            parsed = canonicalize(link)
+            if parsed is None:
+                # Company pages, search listings, unknown boards
+                continue
+            key, url = parsed
+            if key.id in seen:
+                continue
+            seen.add(key.id)
+            
+            if skip_seen and url in self.seen_jobs:
+                self.dropped.append((url, "seen"))
+                continue
+            if self.prefilter is not None:
+                reason = self.prefilter.check(r.get("title", ""), r.get("snippet", ""))
+                if reason:
+                    self.dropped.append((url, reason))
+                    continue
+            valid_links.append(url)
+            self.results[url] = r
+        
         return valid_links
@@ -15,6 +15,28 @@ if root_dir not in sys.path:
 from src.core.console import console
 
 
+def stage_budget(value: str) -> str:
+    """argparse type for --stage-budget (validated here, parsed in run_search)."""
+    from src.core.llm_budget import parse_stage_limits
+    
+    try:
+        parse_stage_limits([value])
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def watch_entry(value: str) -> str:
+    """argparse type for --watch ("platform:slug")."""
+    from src.automators.ats_boards import parse_watchlist
+    
+    try:
+        parse_watchlist([value])
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
 def create_parser():
     """Create argument parser with subcommands."""
     parser = argparse.ArgumentParser(
@@ -43,6 +65,38 @@ Examples:
     )
     search_parser.add_argument("query", help="Job title/keywords")
     search_parser.add_argument("location", help="Location (e.g., 'Remote', 'NYC')")
+    search_parser.add_argument(
+        "--also-query", action="append", default=[], metavar="QUERY",
+        help="Extra query variant to search alongside QUERY (repeatable)"
+    )
+    search_parser.add_argument(
+        "--also-location", action="append", default=[], metavar="LOCATION",
+        help="Extra location to search alongside LOCATION (repeatable)"
+    )
+    search_parser.add_argument(
+        "--refresh-search", action="store_true",
+        help="Ignore cached search results and query SerpAPI again"
+    )
+    search_parser.add_argument(
+        "--include-seen", action="store_true",
+        help="Keep postings already analyzed in earlier runs"
+    )
+    search_parser.add_argument(
+        "--watch", action="append", type=watch_entry, default=None, metavar="PLATFORM:SLUG",
+        help="Also read this company job board directly, e.g. greenhouse:stripe (repeatable; default ATS_WATCHLIST)"
+    )
+    search_parser.add_argument(
+        "--since-last-run", action="store_true",
+        help="Only process postings this search has not returned before"
+    )
+    search_parser.add_argument(
+        "--resurface-changed", action="store_true",
+        help="With --since-last-run, also return postings that changed since the last run"
+    )
+    search_parser.add_argument(
+        "--no-prefilter", action="store_true",
+        help="Don't screen search results on title/snippet before fetching them"
+    )
     search_parser.add_argument(
         "--min-score", type=int, default=70,
         help="Minimum match score (default: 70)"
@@ -55,6 +109,30 @@ Examples:
         "--no-cover", action="store_true",
         help="Skip cover letter generation"
     )
+    search_parser.add_argument(
+        "--metrics-out", default=None,
+        help="Write per-call LLM token/latency/cost metrics to this JSON file"
+    )
+    search_parser.add_argument(
+        "--bulk", action="store_true",
+        help="Score all found jobs through the LLM batch API (slower, cheaper)"
+    )
+    search_parser.add_argument(
+        "--max-tokens", type=int, default=None,
+        help="LLM token budget for the run (later jobs degrade as it runs low)"
+    )
+    search_parser.add_argument(
+        "--max-calls", type=int, default=None,
+        help="LLM call budget for the run"
+    )
+    search_parser.add_argument(
+        "--max-cost", type=float, default=None,
+        help="LLM spend budget for the run in USD"
+    )
+    search_parser.add_argument(
+        "--stage-budget", action="append", type=stage_budget, default=[], metavar="STAGE:LIMITS",
+        help="Per-stage budget, e.g. cover_letter:tokens=5000,calls=4 (repeatable)"
+    )
     
     # ============================================
     # INTERVIEW - Interview prep
@@ -141,13 +219,27 @@ Examples:
 async def run_search(args):
     """Run full job search pipeline."""
     from src.workflows.job_manager import JobApplicationWorkflow
+    from src.core.llm_budget import RunBudget, BudgetLimits, parse_stage_limits
+    
+    budget = RunBudget(
+        run=BudgetLimits(max_tokens=args.max_tokens, max_calls=args.max_calls, max_cost=args.max_cost),
+        stages=parse_stage_limits(args.stage_budget)
+    )
     
     workflow = JobApplicationWorkflow(
         use_resume_tailoring=not args.no_resume,
-        use_cover_letter=not args.no_cover
+        use_cover_letter=not args.no_cover,
+        metrics_path=args.metrics_out,
+        bulk_analysis=args.bulk,
+        use_prefilter=False if args.no_prefilter else None
     )
     
-    await workflow.run(args.query, args.location, args.min_score)
+    await workflow.run(
+        args.query, args.location, args.min_score, budget=budget,
+        queries=args.also_query, locations=args.also_location, refresh_search=args.refresh_search,
+        include_seen=args.include_seen, watchlist=args.watch,
+        since_last_run=args.since_last_run, resurface_changed=args.resurface_changed
+    )
 
 
 async def run_interview(args):
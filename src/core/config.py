@@ -1,5 +1,5 @@
 
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import SecretStr, Field
 
@@ -12,19 +12,141 @@ class Settings(BaseSettings):
     # AI Models - Groq
     groq_api_key: SecretStr = Field(..., alias="GROQ_API_KEY")
     groq_api_key_fallback: Optional[SecretStr] = Field(None, alias="GROQ_API_KEY1")
+    groq_api_keys: List[SecretStr] = Field(default_factory=list, alias="GROQ_API_KEYS")  # extra keys, JSON list
     groq_model: str = Field("llama-3.1-8b-instant", alias="GROQ_MODEL")
     
     # AI Models - OpenRouter
     openrouter_api_key: Optional[SecretStr] = Field(None, alias="OPENROUTER_API_KEY")
     openrouter_api_key_fallback: Optional[SecretStr] = Field(None, alias="OPENROUTER_API_KEY1")
+    openrouter_api_keys: List[SecretStr] = Field(default_factory=list, alias="OPENROUTER_API_KEYS")
     openrouter_model: str = Field("qwen/qwen-2.5-coder-32b-instruct:free", alias="OPENROUTER_MODEL")
     
     # AI Models - Gemini
     gemini_api_key: Optional[SecretStr] = Field(None, alias="GEMINI_API_KEY")
+    gemini_api_keys: List[SecretStr] = Field(default_factory=list, alias="GEMINI_API_KEYS")
     gemini_model: str = Field("gemini-2.0-flash-exp", alias="GEMINI_MODEL1")
     
+    # LLM Runtime - max in-flight async requests per provider (JSON in env)
+    llm_provider_concurrency: Dict[str, int] = Field(
+        default_factory=lambda: {"groq": 8, "openrouter": 4, "gemini": 4, "local": 2},
+        alias="LLM_PROVIDER_CONCURRENCY"
+    )
+    
+    # LLM Response Cache (only low-temperature calls are cached)
+    llm_cache_enabled: bool = Field(True, alias="LLM_CACHE_ENABLED")
+    llm_cache_path: str = Field(".cache/llm_cache.sqlite", alias="LLM_CACHE_PATH")
+    llm_cache_ttl_hours: float = Field(168, alias="LLM_CACHE_TTL_HOURS")
+    llm_cache_max_temperature: float = Field(0.3, alias="LLM_CACHE_MAX_TEMPERATURE")
+    llm_cache_memory_entries: int = Field(512, alias="LLM_CACHE_MEMORY_ENTRIES")
+    llm_cache_disk_entries: int = Field(5000, alias="LLM_CACHE_DISK_ENTRIES")
+    
+    # LLM Rate Limits - starting requests/tokens per minute per key and model, under "provider:model" or
+    # "provider" (0 = unlimited, JSON in env); x-ratelimit-limit-* response headers resize them at runtime
+    llm_rate_limits: Dict[str, Dict[str, int]] = Field(
+        default_factory=lambda: {
+            "groq": {"rpm": 30, "tpm": 6000},
+            "groq:llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12000},
+            "openrouter": {"rpm": 20, "tpm": 0},
+            "gemini": {"rpm": 15, "tpm": 1000000},
+        },
+        alias="LLM_RATE_LIMITS"
+    )
+    llm_rate_limit_max_wait: float = Field(20.0, alias="LLM_RATE_LIMIT_MAX_WAIT")  # before falling back
+    llm_rate_limit_max_queue: float = Field(120.0, alias="LLM_RATE_LIMIT_MAX_QUEUE")  # once all keys are saturated
+    
+    # LLM Priority Classes - interactive calls go first; bulk calls leave this share of each key's quota free
+    llm_default_priority: str = Field("interactive", alias="LLM_DEFAULT_PRIORITY")  # interactive / bulk
+    llm_interactive_reserve: float = Field(0.2, alias="LLM_INTERACTIVE_RESERVE")
+    llm_completion_token_estimate: int = Field(512, alias="LLM_COMPLETION_TOKEN_ESTIMATE")
+    
+    # LLM Circuit Breaker - rolling window of calls per provider endpoint
+    llm_circuit_window: int = Field(20, alias="LLM_CIRCUIT_WINDOW")
+    llm_circuit_error_threshold: float = Field(0.5, alias="LLM_CIRCUIT_ERROR_THRESHOLD")
+    llm_circuit_min_calls: int = Field(3, alias="LLM_CIRCUIT_MIN_CALLS")
+    llm_circuit_cooldown: float = Field(30.0, alias="LLM_CIRCUIT_COOLDOWN")
+    llm_circuit_max_cooldown: float = Field(300.0, alias="LLM_CIRCUIT_MAX_COOLDOWN")
+    
+    # LLM Usage Metrics - USD per million tokens by model; optional JSON dump after each run
+    llm_pricing: Dict[str, Dict[str, float]] = Field(
+        default_factory=lambda: {
+            "llama-3.1-8b-instant": {"input": 0.05, "output": 0.08},
+            "llama-3.3-70b-versatile": {"input": 0.59, "output": 0.79},
+        },
+        alias="LLM_PRICING"
+    )
+    llm_metrics_path: str = Field("", alias="LLM_METRICS_PATH")
+    
+    # LLM Model Routing - overrides for the task -> tier table in src/core/model_routing.py
+    llm_model_tiers: Dict[str, Dict[str, str]] = Field(default_factory=dict, alias="LLM_MODEL_TIERS")  # {"large": {"groq": "..."}}
+    llm_task_routes: Dict[str, Any] = Field(default_factory=dict, alias="LLM_TASK_ROUTES")  # {"scoring": "small"}
+    
+    # LLM Run Budget - fraction of the run/stage budget left at which each degradation step starts
+    llm_budget_degrade_at: Dict[str, float] = Field(
+        default_factory=lambda: {"skip_cover_letter": 0.5, "small_model": 0.3, "stop_tailoring": 0.15},
+        alias="LLM_BUDGET_DEGRADE_AT"
+    )
+    
+    # LLM Batch Mode - bulk requests through the provider batch API (slow, cheaper, separate quota)
+    llm_batch_backend: str = Field("groq", alias="LLM_BATCH_BACKEND")  # groq / local
+    llm_batch_completion_window: str = Field("24h", alias="LLM_BATCH_COMPLETION_WINDOW")
+    llm_batch_poll_interval: float = Field(30.0, alias="LLM_BATCH_POLL_INTERVAL")
+    llm_batch_timeout: float = Field(86400.0, alias="LLM_BATCH_TIMEOUT")
+    llm_batch_discount: float = Field(0.5, alias="LLM_BATCH_DISCOUNT")  # price multiplier vs. synchronous calls
+    
+    # LLM Single-Flight - identical concurrent requests share one provider call
+    llm_single_flight_enabled: bool = Field(True, alias="LLM_SINGLE_FLIGHT_ENABLED")
+    
+    # LLM Hedging (opt-in) - delay is the primary's p95 latency, bounded below
+    llm_hedge_max_ratio: float = Field(0.1, alias="LLM_HEDGE_MAX_RATIO")
+    llm_hedge_min_delay: float = Field(0.5, alias="LLM_HEDGE_MIN_DELAY")
+    llm_hedge_default_delay: float = Field(3.0, alias="LLM_HEDGE_DEFAULT_DELAY")
+    
+    # Local LLM tier - OpenAI-compatible server (Ollama: http://localhost:11434/v1, llama.cpp: http://localhost:8080/v1)
+    local_llm_base_url: str = Field("", alias="LOCAL_LLM_BASE_URL")  # empty = disabled
+    local_llm_model: str = Field("llama3.1:8b", alias="LOCAL_LLM_MODEL")
+    local_llm_api_key: Optional[SecretStr] = Field(None, alias="LOCAL_LLM_API_KEY")
+    local_llm_chain_position: int = Field(-1, alias="LOCAL_LLM_CHAIN_POSITION")  # index in the chain, -1 = last
+    local_llm_tasks: List[str] = Field(
+        default_factory=lambda: ["triage", "skill_extraction"],
+        alias="LOCAL_LLM_TASKS"
+    )  # task classes pinned to the local tier
+    
+    # Analyst triage - small-model pre-score; only jobs within the margin of min score get the full analysis
+    analyst_triage_enabled: bool = Field(True, alias="ANALYST_TRIAGE_ENABLED")
+    analyst_triage_margin: int = Field(15, alias="ANALYST_TRIAGE_MARGIN")
+    analyst_triage_chars: int = Field(4000, alias="ANALYST_TRIAGE_CHARS")  # compressed posting size
+    
+    # LLM Simulator - replaces the provider chain with local simulated endpoints when a profile is set
+    llm_simulated_profile: str = Field("", alias="LLM_SIMULATED_PROFILE")  # ideal/steady/slow/flaky/rate_limit_storm/outage
+    llm_simulated_endpoints: int = Field(2, alias="LLM_SIMULATED_ENDPOINTS")
+    llm_simulated_seed: Optional[int] = Field(None, alias="LLM_SIMULATED_SEED")
+    llm_simulated_overrides: Dict[str, float] = Field(default_factory=dict, alias="LLM_SIMULATED_OVERRIDES")
+    
     # Search
     serpapi_api_key: SecretStr = Field(..., alias="SERPAPI_API_KEY")
+    scout_max_results: int = Field(60, alias="SCOUT_MAX_RESULTS")  # organic results paged through per query/location
+    scout_page_size: int = Field(20, alias="SCOUT_PAGE_SIZE")
+    scout_concurrency: int = Field(5, alias="SCOUT_CONCURRENCY")  # SerpAPI requests in flight
+    scout_timeout: float = Field(30.0, alias="SCOUT_TIMEOUT")
+    scout_cache_enabled: bool = Field(True, alias="SCOUT_CACHE_ENABLED")
+    scout_cache_path: str = Field(".cache/scout_cache.sqlite", alias="SCOUT_CACHE_PATH")
+    scout_cache_ttl_hours: float = Field(12, alias="SCOUT_CACHE_TTL_HOURS")
+    scout_history_user_id: str = Field("", alias="SCOUT_HISTORY_USER_ID")  # also record fresh searches in job_searches
+    scout_skip_seen: bool = Field(True, alias="SCOUT_SKIP_SEEN")  # drop postings processed in earlier runs
+    seen_jobs_path: str = Field(".cache/seen_jobs.sqlite", alias="SEEN_JOBS_PATH")
+    scout_watermarks_path: str = Field(".cache/scout_watermarks.sqlite", alias="SCOUT_WATERMARKS_PATH")
+    
+    # Scout Prefilter - title/snippet screen before postings are fetched (term lists are JSON)
+    scout_prefilter_enabled: bool = Field(True, alias="SCOUT_PREFILTER_ENABLED")
+    scout_prefilter_include: List[str] = Field(default_factory=list, alias="SCOUT_PREFILTER_INCLUDE")  # title needs one
+    scout_prefilter_exclude: List[str] = Field(default_factory=list, alias="SCOUT_PREFILTER_EXCLUDE")  # title terms
+    scout_prefilter_exclude_text: List[str] = Field(default_factory=list, alias="SCOUT_PREFILTER_EXCLUDE_TEXT")
+    scout_prefilter_min_skills: int = Field(0, alias="SCOUT_PREFILTER_MIN_SKILLS")  # profile skills in title + snippet
+    
+    # ATS Boards - company job boards read directly (JSON list of "greenhouse:<slug>", "lever:<slug>", "ashby:<slug>")
+    ats_watchlist: List[str] = Field(default_factory=list, alias="ATS_WATCHLIST")
+    ats_board_concurrency: int = Field(8, alias="ATS_BOARD_CONCURRENCY")
+    ats_board_cache_path: str = Field(".cache/ats_boards.sqlite", alias="ATS_BOARD_CACHE_PATH")  # ETags + last bodies
     
     # Browser
     chrome_path: str = Field(r"C:\Program Files\Google\Chrome\Application\chrome.exe")
@@ -49,6 +171,21 @@ class Settings(BaseSettings):
         extra="ignore"
     )
     
+    def api_keys(self, provider: str) -> List[str]:
+        """All configured keys for a provider (primary, fallback, then the key list), de-duplicated."""
+        candidates = {
+            "groq": [self.groq_api_key, self.groq_api_key_fallback, *self.groq_api_keys],
+            "openrouter": [self.openrouter_api_key, self.openrouter_api_key_fallback, *self.openrouter_api_keys],
+            "gemini": [self.gemini_api_key, *self.gemini_api_keys],
+        }.get(provider, [])
+        
+        keys = []
+        for secret in candidates:
+            value = secret.get_secret_value() if secret else ""
+            if value and value not in keys:
+                keys.append(value)
+        return keys
+    
     def get_openrouter_key(self) -> str:
         if self.openrouter_api_key:
             return self.openrouter_api_key.get_secret_value()
@@ -308,6 +308,25 @@ class Console:
         bottom_line = self.BOX_T_UP.join(self.BOX_HORIZONTAL * w for w in col_widths)
         print(self._colorize(f"  {self.BOX_BOTTOM_LEFT}{bottom_line}{self.BOX_BOTTOM_RIGHT}", Colors.DIM))
     
+    # =========================================================================
+    # STREAMING
+    # =========================================================================
+    
+    def stream_chunk(self, text: str):
+        """Print a piece of streamed LLM output as it arrives (no newline)."""
+        sys.stdout.write(self._colorize(text.replace("\n", "\n  "), Colors.DIM))
+        sys.stdout.flush()
+    
+    def stream_start(self, label: str = ""):
+        """Start a streamed block."""
+        if label:
+            self.info(label)
+        sys.stdout.write("  ")
+    
+    def stream_end(self):
+        """Finish a streamed block."""
+        print()
+    
     # =========================================================================
     # PROGRESS & METRICS
     # =========================================================================
@@ -0,0 +1,82 @@
+"""
+LLM Request Hedging - Duplicate slow requests to a second provider
+Cuts tail latency on interactive paths; first answer wins, the other is cancelled
+"""
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Optional
+
+from src.core.config import settings
+
+
+# Set by `hedged_requests()` for calls made while a user is waiting
+_hedging_enabled: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_hedging", default=False)
+
+
+@contextmanager
+def hedged_requests(enabled: bool = True):
+    """
+    Enable hedging for every UnifiedLLM call made inside the block.
+    
+    Useful when the LLM calls happen deep inside helper functions
+    (e.g. interview tools) that do not take a hedge argument.
+    """
+    token = _hedging_enabled.set(enabled)
+    try:
+        yield
+    finally:
+        _hedging_enabled.reset(token)
+
+
+def hedging_requested() -> bool:
+    return _hedging_enabled.get()
+
+
+def hedge_delay(p95: Optional[float]) -> float:
+    """How long to wait on the primary before hedging: its p95, within configured bounds."""
+    if p95 is None:
+        return settings.llm_hedge_default_delay
+    return max(settings.llm_hedge_min_delay, p95)
+
+
+class HedgeBudget:
+    """
+    Caps hedged requests at a share of all provider calls.
+    
+    A small burst allowance lets the first slow call of a run hedge
+    before enough calls have been seen to earn a share.
+    """
+    
+    def __init__(self, max_ratio: Optional[float] = None, burst: int = 1):
+        self.max_ratio = max_ratio if max_ratio is not None else settings.llm_hedge_max_ratio
+        self.burst = burst
+        self.calls = 0
+        self.hedges = 0
+        self.wins = 0
+        self._lock = threading.Lock()
+    
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+    
+    def try_acquire(self) -> bool:
+        """Claim a hedge if the budget allows it."""
+        with self._lock:
+            if self.hedges < self.max_ratio * self.calls + self.burst:
+                self.hedges += 1
+                return True
+            return False
+    
+    def record_win(self):
+        """The hedge answered before the primary."""
+        with self._lock:
+            self.wins += 1
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "hedges": self.hedges, "hedge_wins": self.wins}
+
+
+# Singleton instance
+hedge_budget = HedgeBudget()
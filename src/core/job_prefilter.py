@@ -0,0 +1,77 @@
+"""
+Job Prefilter - Cheap title/snippet screen applied before any posting is fetched
+Include/exclude rules and profile-skill overlap decide which search results reach the analyst
+"""
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence
+
+from src.core.config import settings
+
+
+@lru_cache(maxsize=512)
+def _term_pattern(term: str) -> "re.Pattern":
+    # Word-ish boundaries that still work for terms like "C++", ".NET" or "Node.js"
+    return re.compile(rf"(?<![\w+#.]){re.escape(term.strip().lower())}(?![\w+#])")
+
+
+def matching_terms(terms: Iterable[str], text: str) -> List[str]:
+    """Terms found in lowercased `text` as whole words."""
+    return [term for term in terms if term.strip() and _term_pattern(term).search(text)]
+
+
+class SnippetPrefilter:
+    """
+    Screens a result by its title and snippet.
+    
+    Rules (defaults from SCOUT_PREFILTER_*), checked in order:
+    - exclude: a title containing any of these terms is dropped
+      (seniority or role words such as "staff", "intern", "manager")
+    - exclude_text: title or snippet containing any of these is dropped
+      ("security clearance", a country you cannot work in)
+    - include: when set, the title must contain at least one term
+    - min_skill_hits: title + snippet must mention at least this many
+      profile skills (0 disables the check; snippets are short)
+    
+    `check` returns the drop reason, or None to keep the result.
+    """
+    
+    def __init__(
+        self,
+        skills: Sequence[str] = (),
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        exclude_text: Optional[Sequence[str]] = None,
+        min_skill_hits: Optional[int] = None
+    ):
+        self.skills = list(dict.fromkeys(s.strip() for s in skills if s.strip()))
+        self.include = list(settings.scout_prefilter_include if include is None else include)
+        self.exclude = list(settings.scout_prefilter_exclude if exclude is None else exclude)
+        self.exclude_text = list(settings.scout_prefilter_exclude_text if exclude_text is None else exclude_text)
+        self.min_skill_hits = settings.scout_prefilter_min_skills if min_skill_hits is None else min_skill_hits
+    
+    def skill_hits(self, title: str, snippet: str = "") -> List[str]:
+        """Profile skills mentioned in the title or snippet."""
+        return matching_terms(self.skills, f"{title}\n{snippet}".lower())
+    
+    def check(self, title: str, snippet: str = "") -> Optional[str]:
+        title_text = (title or "").lower()
+        full_text = f"{title_text}\n{(snippet or '').lower()}"
+        
+        excluded = matching_terms(self.exclude, title_text)
+        if excluded:
+            return f"title has excluded term '{excluded[0]}'"
+        
+        excluded = matching_terms(self.exclude_text, full_text)
+        if excluded:
+            return f"mentions excluded term '{excluded[0]}'"
+        
+        if self.include and not matching_terms(self.include, title_text):
+            return "title matches no include term"
+        
+        if self.min_skill_hits > 0:
+            hits = len(self.skill_hits(title, snippet))
+            if hits < self.min_skill_hits:
+                return f"mentions {hits} profile skills (< {self.min_skill_hits})"
+        
+        return None
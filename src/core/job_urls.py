@@ -0,0 +1,217 @@
+"""
+Job URL Canonicalization - Stable (platform, company, posting id) keys for ATS postings
+Plus a persistent seen-set so postings processed in earlier runs are dropped before any fetch
+"""
+import re
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, unquote
+from typing import Iterable, NamedTuple, Optional, Set, Tuple
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+_UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
+_NUMERIC = re.compile(r"^\d+$")
+
+
+class JobKey(NamedTuple):
+    """Identity of a posting, independent of how its URL was spelled."""
+    platform: str
+    company: str
+    posting_id: str
+    
+    @property
+    def id(self) -> str:
+        return f"{self.platform}:{self.company}:{self.posting_id}"
+
+
+def _greenhouse(host: str, parts: list, query: dict) -> Optional[Tuple[str, str, str]]:
+    # boards.greenhouse.io/embed/job_app?for=acme&token=123
+    if parts[:1] == ["embed"]:
+        company, posting = query.get("for", [""])[0], query.get("token", [""])[0]
+    # (job-)boards(.eu).greenhouse.io/acme/jobs/123[/...]
+    elif len(parts) >= 3 and parts[1] == "jobs":
+        company, posting = parts[0], parts[2]
+    # boards.greenhouse.io/acme?gh_jid=123
+    elif parts and "gh_jid" in query:
+        company, posting = parts[0], query["gh_jid"][0]
+    else:
+        return None
+    
+    if not company or not _NUMERIC.match(posting):
+        return None
+    board = "job-boards.eu.greenhouse.io" if ".eu." in f".{host}" else "job-boards.greenhouse.io"
+    return company, posting, f"https://{board}/{company}/jobs/{posting}"
+
+
+def _lever(host: str, parts: list, query: dict) -> Optional[Tuple[str, str, str]]:
+    # jobs(.eu).lever.co/acme/<uuid>[/apply]
+    if len(parts) < 2 or not _UUID.match(parts[1]):
+        return None
+    board = "jobs.eu.lever.co" if ".eu." in f".{host}" else "jobs.lever.co"
+    return parts[0], parts[1], f"https://{board}/{parts[0]}/{parts[1]}"
+
+
+def _ashby(host: str, parts: list, query: dict) -> Optional[Tuple[str, str, str]]:
+    # jobs.ashbyhq.com/acme/<uuid>[/application]
+    if len(parts) < 2 or not _UUID.match(parts[1]):
+        return None
+    return parts[0], parts[1], f"https://jobs.ashbyhq.com/{parts[0]}/{parts[1]}"
+
+
+_PLATFORMS = {
+    "greenhouse.io": ("greenhouse", _greenhouse),
+    "lever.co": ("lever", _lever),
+    "ashbyhq.com": ("ashby", _ashby),
+}
+
+
+def canonicalize(url: str) -> Optional[Tuple[JobKey, str]]:
+    """
+    (JobKey, canonical URL) for a Greenhouse, Lever or Ashby posting URL.
+    
+    Tracking params, /apply and /application suffixes, trailing slashes,
+    boards. vs job-boards. hosts and embed links all map to the same key.
+    Returns None for anything that is not a recognizable posting.
+    """
+    try:
+        parts = urlsplit((url or "").strip())
+    except ValueError:
+        return None
+    
+    host = (parts.hostname or "").lower()
+    for domain, (platform, parse) in _PLATFORMS.items():
+        if host == domain or host.endswith(f".{domain}"):
+            path = [unquote(p) for p in parts.path.split("/") if p]
+            parsed = parse(host, path, parse_qs(parts.query))
+            if parsed is None:
+                return None
+            company, posting, canonical = parsed
+            return JobKey(platform, company.lower(), posting.lower()), canonical
+    return None
+
+
+def job_key(url: str) -> Optional[JobKey]:
+    """Just the key of `url`, or None if it is not a recognizable posting."""
+    parsed = canonicalize(url)
+    return parsed[0] if parsed else None
+
+
+# ============================================
+# Seen-set
+# ============================================
+
+class SeenJobs:
+    """
+    Persistent set of posting keys that have already been processed.
+    
+    Keys live in a SQLite table (the on-disk index) and are loaded into
+    a memory set on first use, so membership checks cost no I/O. With no
+    path the set is memory-only. `warm_from_discovered_jobs` seeds it
+    from the Supabase discovered_jobs table once per process.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self.warmed = False
+        
+        self._keys: Optional[Set[str]] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        
+        if self._conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS seen_jobs (key TEXT PRIMARY KEY, url TEXT, seen_at REAL NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Seen-jobs index unavailable ({self.path}): {e}")
+                self.path = None
+                self._conn = None
+        
+        return self._conn
+    
+    def _loaded(self) -> Set[str]:
+        if self._keys is None:
+            self._keys = set()
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    self._keys.update(row[0] for row in conn.execute("SELECT key FROM seen_jobs"))
+                except sqlite3.Error as e:
+                    logger.warning(f"Seen-jobs index read failed: {e}")
+        return self._keys
+    
+    def __contains__(self, url: str) -> bool:
+        key = job_key(url)
+        with self._lock:
+            return key is not None and key.id in self._loaded()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._loaded())
+    
+    def add(self, urls: Iterable[str]) -> int:
+        """Mark postings as processed; returns how many were new."""
+        now = time.time()
+        rows = []
+        with self._lock:
+            keys = self._loaded()
+            for url in urls:
+                key = job_key(url)
+                if key is not None and key.id not in keys:
+                    keys.add(key.id)
+                    rows.append((key.id, url, now))
+            
+            conn = self._connect()
+            if rows and conn is not None:
+                try:
+                    conn.executemany("INSERT OR IGNORE INTO seen_jobs (key, url, seen_at) VALUES (?, ?, ?)", rows)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Seen-jobs index write failed: {e}")
+        return len(rows)
+    
+    def warm_from_discovered_jobs(self) -> int:
+        """Seed the set from discovered_jobs (once per process)."""
+        if self.warmed:
+            return 0
+        self.warmed = True
+        
+        try:
+            from src.services.db_service import db_service
+            added = self.add(db_service.get_discovered_urls())
+        except Exception as e:
+            logger.warning(f"Could not warm seen-jobs index: {e}")
+            return 0
+        
+        if added:
+            logger.info(f"Seen-jobs index warmed with {added} postings from discovered_jobs")
+        return added
+
+
+# Singleton instance
+_seen_instance: Optional[SeenJobs] = None
+
+
+def get_seen_jobs() -> SeenJobs:
+    """Get or create the process-wide seen-jobs index."""
+    global _seen_instance
+    
+    if _seen_instance is None:
+        _seen_instance = SeenJobs(path=settings.seen_jobs_path or None)
+    
+    return _seen_instance
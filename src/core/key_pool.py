@@ -0,0 +1,90 @@
+"""
+API Key Pool - Spread traffic across every configured key of a provider
+Keys are ranked by remaining rate-limit quota; a key cooling down after a 429 goes to the back
+"""
+import logging
+import threading
+from typing import Dict, List
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class KeyPool:
+    """
+    N-key pool per provider.
+    
+    Keys come from settings (primary, fallback and the *_API_KEYS list).
+    Ranking uses the shared rate limiter's per-key headroom, so quota
+    reservations, provider headers and 429 cooldowns all feed into it;
+    keys with equal headroom are rotated so idle keys share the load.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cursor: Dict[str, int] = {}
+    
+    def keys(self, provider: str) -> List[str]:
+        return settings.api_keys(provider)
+    
+    def ranked(self, provider: str, keys: List[str] = None) -> List[str]:
+        """Keys for a provider, most remaining quota first."""
+        from src.core.rate_limiter import rate_limiter
+        
+        keys = list(keys if keys is not None else self.keys(provider))
+        if len(keys) < 2:
+            return keys
+        
+        with self._lock:
+            cursor = self._cursor.get(provider, 0)
+            self._cursor[provider] = cursor + 1
+        
+        def rank(item):
+            index, key = item
+            headroom = round(rate_limiter.headroom(provider, key), 2)
+            return (-headroom, (index - cursor) % len(keys))
+        
+        return [key for _, key in sorted(enumerate(keys), key=rank)]
+    
+    def best(self, provider: str) -> str:
+        """The key with the most remaining quota right now."""
+        ranked = self.ranked(provider)
+        if not ranked:
+            raise ValueError(f"No API keys configured for {provider}")
+        return ranked[0]
+    
+    def balance(self, configs: list) -> list:
+        """
+        Re-rank the keys of each provider within an ordered LLMConfig chain.
+        
+        Each provider keeps the slots it was given (so latency ordering
+        between providers is preserved); which of its keys fills which slot
+        is decided by remaining quota.
+        """
+        by_provider: Dict[str, list] = {}
+        for config in configs:
+            by_provider.setdefault(config.provider.value, []).append(config)
+        
+        queues = {}
+        for provider, group in by_provider.items():
+            order = self.ranked(provider, [config.api_key for config in group])
+            queues[provider] = sorted(group, key=lambda config: order.index(config.api_key))
+        
+        return [queues[config.provider.value].pop(0) for config in configs]
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Headroom per key (keys shown by their last 4 characters)."""
+        from src.core.rate_limiter import rate_limiter
+        
+        return {
+            provider: {
+                f"...{key[-4:]}": round(rate_limiter.headroom(provider, key), 3)
+                for key in self.keys(provider)
+            }
+            for provider in ("groq", "openrouter", "gemini")
+        }
+
+
+# Singleton instance
+key_pool = KeyPool()
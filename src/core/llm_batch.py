@@ -0,0 +1,248 @@
+"""
+LLM Batch Mode - Submit bulk chat requests through provider batch APIs
+JSONL batches are uploaded, polled until done, and results mapped back by custom_id
+"""
+import json
+import time
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from src.core.llm_provider import LLMError
+
+logger = logging.getLogger(__name__)
+
+
+GROQ_OPENAI_BASE_URL = "https://api.groq.com/openai/v1"
+
+# Terminal states of the OpenAI-style batch object
+DONE_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchError(LLMError):
+    """A batch could not be submitted or did not complete."""
+    pass
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one request in a batch."""
+    custom_id: str
+    content: Optional[str] = None
+    usage: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.content is not None
+
+
+def request_line(custom_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """One JSONL line for the /v1/chat/completions batch endpoint."""
+    return {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}
+
+
+def parse_output_line(line: Dict[str, Any]) -> BatchResult:
+    """Read one line of a batch output/error file."""
+    custom_id = line.get("custom_id", "")
+    response = line.get("response") or {}
+    body = response.get("body") or {}
+    
+    if line.get("error") or response.get("status_code", 200) >= 400:
+        error = line.get("error") or body.get("error") or f"status {response.get('status_code')}"
+        return BatchResult(custom_id, error=str(error))
+    
+    try:
+        content = body["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return BatchResult(custom_id, error="malformed batch response")
+    
+    return BatchResult(custom_id, content=content, usage=body.get("usage") or {})
+
+
+# ============================================
+# Backends
+# ============================================
+
+class BatchBackend(ABC):
+    """Interface of a batch endpoint: submit lines, poll status, fetch results."""
+    
+    name = "batch"
+    
+    @abstractmethod
+    def submit(self, lines: List[Dict[str, Any]]) -> str:
+        pass
+    
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        pass
+    
+    @abstractmethod
+    def results(self, batch_id: str) -> Dict[str, BatchResult]:
+        pass
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """
+    OpenAI-style batch API (/files + /batches), as served by Groq and OpenAI.
+    
+    Requests are uploaded as a JSONL file with purpose "batch"; results
+    come back as output and error files keyed by custom_id.
+    """
+    
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        completion_window: str = "24h",
+        name: str = "groq",
+        http_client: Optional[httpx.Client] = None
+    ):
+        self.name = name
+        self.completion_window = completion_window
+        self.client = http_client or httpx.Client(timeout=60.0)
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"Authorization": f"Bearer {api_key}"}
+    
+    def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        response = self.client.request(method, f"{self.base_url}{path}", headers=self.headers, **kwargs)
+        if response.status_code >= 400:
+            raise BatchError(f"{self.name} batch API {method} {path} failed: {response.status_code} {response.text[:200]}")
+        return response
+    
+    def submit(self, lines: List[Dict[str, Any]]) -> str:
+        payload = "\n".join(json.dumps(line) for line in lines).encode("utf-8")
+        uploaded = self._request(
+            "POST", "/files",
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", payload, "application/jsonl")}
+        ).json()
+        
+        batch = self._request("POST", "/batches", json={
+            "input_file_id": uploaded["id"],
+            "endpoint": "/v1/chat/completions",
+            "completion_window": self.completion_window,
+        }).json()
+        return batch["id"]
+    
+    def status(self, batch_id: str) -> str:
+        return self._request("GET", f"/batches/{batch_id}").json().get("status", "unknown")
+    
+    def results(self, batch_id: str) -> Dict[str, BatchResult]:
+        batch = self._request("GET", f"/batches/{batch_id}").json()
+        
+        results = {}
+        for file_key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(file_key)
+            if not file_id:
+                continue
+            content = self._request("GET", f"/files/{file_id}/content").text
+            for raw in content.splitlines():
+                if raw.strip():
+                    result = parse_output_line(json.loads(raw))
+                    results[result.custom_id] = result
+        return results
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    In-process stand-in for a batch endpoint.
+    
+    Each request body is passed to `complete` on a background thread and
+    the answers are stored in the same output format as the real API, so
+    callers cannot tell the difference (except for the price).
+    """
+    
+    name = "local"
+    
+    def __init__(self, complete: Callable[[Dict[str, Any]], str]):
+        self.complete = complete
+        self._lock = threading.Lock()
+        self._batches: Dict[str, Dict[str, Any]] = {}
+    
+    def submit(self, lines: List[Dict[str, Any]]) -> str:
+        with self._lock:
+            batch_id = f"local_batch_{len(self._batches) + 1}"
+            self._batches[batch_id] = {"status": "in_progress", "output": []}
+        
+        threading.Thread(target=self._process, args=(batch_id, lines), daemon=True).start()
+        return batch_id
+    
+    def _process(self, batch_id: str, lines: List[Dict[str, Any]]):
+        output = []
+        for line in lines:
+            try:
+                content = self.complete(line["body"])
+                output.append({
+                    "custom_id": line["custom_id"],
+                    "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}},
+                })
+            except Exception as e:
+                output.append({"custom_id": line["custom_id"], "error": str(e)})
+        
+        with self._lock:
+            self._batches[batch_id] = {"status": "completed", "output": output}
+    
+    def status(self, batch_id: str) -> str:
+        with self._lock:
+            return self._batches[batch_id]["status"]
+    
+    def results(self, batch_id: str) -> Dict[str, BatchResult]:
+        with self._lock:
+            output = list(self._batches[batch_id]["output"])
+        return {line["custom_id"]: parse_output_line(line) for line in output}
+
+
+# ============================================
+# Running Batches
+# ============================================
+
+def run_batch(
+    backend: BatchBackend,
+    lines: List[Dict[str, Any]],
+    poll_interval: float = 30.0,
+    timeout: float = 86400.0
+) -> Dict[str, BatchResult]:
+    """Submit a batch and block until it finishes (or `timeout` passes)."""
+    batch_id = backend.submit(lines)
+    logger.info(f"Submitted {backend.name} batch {batch_id} with {len(lines)} requests")
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        status = backend.status(batch_id)
+        if status in DONE_STATES:
+            break
+        if time.monotonic() >= deadline:
+            raise BatchError(f"Batch {batch_id} did not finish within {timeout:.0f}s (status: {status})")
+        time.sleep(poll_interval)
+    
+    logger.info(f"Batch {batch_id} finished: {status}")
+    return backend.results(batch_id)
+
+
+async def arun_batch(
+    backend: BatchBackend,
+    lines: List[Dict[str, Any]],
+    poll_interval: float = 30.0,
+    timeout: float = 86400.0
+) -> Dict[str, BatchResult]:
+    """Async version of run_batch (backend calls run in a worker thread)."""
+    batch_id = await asyncio.to_thread(backend.submit, lines)
+    logger.info(f"Submitted {backend.name} batch {batch_id} with {len(lines)} requests")
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        status = await asyncio.to_thread(backend.status, batch_id)
+        if status in DONE_STATES:
+            break
+        if time.monotonic() >= deadline:
+            raise BatchError(f"Batch {batch_id} did not finish within {timeout:.0f}s (status: {status})")
+        await asyncio.sleep(poll_interval)
+    
+    logger.info(f"Batch {batch_id} finished: {status}")
+    return await asyncio.to_thread(backend.results, batch_id)
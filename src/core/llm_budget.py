@@ -0,0 +1,132 @@
+"""
+LLM Run Budget - Token, call and spend limits for one workflow run
+Stages step down (no cover letter, small model, no tailoring) as the budget runs low instead of failing mid-job
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Degradation steps, in the order they kick in
+SKIP_COVER_LETTER = "skip_cover_letter"
+SMALL_MODEL = "small_model"
+STOP_TAILORING = "stop_tailoring"
+STOP = "stop"
+
+# Callers whose spend counts against another stage's limits
+STAGE_CALLERS = {
+    "analyst": ("analyst", "analyst_triage"),
+}
+
+
+@dataclass
+class BudgetLimits:
+    """Limits for a run or one stage (None = unlimited)."""
+    max_tokens: Optional[int] = None
+    max_calls: Optional[int] = None
+    max_cost: Optional[float] = None
+    
+    def is_unlimited(self) -> bool:
+        return self.max_tokens is None and self.max_calls is None and self.max_cost is None
+
+
+@dataclass
+class RunBudget:
+    """
+    Budget for one JobApplicationWorkflow run.
+    
+    Usage is read from llm_metrics (which the workflow resets at the
+    start of each run), so every UnifiedLLM call and DeepAgent callback
+    counts. Stages are caller labels ("analyst", "resume",
+    "cover_letter", ...); STAGE_CALLERS folds helper callers such as
+    "analyst_triage" into their stage. The tightest of the run and stage limits
+    decides how much is left.
+    """
+    run: BudgetLimits = field(default_factory=BudgetLimits)
+    stages: Dict[str, BudgetLimits] = field(default_factory=dict)
+    
+    def usage(self, stage: Optional[str] = None) -> Dict[str, float]:
+        from src.core.llm_metrics import llm_metrics
+        
+        callers = STAGE_CALLERS.get(stage, (stage,))
+        records = [r for r in llm_metrics.records() if stage is None or r.caller in callers]
+        return {
+            "tokens": sum(r.prompt_tokens + r.completion_tokens for r in records),
+            "calls": sum(not r.cached for r in records),
+            "cost": sum(r.cost for r in records),
+        }
+    
+    @staticmethod
+    def _fraction_left(limits: BudgetLimits, usage: Dict[str, float]) -> float:
+        fractions = [1.0]
+        for limit, used in (
+            (limits.max_tokens, usage["tokens"]),
+            (limits.max_calls, usage["calls"]),
+            (limits.max_cost, usage["cost"]),
+        ):
+            if limit is not None:
+                fractions.append(max(0.0, 1.0 - used / limit) if limit > 0 else 0.0)
+        return min(fractions)
+    
+    def remaining(self, stage: Optional[str] = None) -> float:
+        """Fraction of the budget left for `stage` (or the whole run), 0.0-1.0."""
+        left = self._fraction_left(self.run, self.usage())
+        if stage is not None and stage in self.stages:
+            left = min(left, self._fraction_left(self.stages[stage], self.usage(stage)))
+        return left
+    
+    def exhausted(self, stage: Optional[str] = None) -> bool:
+        return self.remaining(stage) <= 0.0
+    
+    def degradation(self, stage: Optional[str] = None) -> List[str]:
+        """
+        Steps in effect for the next job, given what is left.
+        
+        Thresholds come from LLM_BUDGET_DEGRADE_AT (fraction left at which
+        each step starts); an exhausted budget stops the run.
+        """
+        left = self.remaining(stage)
+        if left <= 0.0:
+            return [SKIP_COVER_LETTER, SMALL_MODEL, STOP_TAILORING, STOP]
+        
+        thresholds = settings.llm_budget_degrade_at
+        return [
+            step for step in (SKIP_COVER_LETTER, SMALL_MODEL, STOP_TAILORING)
+            if left <= thresholds.get(step, 0.0)
+        ]
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Usage and remaining fraction for the run and each limited stage."""
+        rows = {"run": {**self.usage(), "remaining": round(self.remaining(), 3)}}
+        for stage in self.stages:
+            rows[stage] = {**self.usage(stage), "remaining": round(self.remaining(stage), 3)}
+        return rows
+
+
+def parse_stage_limits(specs: Iterable[str]) -> Dict[str, BudgetLimits]:
+    """
+    Parse CLI stage limits like "cover_letter:tokens=5000,calls=4" or "resume:cost=0.02".
+    """
+    stages: Dict[str, BudgetLimits] = {}
+    for spec in specs or []:
+        stage, _, limits = spec.partition(":")
+        if not stage or not limits:
+            raise ValueError(f"Invalid stage budget '{spec}' (expected stage:tokens=N,calls=N,cost=X)")
+        
+        budget = stages.setdefault(stage.strip(), BudgetLimits())
+        for item in limits.split(","):
+            kind, _, value = item.partition("=")
+            kind = kind.strip()
+            if kind == "tokens":
+                budget.max_tokens = int(value)
+            elif kind == "calls":
+                budget.max_calls = int(value)
+            elif kind == "cost":
+                budget.max_cost = float(value)
+            else:
+                raise ValueError(f"Unknown budget limit '{kind}' in '{spec}'")
+    return stages
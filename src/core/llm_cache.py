@@ -0,0 +1,266 @@
+"""
+LLM Response Cache - Two-tier prompt/response cache for deterministic calls
+Memory LRU in front of a SQLite store, with TTL and size-bounded eviction
+"""
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    Prompt-response cache keyed by a hash of provider, model,
+    temperature and messages.
+    
+    Tiers:
+    1. In-memory LRU (hot entries for the current process)
+    2. SQLite on disk (survives across runs)
+    
+    Entries expire after `ttl_seconds`; each tier evicts its least
+    recently used entries once it grows past its size bound.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_memory_entries: int = 512,
+        max_disk_entries: int = 5000
+    ):
+        self.path = Path(path) if path else None
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.writes = 0
+        self.evictions = 0
+    
+    # ============================================
+    # Keys
+    # ============================================
+    
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, messages: Iterable[Dict[str, Any]]) -> str:
+        """Stable hash of everything that determines the response."""
+        payload = json.dumps(
+            {
+                "provider": provider,
+                "model": model,
+                "temperature": round(float(temperature), 4),
+                "messages": [[m.get("role", "user"), m.get("content", "")] for m in messages],
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    # ============================================
+    # Disk tier
+    # ============================================
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        
+        if self._conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        expires_at REAL NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                    """
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM disk cache unavailable ({self.path}): {e}")
+                self.path = None
+                self._conn = None
+        
+        return self._conn
+    
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        conn = self._connect()
+        if conn is None:
+            return None
+        
+        row = conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        
+        value, expires_at = row
+        if expires_at <= now:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            conn.commit()
+            return None
+        
+        conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        conn.commit()
+        return value, expires_at
+    
+    def _disk_set(self, key: str, value: str, expires_at: float, now: float):
+        conn = self._connect()
+        if conn is None:
+            return
+        
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, value, expires_at, now)
+        )
+        
+        # Drop expired rows, then trim least recently used past the bound
+        conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > self.max_disk_entries:
+            overflow = count - self.max_disk_entries
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+        conn.commit()
+    
+    # ============================================
+    # Memory tier
+    # ============================================
+    
+    def _memory_set(self, key: str, value: str, expires_at: float):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+    
+    # ============================================
+    # Public API
+    # ============================================
+    
+    def get(self, keys: List[str]) -> Optional[str]:
+        """
+        Return the first cached response among `keys`.
+        
+        Counts a single hit or miss per lookup, however many keys are tried.
+        """
+        now = time.time()
+        
+        with self._lock:
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry is not None:
+                    value, expires_at = entry
+                    if expires_at > now:
+                        self._memory.move_to_end(key)
+                        self.hits += 1
+                        self.memory_hits += 1
+                        return value
+                    del self._memory[key]
+            
+            for key in keys:
+                try:
+                    entry = self._disk_get(key, now)
+                except sqlite3.Error as e:
+                    logger.warning(f"LLM disk cache read failed: {e}")
+                    entry = None
+                
+                if entry is not None:
+                    value, expires_at = entry
+                    self._memory_set(key, value, expires_at)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+            
+            self.misses += 1
+            return None
+    
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None):
+        """Store a response in both tiers."""
+        now = time.time()
+        expires_at = now + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        
+        with self._lock:
+            self._memory_set(key, value, expires_at)
+            try:
+                self._disk_set(key, value, expires_at, now)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM disk cache write failed: {e}")
+            self.writes += 1
+    
+    def delete(self, keys: List[str]):
+        """Drop `keys` from both tiers (e.g. a response that failed validation)."""
+        with self._lock:
+            for key in keys:
+                self._memory.pop(key, None)
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    conn.executemany("DELETE FROM llm_cache WHERE key = ?", [(key,) for key in keys])
+                    conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"LLM disk cache delete failed: {e}")
+    
+    def clear(self):
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            if conn is not None:
+                conn.execute("DELETE FROM llm_cache")
+                conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+        }
+
+
+# Singleton instance
+_cache_instance: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Get or create the process-wide LLM response cache."""
+    global _cache_instance
+    
+    if _cache_instance is None:
+        _cache_instance = LLMCache(
+            path=settings.llm_cache_path or None,
+            ttl_seconds=settings.llm_cache_ttl_hours * 3600,
+            max_memory_entries=settings.llm_cache_memory_entries,
+            max_disk_entries=settings.llm_cache_disk_entries
+        )
+    
+    return _cache_instance
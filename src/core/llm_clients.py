@@ -0,0 +1,322 @@
+"""
+LLM Client Registry - Process-wide pool of reusable chat-model clients
+Shares keep-alive HTTP connection pools per provider across all agents
+"""
+import json
+import asyncio
+import threading
+import logging
+from typing import Optional, Dict, Tuple, Any
+
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatResult
+
+from src.core.config import settings
+from src.core.llm_provider import LLMProvider, LLMConfig, LLMError, is_rate_limit_error
+
+logger = logging.getLogger(__name__)
+
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+
+def _request_model(request: httpx.Request) -> str:
+    """Model named in an OpenAI-style JSON request body ("" if unknown)."""
+    try:
+        return str(json.loads(request.content or b"{}").get("model") or "")
+    except (ValueError, AttributeError, httpx.RequestNotRead):
+        return ""
+
+
+def _rate_limit_hook(provider: LLMProvider):
+    """
+    Build an httpx response hook that feeds rate-limit headers to the limiter.
+    
+    The key is read back from the request's bearer token and the model
+    from its JSON body, so one pool can serve several keys and models for
+    the same provider.
+    """
+    from src.core.rate_limiter import rate_limiter
+    
+    def hook(response: httpx.Response):
+        auth = response.request.headers.get("authorization", "")
+        if not auth.lower().startswith("bearer "):
+            return
+        try:
+            model = _request_model(response.request)
+            rate_limiter.observe_headers(provider.value, auth[7:].strip(), response.headers, model)
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable rate-limit headers: {e}")
+    
+    return hook
+
+
+class ClientRegistry:
+    """
+    Registry of chat-model clients keyed by (provider, key, model, temperature).
+    
+    Every client for a provider shares one sync and one async httpx pool,
+    so connection setup and TLS handshakes are paid once per provider
+    instead of once per call.
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 120.0
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[LLMProvider, str, str, float], Any] = {}
+        self._http_clients: Dict[LLMProvider, httpx.Client] = {}
+        self._async_http_clients: Dict[LLMProvider, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.created = 0
+        self.reused = 0
+    
+    def _http_client(self, provider: LLMProvider) -> httpx.Client:
+        if provider not in self._http_clients:
+            self._http_clients[provider] = httpx.Client(
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={"response": [_rate_limit_hook(provider)]}
+            )
+        return self._http_clients[provider]
+    
+    def _async_http_client(self, provider: LLMProvider) -> httpx.AsyncClient:
+        if provider not in self._async_http_clients:
+            sync_hook = _rate_limit_hook(provider)
+            
+            async def hook(response: httpx.Response):
+                sync_hook(response)
+            
+            self._async_http_clients[provider] = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={"response": [hook]}
+            )
+        return self._async_http_clients[provider]
+    
+    def _check_event_loop(self):
+        """
+        Drop async pools bound to a previous event loop.
+        
+        Pooled async connections cannot outlive the loop that opened them,
+        so a new loop (e.g. a second asyncio.run) gets fresh clients.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        
+        if self._loop is None:
+            self._loop = loop
+        elif self._loop is not loop:
+            logger.debug("Event loop changed, rebuilding async LLM clients")
+            self._async_http_clients.clear()
+            self._clients.clear()
+            self._loop = loop
+    
+    def _build(self, provider: LLMProvider, api_key: str, model: str, temperature: float):
+        """Create a chat model wired to the shared connection pools."""
+        if provider == LLMProvider.GROQ:
+            from langchain_groq import ChatGroq
+            return ChatGroq(
+                model=model,
+                temperature=temperature,
+                api_key=api_key,
+                http_client=self._http_client(provider),
+                http_async_client=self._async_http_client(provider)
+            )
+        
+        elif provider == LLMProvider.OPENROUTER:
+            from langchain_openai import ChatOpenAI
+            return ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=api_key,
+                base_url=OPENROUTER_BASE_URL,
+                http_client=self._http_client(provider),
+                http_async_client=self._async_http_client(provider)
+            )
+        
+        elif provider == LLMProvider.GEMINI:
+            # The Google client manages its own transport; reuse the instance
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            return ChatGoogleGenerativeAI(
+                model=model,
+                temperature=temperature,
+                google_api_key=api_key
+            )
+        
+        elif provider == LLMProvider.LOCAL:
+            # Ollama and llama.cpp both serve the OpenAI chat API
+            from langchain_openai import ChatOpenAI
+            return ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=api_key,
+                base_url=settings.local_llm_base_url,
+                http_client=self._http_client(provider),
+                http_async_client=self._async_http_client(provider)
+            )
+        
+        elif provider == LLMProvider.SIMULATED:
+            # No network; the key names the simulated endpoint
+            from src.core.llm_simulator import build_simulated_model
+            return build_simulated_model(model, api_key)
+        
+        else:
+            raise LLMError(f"Unknown provider: {provider}")
+    
+    def get(
+        self,
+        provider: LLMProvider,
+        api_key: str,
+        model: str,
+        temperature: float = 0.3
+    ):
+        """Get a pooled chat model, creating it on first use."""
+        key = (provider, api_key, model, float(temperature))
+        
+        with self._lock:
+            self._check_event_loop()
+            
+            client = self._clients.get(key)
+            if client is None:
+                client = self._build(provider, api_key, model, temperature)
+                self._clients[key] = client
+                self.created += 1
+            else:
+                self.reused += 1
+            
+            return client
+    
+    def from_config(self, config: LLMConfig):
+        """Get a pooled chat model for an LLMConfig."""
+        return self.get(config.provider, config.api_key, config.model, config.temperature)
+    
+    def stats(self) -> Dict[str, int]:
+        """Registry usage counters."""
+        return {
+            "clients": len(self._clients),
+            "created": self.created,
+            "reused": self.reused,
+        }
+    
+    def close(self):
+        """Close shared sync pools and forget all clients."""
+        with self._lock:
+            for client in self._http_clients.values():
+                client.close()
+            self._http_clients.clear()
+            self._async_http_clients.clear()
+            self._clients.clear()
+            self._loop = None
+
+
+# Singleton instance
+client_registry = ClientRegistry()
+
+
+def get_chat_model(
+    provider: LLMProvider,
+    api_key: str,
+    model: str,
+    temperature: float = 0.3
+):
+    """Get a pooled chat model from the process-wide registry."""
+    return client_registry.get(provider, api_key, model, temperature)
+
+
+# ============================================
+# Pooled Chat Model (for DeepAgents)
+# ============================================
+
+class PooledChatModel(BaseChatModel):
+    """
+    Chat model that sends each call through the provider's key pool.
+    
+    DeepAgents need a single LangChain chat model; this one picks the key
+    with the most remaining quota per call and moves on to the next key
+    when one is rate limited, so agent traffic is spread over every key.
+    """
+    
+    provider: LLMProvider
+    model: str
+    temperature: float = 0.3
+    
+    @property
+    def _llm_type(self) -> str:
+        return f"pooled-{self.provider.value}"
+    
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"provider": self.provider.value, "model": self.model, "temperature": self.temperature}
+    
+    def _get_ls_params(self, stop=None, **kwargs):
+        params = super()._get_ls_params(stop=stop, **kwargs)
+        params["ls_provider"] = self.provider.value
+        params["ls_model_name"] = self.model
+        return params
+    
+    def _client(self, api_key: str):
+        return client_registry.get(self.provider, api_key, self.model, self.temperature)
+    
+    def _keys(self) -> list:
+        from src.core.key_pool import key_pool
+        keys = key_pool.ranked(self.provider.value)
+        if not keys:
+            raise LLMError(f"No API keys configured for {self.provider.value}")
+        return keys
+    
+    def _on_error(self, api_key: str, error: Exception) -> bool:
+        """Cool the key down on a 429; returns True to try the next key."""
+        from src.core.rate_limiter import rate_limiter
+        
+        if not is_rate_limit_error(error):
+            return False
+        logger.warning(f"Rate limit on pooled {self.provider.value} key ...{api_key[-4:]}, trying next key")
+        rate_limiter.penalize(self.provider.value, api_key, error, 5.0, self.model)
+        return True
+    
+    def bind_tools(self, tools, **kwargs):
+        # Let the provider's client format the tools, then bind them to the pool
+        binding = self._client(self._keys()[0]).bind_tools(tools, **kwargs)
+        return self.bind(**binding.kwargs)
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        last_error = None
+        for api_key in self._keys():
+            try:
+                return self._client(api_key)._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                if not self._on_error(api_key, e):
+                    raise
+                last_error = e
+        raise last_error
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        last_error = None
+        for api_key in self._keys():
+            try:
+                return await self._client(api_key)._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                if not self._on_error(api_key, e):
+                    raise
+                last_error = e
+        raise last_error
+
+
+def get_pooled_chat_model(provider: LLMProvider, model: str, temperature: float = 0.3) -> PooledChatModel:
+    """Chat model that balances calls over every configured key of a provider."""
+    return PooledChatModel(provider=provider, model=model, temperature=temperature)
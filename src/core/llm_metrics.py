@@ -0,0 +1,199 @@
+"""
+LLM Usage Metrics - Per-call token, latency and cost accounting
+Every call is tagged with a caller label so expensive stages can be found and budgeted
+"""
+import json
+import time
+import logging
+import threading
+import contextvars
+from pathlib import Path
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Optional, List, Dict, Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Caller label for calls that do not pass one explicitly
+_current_caller: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_caller", default=None)
+
+
+@contextmanager
+def llm_caller(label: str):
+    """Tag every LLM call made inside the block with `label`."""
+    token = _current_caller.set(label)
+    try:
+        yield
+    finally:
+        _current_caller.reset(token)
+
+
+def current_caller() -> Optional[str]:
+    return _current_caller.get()
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost from the per-model price table (prices per million tokens)."""
+    prices = settings.llm_pricing.get(model)
+    if not prices:
+        return 0.0
+    return (prompt_tokens * prices.get("input", 0.0) + completion_tokens * prices.get("output", 0.0)) / 1_000_000
+
+
+@dataclass
+class LLMCallRecord:
+    """One LLM call as seen by the caller."""
+    caller: str
+    provider: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    retries: int = 0
+    fallback_hops: int = 0
+    cached: bool = False
+    streamed: bool = False
+    hedged: bool = False
+    batched: bool = False
+    task: Optional[str] = None
+    sla_missed: bool = False
+    success: bool = True
+    cost: float = 0.0
+    timestamp: float = field(default_factory=time.time)
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class LLMMetrics:
+    """
+    In-process registry of LLM call records.
+    
+    Query with `summary()` (aggregated per caller) or `records()`,
+    and persist with `to_json()`.
+    """
+    
+    def __init__(self):
+        self._records: List[LLMCallRecord] = []
+        self._lock = threading.Lock()
+    
+    def record(self, record: LLMCallRecord):
+        if not record.cost and record.success and not record.cached:
+            record.cost = estimate_cost(record.model, record.prompt_tokens, record.completion_tokens)
+        with self._lock:
+            self._records.append(record)
+    
+    def records(self, caller: Optional[str] = None) -> List[LLMCallRecord]:
+        with self._lock:
+            return [r for r in self._records if caller is None or r.caller == caller]
+    
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Aggregate records per caller (plus a "total" row)."""
+        from src.core.provider_health import percentile
+        
+        groups: Dict[str, List[LLMCallRecord]] = {}
+        for record in self.records():
+            groups.setdefault(record.caller, []).append(record)
+            groups.setdefault("total", []).append(record)
+        
+        summary = {}
+        for caller, records in groups.items():
+            latencies = [r.latency for r in records if r.success and not r.cached]
+            summary[caller] = {
+                "calls": len(records),
+                "cached": sum(r.cached for r in records),
+                "batched": sum(r.batched for r in records),
+                "sla_misses": sum(r.sla_missed for r in records),
+                "failures": sum(not r.success for r in records),
+                "prompt_tokens": sum(r.prompt_tokens for r in records),
+                "completion_tokens": sum(r.completion_tokens for r in records),
+                "total_tokens": sum(r.total_tokens for r in records),
+                "cost_usd": round(sum(r.cost for r in records), 6),
+                "latency_p50": round(percentile(latencies, 50), 3) if latencies else None,
+                "latency_p95": round(percentile(latencies, 95), 3) if latencies else None,
+                "retries": sum(r.retries for r in records),
+                "fallback_hops": sum(r.fallback_hops for r in records),
+                "providers": sorted({r.provider for r in records if not r.cached}),
+            }
+        return summary
+    
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Serialize the summary and raw records; also write them to `path` if given."""
+        payload = json.dumps(
+            {
+                "summary": self.summary(),
+                "records": [asdict(r) for r in self.records()],
+            },
+            indent=2
+        )
+        
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(payload, encoding="utf-8")
+            logger.info(f"LLM metrics written to {path}")
+        
+        return payload
+    
+    def callback(self, caller: str) -> "MetricsCallbackHandler":
+        """LangChain callback that records calls made by a chat model directly (e.g. DeepAgents)."""
+        return MetricsCallbackHandler(self, caller)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Records chat-model calls that bypass UnifiedLLM into an LLMMetrics registry."""
+    
+    def __init__(self, metrics: LLMMetrics, caller: str):
+        self.metrics = metrics
+        self.caller = caller
+        self._started: Dict[UUID, tuple] = {}
+    
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs):
+        metadata = metadata or {}
+        self._started[run_id] = (
+            time.monotonic(),
+            metadata.get("ls_provider", "unknown"),
+            metadata.get("ls_model_name", "unknown"),
+        )
+    
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        started, provider, model = self._started.pop(run_id, (time.monotonic(), "unknown", "unknown"))
+        
+        usage = {}
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or usage
+        
+        self.metrics.record(LLMCallRecord(
+            caller=self.caller,
+            provider=provider,
+            model=model,
+            prompt_tokens=usage.get("input_tokens", 0),
+            completion_tokens=usage.get("output_tokens", 0),
+            latency=time.monotonic() - started,
+        ))
+    
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        started, provider, model = self._started.pop(run_id, (time.monotonic(), "unknown", "unknown"))
+        self.metrics.record(LLMCallRecord(
+            caller=self.caller,
+            provider=provider,
+            model=model,
+            latency=time.monotonic() - started,
+            success=False,
+        ))
+
+
+# Singleton instance
+llm_metrics = LLMMetrics()
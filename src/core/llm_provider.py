@@ -4,14 +4,22 @@ Supports: Groq → OpenRouter → Gemini with retry logic
 """
 import os
 import time
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any, Callable
+import weakref
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait as futures_wait, FIRST_COMPLETED
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Callable, Iterator, AsyncIterator
 from enum import Enum
 from dataclasses import dataclass
 
 from src.core.config import settings
 from src.core.console import console
 
+if TYPE_CHECKING:
+    from src.core.llm_scheduler import PrioritySemaphore
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,6 +28,8 @@ class LLMProvider(Enum):
     GROQ = "groq"
     OPENROUTER = "openrouter"
     GEMINI = "gemini"
+    LOCAL = "local"  # Self-hosted OpenAI-compatible server (Ollama, llama.cpp)
+    SIMULATED = "simulated"  # Local offline endpoints (see llm_simulator)
 
 
 @dataclass
@@ -53,27 +63,95 @@ def exponential_backoff(attempt: int, base_delay: float = 1.0, max_delay: float
     return delay
 
 
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check if a provider error is a rate limit error."""
+    error_str = str(error).lower()
+    rate_limit_indicators = [
+        "rate_limit", "rate limit", "ratelimit",
+        "429", "too many requests", "quota exceeded",
+        "tokens per minute", "requests per minute"
+    ]
+    return any(indicator in error_str for indicator in rate_limit_indicators)
+
+
 class UnifiedLLM:
     """
     Unified LLM interface with multi-provider fallback.
     
     Fallback order:
-    1. Groq (primary) - fastest
-    2. Groq (fallback key)
-    3. OpenRouter (primary)
-    4. OpenRouter (fallback key)
-    5. Gemini
+    1. Groq keys - fastest
+    2. OpenRouter keys
+    3. Gemini keys
+    
+    Each provider can have any number of keys (see key_pool); within a
+    provider, the key with the most remaining quota is tried first.
+    
+    A local model server (LOCAL_LLM_BASE_URL) can be inserted anywhere in
+    the chain, and is tried first for pinned task classes (LOCAL_LLM_TASKS).
+    
+    `task` names a task class from the routing table (see model_routing):
+    it picks the model tier and the latency SLA used to demote slow
+    endpoints. Explicit `models` override the routed ones.
+    
+    At call time the chain is re-ordered by observed latency and endpoints
+    whose circuit breaker is open are skipped (see provider_health).
+    
+    Async calls are bounded per provider by a semaphore so many requests
+    can be in flight without exceeding the configured concurrency.
+    
+    Calls carry a priority class (`priority`, an llm_priority() block, or
+    LLM_DEFAULT_PRIORITY): interactive calls get freed slots and quota
+    first, bulk calls fill what is left (see llm_scheduler).
+    
+    Low-temperature calls are served from the shared response cache
+    when an identical request was answered before.
+    
+    Every attempt first reserves request/token capacity on its key; keys
+    that would need a long wait are deferred so the next provider is tried.
+    
+    Identical requests already in flight (same primary model, temperature
+    and messages) share one provider call instead of each sending their own.
+    
+    Every call is recorded in llm_metrics under a caller label (per call,
+    per instance, or from an enclosing llm_caller() block).
+    
+    With `hedge=True` (for interactive paths) a request still unanswered
+    after the primary's p95 latency is duplicated to the next provider,
+    within the hedge budget; the first answer wins.
     """
     
+    # Semaphores are bound to an event loop, so they are kept per loop
+    # and shared by every UnifiedLLM instance in the process.
+    _semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[LLMProvider, PrioritySemaphore]]" = weakref.WeakKeyDictionary()
+    
     def __init__(
         self,
         temperature: float = 0.3,
         max_retries: int = 3,
-        retry_delay: float = 1.0
+        retry_delay: float = 1.0,
+        max_concurrency: Optional[Dict[str, int]] = None,
+        models: Optional[Dict[LLMProvider, str]] = None,
+        hedge: bool = False,
+        caller: Optional[str] = None,
+        task: Optional[str] = None,
+        priority: Optional[str] = None
     ):
+        from src.core.model_routing import model_router
+        
         self.temperature = temperature
+        self.task = task
+        # Task routing picks the tier; explicit models win
+        self.models = {**model_router.models(task), **(models or {})}
+        self.latency_sla = model_router.latency_sla(task)
+        self.hedge = hedge
+        self.caller = caller
+        self.priority = priority
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_concurrency = {**settings.llm_provider_concurrency, **(max_concurrency or {})}
+        
+        # Cache keys of recently served/stored responses, so `uncache` can drop invalid ones
+        self._cache_keys: "OrderedDict[str, List[str]]" = OrderedDict()
         
         # Build provider chain
         self.providers = self._build_provider_chain()
@@ -83,50 +161,47 @@ class UnifiedLLM:
     
     def _build_provider_chain(self) -> List[LLMConfig]:
         """Build ordered list of LLM providers to try."""
-        providers = []
+        if settings.llm_simulated_profile:
+            return self._build_simulated_chain()
         
-        # 1. Groq Primary
-        if settings.groq_api_key:
-            providers.append(LLMConfig(
-                provider=LLMProvider.GROQ,
-                api_key=settings.groq_api_key.get_secret_value(),
-                model="llama-3.1-8b-instant",
-                temperature=self.temperature
-            ))
+        providers = []
         
-        # 2. Groq Fallback
-        if settings.groq_api_key_fallback:
+        # 1. Groq - every pooled key (GROQ_API_KEY, GROQ_API_KEY1, GROQ_API_KEYS)
+        for api_key in settings.api_keys("groq"):
             providers.append(LLMConfig(
                 provider=LLMProvider.GROQ,
-                api_key=settings.groq_api_key_fallback.get_secret_value(),
-                model="llama-3.1-8b-instant",
+                api_key=api_key,
+                model=self.models.get(LLMProvider.GROQ, "llama-3.1-8b-instant"),
                 temperature=self.temperature
             ))
         
-        # 3. OpenRouter Primary
-        if settings.openrouter_api_key:
+        # 2. OpenRouter - every pooled key
+        for api_key in settings.api_keys("openrouter"):
             providers.append(LLMConfig(
                 provider=LLMProvider.OPENROUTER,
-                api_key=settings.openrouter_api_key.get_secret_value(),
-                model=settings.openrouter_model or "qwen/qwen-2.5-coder-32b-instruct:free",
+                api_key=api_key,
+                model=self.models.get(LLMProvider.OPENROUTER, settings.openrouter_model or "qwen/qwen-2.5-coder-32b-instruct:free"),
                 temperature=self.temperature
             ))
         
-        # 4. OpenRouter Fallback
-        if settings.openrouter_api_key_fallback:
+        # 3. Gemini - every pooled key
+        for api_key in settings.api_keys("gemini"):
             providers.append(LLMConfig(
-                provider=LLMProvider.OPENROUTER,
-                api_key=settings.openrouter_api_key_fallback.get_secret_value(),
-                model=settings.openrouter_model or "qwen/qwen-2.5-coder-32b-instruct:free",
+                provider=LLMProvider.GEMINI,
+                api_key=api_key,
+                model=self.models.get(LLMProvider.GEMINI, settings.gemini_model or "gemini-2.0-flash-exp"),
                 temperature=self.temperature
             ))
         
-        # 5. Gemini
-        if settings.gemini_api_key:
-            providers.append(LLMConfig(
-                provider=LLMProvider.GEMINI,
-                api_key=settings.gemini_api_key.get_secret_value(),
-                model=settings.gemini_model or "gemini-2.0-flash-exp",
+        # 4. Local model server, at the configured position
+        if settings.local_llm_base_url:
+            position = settings.local_llm_chain_position
+            if position < 0:
+                position = len(providers) + 1 + position
+            providers.insert(max(0, min(position, len(providers))), LLMConfig(
+                provider=LLMProvider.LOCAL,
+                api_key=settings.local_llm_api_key.get_secret_value() if settings.local_llm_api_key else "local",
+                model=self.models.get(LLMProvider.LOCAL, settings.local_llm_model),
                 temperature=self.temperature
             ))
         
@@ -135,61 +210,48 @@ class UnifiedLLM:
         
         return providers
     
-    def _create_llm(self, config: LLMConfig):
-        """Create LLM instance based on provider."""
-        if config.provider == LLMProvider.GROQ:
-            from langchain_groq import ChatGroq
-            return ChatGroq(
-                model=config.model,
-                temperature=config.temperature,
-                api_key=config.api_key
+    def _build_simulated_chain(self) -> List[LLMConfig]:
+        """Offline chain of simulated endpoints, named after the models real calls would use."""
+        model = self.models.get(LLMProvider.SIMULATED) or self.models.get(LLMProvider.GROQ, "llama-3.1-8b-instant")
+        console.warning(f"Using simulated LLM provider ({settings.llm_simulated_profile} profile)")
+        return [
+            LLMConfig(
+                provider=LLMProvider.SIMULATED,
+                api_key=f"simulated-{i + 1}",
+                model=model,
+                temperature=self.temperature
             )
+            for i in range(max(1, settings.llm_simulated_endpoints))
+        ]
+    
+    def _create_llm(self, config: LLMConfig):
+        """Get a pooled LLM client for the provider config."""
+        from src.core.llm_clients import client_registry
+        return client_registry.from_config(config)
+    
+    def _get_semaphore(self, provider: LLMProvider) -> "PrioritySemaphore":
+        """Get the concurrency semaphore for a provider on the running loop (interactive waiters first)."""
+        from src.core.llm_scheduler import PrioritySemaphore
         
-        elif config.provider == LLMProvider.OPENROUTER:
-            from langchain_openai import ChatOpenAI
-            return ChatOpenAI(
-                model=config.model,
-                temperature=config.temperature,
-                api_key=config.api_key,
-                base_url="https://openrouter.ai/api/v1"
-            )
+        loop = asyncio.get_running_loop()
+        loop_semaphores = self._semaphores.setdefault(loop, {})
         
-        elif config.provider == LLMProvider.GEMINI:
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            return ChatGoogleGenerativeAI(
-                model=config.model,
-                temperature=config.temperature,
-                google_api_key=config.api_key
-            )
+        if provider not in loop_semaphores:
+            limit = max(1, int(self.max_concurrency.get(provider.value, 4)))
+            loop_semaphores[provider] = PrioritySemaphore(limit)
         
-        else:
-            raise LLMError(f"Unknown provider: {config.provider}")
-    
-    def _is_rate_limit_error(self, error: Exception) -> bool:
-        """Check if error is a rate limit error."""
-        error_str = str(error).lower()
-        rate_limit_indicators = [
-            "rate_limit", "rate limit", "ratelimit",
-            "429", "too many requests", "quota exceeded",
-            "tokens per minute", "requests per minute"
-        ]
-        return any(indicator in error_str for indicator in rate_limit_indicators)
+        return loop_semaphores[provider]
     
-    def invoke(self, messages: List[Dict[str, str]]) -> str:
-        """
-        Invoke LLM with automatic fallback.
-        
-        Args:
-            messages: List of message dicts with 'role' and 'content'
-            
-        Returns:
-            LLM response text
-        """
-        from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+    def _to_langchain_messages(self, messages: List[Dict[str, str]]) -> list:
+        """Convert role/content dicts to LangChain messages."""
+        from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, BaseMessage
         
-        # Convert to LangChain messages
         lc_messages = []
         for msg in messages:
+            if isinstance(msg, BaseMessage):
+                lc_messages.append(msg)
+                continue
+            
             role = msg.get("role", "user")
             content = msg.get("content", "")
             
@@ -200,88 +262,974 @@ class UnifiedLLM:
             else:
                 lc_messages.append(HumanMessage(content=content))
         
+        return lc_messages
+    
+    # ============================================
+    # Response Cache
+    # ============================================
+    
+    def _use_cache(self, use_cache: Optional[bool]) -> bool:
+        """Cache only when enabled and the call is (near-)deterministic."""
+        if use_cache is not None:
+            return use_cache
+        return settings.llm_cache_enabled and self.temperature <= settings.llm_cache_max_temperature
+    
+    def _cache_key(self, config: LLMConfig, lc_messages: list) -> str:
+        from src.core.llm_cache import LLMCache
+        
+        roles = {"system": "system", "ai": "assistant"}
+        messages = [
+            {"role": roles.get(m.type, "user"), "content": m.content}
+            for m in lc_messages
+        ]
+        return LLMCache.make_key(config.provider.value, config.model, config.temperature, messages)
+    
+    def _cache_lookup(self, lc_messages: list) -> Optional[str]:
+        """Check the cache for a response from any provider in the chain."""
+        from src.core.llm_cache import get_llm_cache
+        
+        keys = [self._cache_key(config, lc_messages) for config in self.providers]
+        cached = get_llm_cache().get(keys)
+        if cached is not None:
+            self._remember_cache_keys(cached, keys)
+        return cached
+    
+    def _cache_store(self, config: LLMConfig, lc_messages: list, response: str):
+        from src.core.llm_cache import get_llm_cache
+        
+        if response:
+            key = self._cache_key(config, lc_messages)
+            get_llm_cache().set(key, response)
+            self._remember_cache_keys(response, [key])
+    
+    def _remember_cache_keys(self, response: str, keys: List[str]):
+        self._cache_keys[response] = keys
+        self._cache_keys.move_to_end(response)
+        while len(self._cache_keys) > 64:
+            self._cache_keys.popitem(last=False)
+    
+    def uncache(self, response: str):
+        """
+        Drop a response this client cached (or served from the cache),
+        e.g. because it failed validation, so it is not served again.
+        """
+        from src.core.llm_cache import get_llm_cache
+        
+        keys = self._cache_keys.pop(response, None)
+        if keys:
+            get_llm_cache().delete(keys)
+    
+    def _flight_key(self, lc_messages: list) -> str:
+        """Identity of a request for single-flight coalescing (primary model, temperature, messages)."""
+        return self._cache_key(self.providers[0], lc_messages)
+    
+    # ============================================
+    # Rate Limiting
+    # ============================================
+    
+    def _estimate_tokens(self, lc_messages: list) -> int:
+        """Prompt estimate plus a reserve for the completion."""
+        from src.core.rate_limiter import estimate_tokens
+        
+        prompt_tokens = sum(estimate_tokens(str(m.content)) + 4 for m in lc_messages)
+        return prompt_tokens + settings.llm_completion_token_estimate
+    
+    def _attempt_plan(self) -> list:
+        """(provider index, config, max rate-limit wait) for each healthy provider, fastest first."""
+        from src.core.provider_health import provider_health
+        from src.core.key_pool import key_pool
+        
+        ordered = provider_health.order(self.providers, self.latency_sla)
+        local = [config for config in ordered if config.provider == LLMProvider.LOCAL]
+        if local:
+            ordered = [config for config in ordered if config.provider != LLMProvider.LOCAL]
+            if self._pinned_local():
+                # Pinned tasks stay on the local tier while it is healthy
+                ordered = local + ordered
+            else:
+                # Otherwise the (fast but smaller) local model keeps its configured
+                # place instead of winning the latency ordering
+                for config in local:
+                    ordered.insert(min(self.providers.index(config), len(ordered)), config)
+        
+        ordered = key_pool.balance(ordered)
+        
+        return [
+            (self.providers.index(config), config, settings.llm_rate_limit_max_wait)
+            for config in ordered
+        ]
+    
+    def _pinned_local(self) -> bool:
+        return self.task is not None and self.task in settings.local_llm_tasks
+    
+    def _priority(self) -> str:
+        from src.core.llm_scheduler import current_priority
+        return self.priority or current_priority() or settings.llm_default_priority
+    
+    def _reserve(self, config: LLMConfig, tokens: int, max_wait: float) -> Optional[float]:
+        from src.core.rate_limiter import rate_limiter
+        return rate_limiter.reserve(
+            config.provider.value, config.api_key, tokens, max_wait, self._priority(), config.model
+        )
+    
+    def _settle(self, config: LLMConfig, tokens: int) -> float:
+        """
+        After a rate-limit wait: 0 if the reservation is held, else the next wait.
+        
+        Interactive calls reserved up front; bulk calls hold nothing while
+        waiting and try again, so interactive calls that arrived meanwhile
+        go first.
+        """
+        from src.core.llm_scheduler import BULK
+        from src.core.rate_limiter import rate_limiter
+        
+        if self._priority() != BULK:
+            return 0.0
+        return rate_limiter.reserve(config.provider.value, config.api_key, tokens, None, BULK, config.model)
+    
+    def _record_usage(self, config: LLMConfig, tokens: int, result):
+        from src.core.rate_limiter import rate_limiter
+        
+        usage = getattr(result, "usage_metadata", None) or {}
+        rate_limiter.record_usage(
+            config.provider.value, config.api_key, tokens, usage.get("total_tokens"), config.model
+        )
+    
+    def _penalize(self, config: LLMConfig, error: Exception, attempt: int):
+        from src.core.rate_limiter import rate_limiter
+        
+        rate_limiter.penalize(
+            config.provider.value,
+            config.api_key,
+            error,
+            exponential_backoff(attempt, self.retry_delay),
+            config.model
+        )
+    
+    # ============================================
+    # Provider Health
+    # ============================================
+    
+    def _health_allow(self, config: LLMConfig) -> bool:
+        from src.core.provider_health import provider_health
+        return provider_health.allow(config)
+    
+    def _record_success(self, config: LLMConfig, started: float):
+        from src.core.provider_health import provider_health
+        provider_health.record_success(config, time.monotonic() - started)
+    
+    def _record_failure(self, config: LLMConfig):
+        from src.core.provider_health import provider_health
+        provider_health.record_failure(config)
+    
+    def _defer(self, plan: list, provider_idx: int, config: LLMConfig, max_wait: float) -> bool:
+        """
+        Push a saturated key to the end of the plan with the longer queue limit.
+        
+        Returns False if the key was already deferred once.
+        """
+        if max_wait >= settings.llm_rate_limit_max_queue:
+            return False
+        plan.append((provider_idx, config, settings.llm_rate_limit_max_queue))
+        return True
+    
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        """Check if error is a rate limit error."""
+        return is_rate_limit_error(error)
+    
+    # ============================================
+    # Provider Chain
+    # ============================================
+    
+    def _admit(self, plan: list, provider_idx: int, config: LLMConfig, max_wait: float, tokens: int) -> Optional[float]:
+        """
+        Pass an attempt through the circuit breaker and rate limiter.
+        
+        Returns:
+            Seconds to wait before sending, or None to skip this endpoint
+        """
+        if not self._health_allow(config):
+            return None  # Circuit open (or a probe is already in flight)
+        
+        wait = self._reserve(config, tokens, max_wait)
+        if wait is None:
+            if self._defer(plan, provider_idx, config, max_wait):
+                console.warning(f"{config.provider.value} is at its rate limit, trying next...")
+            return None
+        
+        if wait > 0:
+            logger.info(f"Waiting {wait:.1f}s for {config.provider.value} rate limit")
+        return wait
+    
+    def _on_attempt_error(self, config: LLMConfig, error: Exception, attempt: int) -> bool:
+        """
+        Record a failed attempt.
+        
+        Returns:
+            True to retry the same endpoint, False to move to the next one
+        """
+        if self._is_rate_limit_error(error):
+            logger.warning(f"Rate limit on {config.provider.value}, attempt {attempt + 1}")
+            self._penalize(config, error, attempt)
+            
+            if attempt < self.max_retries - 1:
+                console.warning("Rate limited, retrying once the key frees up...")
+                return True
+            
+            console.warning(f"Rate limit exhausted on {config.provider.value}, trying next...")
+            return False
+        
+        # Non-rate-limit error, try next provider
+        logger.error(f"LLM error on {config.provider.value}: {error}")
+        self._record_failure(config)
+        return False
+    
+    def _unavailable(self, config: LLMConfig) -> LLMError:
+        return RateLimitError(f"{config.provider.value} unavailable (circuit open or rate limited)")
+    
+    # ============================================
+    # Usage Metrics
+    # ============================================
+    
+    def _resolve_caller(self, caller: Optional[str]) -> str:
+        from src.core.llm_metrics import current_caller
+        return caller or self.caller or current_caller() or "other"
+    
+    def _new_trace(self) -> Dict[str, Any]:
+        return {"attempts": 0, "endpoints": set(), "hedged": False}
+    
+    def _track_attempt(self, trace: Optional[Dict[str, Any]], provider_idx: int):
+        if trace is not None:
+            trace["attempts"] += 1
+            trace["endpoints"].add(provider_idx)
+    
+    def _record_call(
+        self,
+        caller: str,
+        started: float,
+        lc_messages: list,
+        trace: Optional[Dict[str, Any]] = None,
+        config: Optional[LLMConfig] = None,
+        result=None,
+        cached: bool = False,
+        streamed: bool = False
+    ):
+        """Record one call in the metrics registry (config=None and not cached means it failed)."""
+        from src.core.llm_metrics import llm_metrics, LLMCallRecord
+        from src.core.rate_limiter import estimate_tokens
+        
+        trace = trace or self._new_trace()
+        usage = getattr(result, "usage_metadata", None) or {}
+        success = cached or config is not None
+        
+        prompt_tokens = completion_tokens = 0
+        if success and not cached:
+            prompt_tokens = usage.get("input_tokens") or (
+                self._estimate_tokens(lc_messages) - settings.llm_completion_token_estimate
+            )
+            # A stream can finish without yielding a chunk (result is None)
+            completion_tokens = usage.get("output_tokens") or (
+                estimate_tokens(str(result.content)) if result is not None else 0
+            )
+        
+        endpoints = len(trace["endpoints"])
+        latency = time.monotonic() - started
+        sla_missed = success and not cached and self.latency_sla is not None and latency > self.latency_sla
+        if sla_missed:
+            logger.info(f"{caller} call took {latency:.1f}s (SLA {self.latency_sla:.1f}s for {self.task})")
+        
+        llm_metrics.record(LLMCallRecord(
+            caller=caller,
+            provider="cache" if cached else (config.provider.value if config else "none"),
+            model=(config or self.providers[0]).model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency=latency,
+            retries=max(0, trace["attempts"] - endpoints),
+            fallback_hops=max(0, endpoints - 1),
+            cached=cached,
+            streamed=streamed,
+            hedged=trace["hedged"],
+            task=self.task,
+            sla_missed=sla_missed,
+            success=success
+        ))
+    
+    def _call_chain(self, lc_messages: list, plan: list, tokens: int, trace: Optional[Dict[str, Any]] = None):
+        """
+        Walk an attempt plan until one endpoint answers.
+        
+        Returns:
+            (config, result) for the endpoint that answered
+        """
         last_error = None
         
-        for provider_idx, config in enumerate(self.providers):
+        # Saturated keys are appended back onto the plan (see _defer)
+        for provider_idx, config, max_wait in plan:
             for attempt in range(self.max_retries):
+                wait = self._admit(plan, provider_idx, config, max_wait, tokens)
+                if wait is None:
+                    last_error = last_error or self._unavailable(config)
+                    break
+                while wait > 0:
+                    time.sleep(wait)
+                    wait = self._settle(config, tokens)
+                
                 try:
+                    self._track_attempt(trace, provider_idx)
                     llm = self._create_llm(config)
+                    started = time.monotonic()
                     result = llm.invoke(lc_messages)
+                    self._record_success(config, started)
+                    self._record_usage(config, tokens, result)
                     
                     # Success!
                     if provider_idx > 0:
                         console.info(f"Using fallback: {config.provider.value}")
                     
-                    return result.content
+                    return config, result
                 
                 except Exception as e:
                     last_error = e
-                    
-                    if self._is_rate_limit_error(e):
-                        logger.warning(f"Rate limit on {config.provider.value}, attempt {attempt + 1}")
-                        
-                        if attempt < self.max_retries - 1:
-                            delay = exponential_backoff(attempt, self.retry_delay)
-                            console.warning(f"Rate limited, retrying in {delay:.1f}s...")
-                            time.sleep(delay)
-                        else:
-                            # Move to next provider
-                            console.warning(f"Rate limit exhausted on {config.provider.value}, trying next...")
-                            break
-                    else:
-                        logger.error(f"LLM error on {config.provider.value}: {e}")
-                        break  # Non-rate-limit error, try next provider
+                    if not self._on_attempt_error(config, e, attempt):
+                        break
         
         # All providers failed
         raise LLMError(f"All LLM providers failed. Last error: {last_error}")
     
-    async def ainvoke(self, messages: List[Dict[str, str]]) -> str:
-        """Async version of invoke."""
-        # For now, use sync invoke
-        # TODO: Implement proper async support
-        return self.invoke(messages)
+    async def _acall_chain(self, lc_messages: list, plan: list, tokens: int, trace: Optional[Dict[str, Any]] = None):
+        """Async version of _call_chain (semaphore held only while a request is in flight)."""
+        last_error = None
+        
+        for provider_idx, config, max_wait in plan:
+            semaphore = self._get_semaphore(config.provider)
+            priority = self._priority()
+            
+            for attempt in range(self.max_retries):
+                wait = self._admit(plan, provider_idx, config, max_wait, tokens)
+                if wait is None:
+                    last_error = last_error or self._unavailable(config)
+                    break
+                while wait > 0:
+                    await asyncio.sleep(wait)
+                    wait = self._settle(config, tokens)
+                
+                try:
+                    self._track_attempt(trace, provider_idx)
+                    llm = self._create_llm(config)
+                    async with semaphore.slot(priority):
+                        started = time.monotonic()
+                        result = await llm.ainvoke(lc_messages)
+                    self._record_success(config, started)
+                    self._record_usage(config, tokens, result)
+                    
+                    if provider_idx > 0:
+                        console.info(f"Using fallback: {config.provider.value}")
+                    
+                    return config, result
+                
+                except Exception as e:
+                    last_error = e
+                    if not self._on_attempt_error(config, e, attempt):
+                        break
+        
+        raise LLMError(f"All LLM providers failed. Last error: {last_error}")
     
-    def generate_json(self, prompt: str, system_prompt: str = "") -> Dict:
-        """Generate and parse JSON response."""
-        import json
+    # ============================================
+    # Hedging
+    # ============================================
+    
+    def _should_hedge(self, hedge: Optional[bool]) -> bool:
+        from src.core.hedging import hedging_requested
+        
+        if hedge is not None:
+            return hedge
+        return self.hedge or hedging_requested()
+    
+    def _hedge_plans(self, plan: list):
+        """
+        Split a plan into the primary chain and the backup chain for a hedge.
+        
+        The backup skips the primary endpoint and prefers other providers,
+        since a slow provider tends to be slow for every key.
+        """
+        primary_config = plan[0][1]
+        backup = [entry for entry in plan[1:] if entry[1] != primary_config]
+        backup.sort(key=lambda entry: entry[1].provider == primary_config.provider)
+        return plan, backup
+    
+    def _hedge_delay(self, config: LLMConfig) -> float:
+        from src.core.hedging import hedge_delay
+        from src.core.provider_health import provider_health
+        
+        return hedge_delay(provider_health.get(config).p95())
+    
+    def _hedged_call(self, lc_messages: list, plan: list, tokens: int, trace: Optional[Dict[str, Any]] = None):
+        """
+        Run the chain, duplicating the request to a backup endpoint if the
+        primary is slower than its p95.
+        
+        Threads cannot be interrupted, so a losing sync request runs to
+        completion in the background and its answer is discarded.
+        """
+        from src.core.hedging import hedge_budget
+        
+        primary_plan, backup_plan = self._hedge_plans(plan)
+        executor = _hedge_executor()
+        
+        primary = executor.submit(contextvars.copy_context().run, self._call_chain, lc_messages, primary_plan, tokens, trace)
+        if not backup_plan:
+            return primary.result()
+        
+        try:
+            return primary.result(timeout=self._hedge_delay(primary_plan[0][1]))
+        except FuturesTimeoutError:
+            pass
+        
+        if not hedge_budget.try_acquire():
+            return primary.result()
+        
+        console.info(f"Hedging slow {primary_plan[0][1].provider.value} call on {backup_plan[0][1].provider.value}")
+        if trace is not None:
+            trace["hedged"] = True
+        backup = executor.submit(contextvars.copy_context().run, self._call_chain, lc_messages, backup_plan, tokens, trace)
+        
+        pending = {primary, backup}
+        while pending:
+            done, pending = futures_wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        hedge_budget.record_win()
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+        
+        raise primary.exception()
+    
+    async def _ahedged_call(self, lc_messages: list, plan: list, tokens: int, trace: Optional[Dict[str, Any]] = None):
+        """Async version of _hedged_call; the losing request is cancelled."""
+        from src.core.hedging import hedge_budget
+        
+        primary_plan, backup_plan = self._hedge_plans(plan)
+        primary = asyncio.ensure_future(self._acall_chain(lc_messages, primary_plan, tokens, trace))
+        if not backup_plan:
+            return await primary
+        
+        done, _ = await asyncio.wait({primary}, timeout=self._hedge_delay(primary_plan[0][1]))
+        if done or not hedge_budget.try_acquire():
+            return await primary
+        
+        console.info(f"Hedging slow {primary_plan[0][1].provider.value} call on {backup_plan[0][1].provider.value}")
+        if trace is not None:
+            trace["hedged"] = True
+        backup = asyncio.ensure_future(self._acall_chain(lc_messages, backup_plan, tokens, trace))
+        
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            hedge_budget.record_win()
+                        return task.result()
+            
+            raise primary.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    # ============================================
+    # Public API
+    # ============================================
+    
+    def invoke(
+        self,
+        messages: List[Dict[str, str]],
+        use_cache: Optional[bool] = None,
+        hedge: Optional[bool] = None,
+        caller: Optional[str] = None
+    ) -> str:
+        """
+        Invoke LLM with automatic fallback.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            use_cache: Force the response cache on/off (default: by temperature)
+            hedge: Force hedging on/off (default: instance setting or hedged_requests())
+            caller: Metrics label (default: instance label or llm_caller() block)
+        
+        Returns:
+            LLM response text
+        """
+        from src.core.hedging import hedge_budget
+        
+        lc_messages = self._to_langchain_messages(messages)
+        cacheable = self._use_cache(use_cache)
+        caller = self._resolve_caller(caller)
+        started = time.monotonic()
+        
+        if cacheable:
+            cached = self._cache_lookup(lc_messages)
+            if cached is not None:
+                self._record_call(caller, started, lc_messages, cached=True)
+                return cached
+        
+        def call() -> str:
+            tokens = self._estimate_tokens(lc_messages)
+            plan = self._attempt_plan()
+            hedge_budget.record_call()
+            trace = self._new_trace()
+            
+            try:
+                if self._should_hedge(hedge):
+                    config, result = self._hedged_call(lc_messages, plan, tokens, trace)
+                else:
+                    config, result = self._call_chain(lc_messages, plan, tokens, trace)
+            except LLMError:
+                self._record_call(caller, started, lc_messages, trace)
+                raise
+            
+            self._record_call(caller, started, lc_messages, trace, config, result)
+            if cacheable:
+                self._cache_store(config, lc_messages, result.content)
+            
+            return result.content
+        
+        if not settings.llm_single_flight_enabled:
+            return call()
+        
+        from src.core.single_flight import llm_single_flight
+        return llm_single_flight.do(self._flight_key(lc_messages), call)
+    
+    async def ainvoke(
+        self,
+        messages: List[Dict[str, str]],
+        use_cache: Optional[bool] = None,
+        hedge: Optional[bool] = None,
+        caller: Optional[str] = None
+    ) -> str:
+        """
+        Async version of invoke.
+        
+        Uses the chat models' native async API and non-blocking backoff,
+        holding the provider semaphore only while a request is in flight.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            use_cache: Force the response cache on/off (default: by temperature)
+            hedge: Force hedging on/off (default: instance setting or hedged_requests())
+            caller: Metrics label (default: instance label or llm_caller() block)
+        
+        Returns:
+            LLM response text
+        """
+        from src.core.hedging import hedge_budget
+        
+        lc_messages = self._to_langchain_messages(messages)
+        cacheable = self._use_cache(use_cache)
+        caller = self._resolve_caller(caller)
+        started = time.monotonic()
+        
+        if cacheable:
+            cached = self._cache_lookup(lc_messages)
+            if cached is not None:
+                self._record_call(caller, started, lc_messages, cached=True)
+                return cached
+        
+        async def call() -> str:
+            tokens = self._estimate_tokens(lc_messages)
+            plan = self._attempt_plan()
+            hedge_budget.record_call()
+            trace = self._new_trace()
+            
+            try:
+                if self._should_hedge(hedge):
+                    config, result = await self._ahedged_call(lc_messages, plan, tokens, trace)
+                else:
+                    config, result = await self._acall_chain(lc_messages, plan, tokens, trace)
+            except LLMError:
+                self._record_call(caller, started, lc_messages, trace)
+                raise
+            
+            self._record_call(caller, started, lc_messages, trace, config, result)
+            if cacheable:
+                self._cache_store(config, lc_messages, result.content)
+            
+            return result.content
+        
+        if not settings.llm_single_flight_enabled:
+            return await call()
+        
+        from src.core.single_flight import llm_single_flight
+        return await llm_single_flight.ado(self._flight_key(lc_messages), call)
+    
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        use_cache: Optional[bool] = None,
+        caller: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Stream response text as it is generated.
+        
+        Fallback to the next provider is only possible until the first
+        token has been yielded; a failure after that raises LLMError.
+        Streams are not hedged or coalesced.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            use_cache: Force the response cache on/off (default: by temperature)
+            caller: Metrics label (default: instance label or llm_caller() block)
+        
+        Yields:
+            Text chunks (a cached response is yielded as a single chunk)
+        """
+        from src.core.hedging import hedge_budget
+        
+        lc_messages = self._to_langchain_messages(messages)
+        cacheable = self._use_cache(use_cache)
+        caller = self._resolve_caller(caller)
+        started_call = time.monotonic()
+        
+        if cacheable:
+            cached = self._cache_lookup(lc_messages)
+            if cached is not None:
+                self._record_call(caller, started_call, lc_messages, cached=True, streamed=True)
+                yield cached
+                return
+        
+        tokens = self._estimate_tokens(lc_messages)
+        plan = self._attempt_plan()
+        hedge_budget.record_call()
+        trace = self._new_trace()
+        last_error = None
+        
+        for provider_idx, config, max_wait in plan:
+            for attempt in range(self.max_retries):
+                wait = self._admit(plan, provider_idx, config, max_wait, tokens)
+                if wait is None:
+                    last_error = last_error or self._unavailable(config)
+                    break
+                while wait > 0:
+                    time.sleep(wait)
+                    wait = self._settle(config, tokens)
+                
+                aggregate = None
+                try:
+                    self._track_attempt(trace, provider_idx)
+                    llm = self._create_llm(config)
+                    started = time.monotonic()
+                    for chunk in llm.stream(lc_messages):
+                        aggregate = chunk if aggregate is None else aggregate + chunk
+                        if chunk.content:
+                            yield chunk.content
+                
+                except Exception as e:
+                    if aggregate is not None and aggregate.content:
+                        self._record_failure(config)
+                        self._record_call(caller, started_call, lc_messages, trace, streamed=True)
+                        raise LLMError(f"Stream from {config.provider.value} failed mid-response: {e}") from e
+                    
+                    last_error = e
+                    if not self._on_attempt_error(config, e, attempt):
+                        break
+                    continue
+                
+                self._record_success(config, started)
+                self._record_usage(config, tokens, aggregate)
+                self._record_call(caller, started_call, lc_messages, trace, config, aggregate, streamed=True)
+                
+                if provider_idx > 0:
+                    console.info(f"Using fallback: {config.provider.value}")
+                
+                if cacheable and aggregate is not None:
+                    self._cache_store(config, lc_messages, aggregate.content)
+                return
+        
+        self._record_call(caller, started_call, lc_messages, trace, streamed=True)
+        raise LLMError(f"All LLM providers failed. Last error: {last_error}")
+    
+    async def astream(
+        self,
+        messages: List[Dict[str, str]],
+        use_cache: Optional[bool] = None,
+        caller: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Async version of stream.
+        
+        The provider semaphore is held for the whole stream, since the
+        request is in flight until the last chunk arrives.
+        """
+        from src.core.hedging import hedge_budget
+        
+        lc_messages = self._to_langchain_messages(messages)
+        cacheable = self._use_cache(use_cache)
+        caller = self._resolve_caller(caller)
+        started_call = time.monotonic()
+        
+        if cacheable:
+            cached = self._cache_lookup(lc_messages)
+            if cached is not None:
+                self._record_call(caller, started_call, lc_messages, cached=True, streamed=True)
+                yield cached
+                return
+        
+        tokens = self._estimate_tokens(lc_messages)
+        plan = self._attempt_plan()
+        hedge_budget.record_call()
+        trace = self._new_trace()
+        last_error = None
+        
+        for provider_idx, config, max_wait in plan:
+            semaphore = self._get_semaphore(config.provider)
+            priority = self._priority()
+            
+            for attempt in range(self.max_retries):
+                wait = self._admit(plan, provider_idx, config, max_wait, tokens)
+                if wait is None:
+                    last_error = last_error or self._unavailable(config)
+                    break
+                while wait > 0:
+                    await asyncio.sleep(wait)
+                    wait = self._settle(config, tokens)
+                
+                aggregate = None
+                try:
+                    self._track_attempt(trace, provider_idx)
+                    llm = self._create_llm(config)
+                    async with semaphore.slot(priority):
+                        started = time.monotonic()
+                        async for chunk in llm.astream(lc_messages):
+                            aggregate = chunk if aggregate is None else aggregate + chunk
+                            if chunk.content:
+                                yield chunk.content
+                
+                except Exception as e:
+                    if aggregate is not None and aggregate.content:
+                        self._record_failure(config)
+                        self._record_call(caller, started_call, lc_messages, trace, streamed=True)
+                        raise LLMError(f"Stream from {config.provider.value} failed mid-response: {e}") from e
+                    
+                    last_error = e
+                    if not self._on_attempt_error(config, e, attempt):
+                        break
+                    continue
+                
+                self._record_success(config, started)
+                self._record_usage(config, tokens, aggregate)
+                self._record_call(caller, started_call, lc_messages, trace, config, aggregate, streamed=True)
+                
+                if provider_idx > 0:
+                    console.info(f"Using fallback: {config.provider.value}")
+                
+                if cacheable and aggregate is not None:
+                    self._cache_store(config, lc_messages, aggregate.content)
+                return
+        
+        self._record_call(caller, started_call, lc_messages, trace, streamed=True)
+        raise LLMError(f"All LLM providers failed. Last error: {last_error}")
+    
+    # ============================================
+    # Batch Mode
+    # ============================================
+    
+    def _batch_config(self) -> LLMConfig:
+        """Endpoint whose model the batch is priced and cached as."""
+        from src.core.key_pool import key_pool
+        
+        for config in self.providers:
+            if config.provider == LLMProvider.GROQ:
+                return LLMConfig(
+                    provider=LLMProvider.GROQ,
+                    api_key=key_pool.best("groq"),
+                    model=config.model,
+                    temperature=self.temperature
+                )
+        return self.providers[0]
+    
+    def _batch_backend(self, config: LLMConfig):
+        from src.core.llm_batch import OpenAIBatchBackend, LocalBatchBackend, GROQ_OPENAI_BASE_URL
+        
+        if settings.llm_batch_backend == "local" or config.provider != LLMProvider.GROQ:
+            # Stand-in: run each request through the normal chain in the background
+            def complete(body: Dict[str, Any]) -> str:
+                lc_messages = self._to_langchain_messages(body["messages"])
+                _, result = self._call_chain(lc_messages, self._attempt_plan(), self._estimate_tokens(lc_messages))
+                return result.content
+            return LocalBatchBackend(complete)
+        
+        if settings.llm_batch_backend == "groq":
+            return OpenAIBatchBackend(GROQ_OPENAI_BASE_URL, config.api_key, settings.llm_batch_completion_window)
+        
+        raise LLMError(f"Unknown batch backend: {settings.llm_batch_backend}")
+    
+    def _prepare_batch(self, batch: List[List[Dict[str, str]]], use_cache: Optional[bool], caller: str, started: float):
+        """Serve cached requests and build JSONL lines for the rest."""
+        from langchain_core.messages import convert_to_openai_messages
+        from src.core.llm_batch import request_line
+        
+        config = self._batch_config()
+        cacheable = self._use_cache(use_cache)
+        lc_batch = [self._to_langchain_messages(messages) for messages in batch]
+        responses: List[Optional[str]] = [None] * len(batch)
+        
+        lines = []
+        for i, lc_messages in enumerate(lc_batch):
+            cached = self._cache_lookup(lc_messages) if cacheable else None
+            if cached is not None:
+                self._record_call(caller, started, lc_messages, cached=True)
+                responses[i] = cached
+                continue
+            lines.append(request_line(f"request-{i}", {
+                "model": config.model,
+                "messages": convert_to_openai_messages(lc_messages),
+                "temperature": self.temperature,
+            }))
+        
+        return config, cacheable, lc_batch, responses, lines
+    
+    def _finish_batch(self, config, cacheable, lc_batch, responses, lines, results, backend, caller: str, started: float):
+        """Map batch results back to request order; record metrics and cache answers."""
+        from src.core.llm_metrics import llm_metrics, LLMCallRecord, estimate_cost
+        from src.core.rate_limiter import estimate_tokens
+        
+        for line in lines:
+            i = int(line["custom_id"].split("-")[1])
+            result = results.get(line["custom_id"])
+            ok = result is not None and result.ok
+            
+            prompt_tokens = completion_tokens = 0
+            if ok:
+                prompt_tokens = result.usage.get("prompt_tokens") or (
+                    self._estimate_tokens(lc_batch[i]) - settings.llm_completion_token_estimate
+                )
+                completion_tokens = result.usage.get("completion_tokens") or estimate_tokens(result.content)
+                responses[i] = result.content
+                if cacheable:
+                    self._cache_store(config, lc_batch[i], result.content)
+            else:
+                logger.warning(f"Batch request {line['custom_id']} failed: {result.error if result else 'missing'}")
+            
+            llm_metrics.record(LLMCallRecord(
+                caller=caller,
+                provider=backend.name,
+                model=config.model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                latency=time.monotonic() - started,
+                batched=True,
+                success=ok,
+                cost=estimate_cost(config.model, prompt_tokens, completion_tokens) * settings.llm_batch_discount
+            ))
+        
+        return responses
+    
+    def batch_invoke(
+        self,
+        batch: List[List[Dict[str, str]]],
+        use_cache: Optional[bool] = None,
+        caller: Optional[str] = None
+    ) -> List[Optional[str]]:
+        """
+        Run many independent requests through the provider batch API.
+        
+        For offline bulk work: results can take minutes to hours, but are
+        billed at batch rates against a separate quota. Cached requests are
+        answered without being submitted.
+        
+        Returns:
+            Responses in request order (None where a request failed)
+        """
+        from src.core.llm_batch import run_batch
+        
+        caller = self._resolve_caller(caller)
+        started = time.monotonic()
+        config, cacheable, lc_batch, responses, lines = self._prepare_batch(batch, use_cache, caller, started)
+        if not lines:
+            return responses
+        
+        backend = self._batch_backend(config)
+        console.info(f"Submitting {len(lines)} requests as a {backend.name} batch")
+        results = run_batch(backend, lines, settings.llm_batch_poll_interval, settings.llm_batch_timeout)
+        return self._finish_batch(config, cacheable, lc_batch, responses, lines, results, backend, caller, started)
+    
+    async def abatch_invoke(
+        self,
+        batch: List[List[Dict[str, str]]],
+        use_cache: Optional[bool] = None,
+        caller: Optional[str] = None
+    ) -> List[Optional[str]]:
+        """Async version of batch_invoke (polling does not block the event loop)."""
+        from src.core.llm_batch import arun_batch
+        
+        caller = self._resolve_caller(caller)
+        started = time.monotonic()
+        config, cacheable, lc_batch, responses, lines = self._prepare_batch(batch, use_cache, caller, started)
+        if not lines:
+            return responses
+        
+        backend = self._batch_backend(config)
+        console.info(f"Submitting {len(lines)} requests as a {backend.name} batch")
+        results = await arun_batch(backend, lines, settings.llm_batch_poll_interval, settings.llm_batch_timeout)
+        return self._finish_batch(config, cacheable, lc_batch, responses, lines, results, backend, caller, started)
+    
+    def generate_json(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        use_cache: Optional[bool] = None,
+        caller: Optional[str] = None
+    ) -> Dict:
+        """Generate and parse JSON response (with one repair request if it is malformed)."""
+        from src.core.structured_output import parse_or_repair, StructuredOutputError
         
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt + "\nOutput only valid JSON."})
         messages.append({"role": "user", "content": prompt})
         
-        response = self.invoke(messages)
-        
-        # Clean response
-        content = response.strip()
-        if "```" in content:
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-            content = content.strip()
+        response = self.invoke(messages, use_cache=use_cache, caller=caller)
         
         try:
-            return json.loads(content)
-        except json.JSONDecodeError as e:
+            return parse_or_repair(self, response, caller=caller)
+        except StructuredOutputError as e:
             logger.error(f"JSON parse error: {e}")
             return {"error": str(e), "raw_response": response[:500]}
 
 
-# Singleton instance
-_llm_instance = None
+# Shared pool for sync hedged calls
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+
 
+def _hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_pool
+    
+    if _hedge_pool is None:
+        _hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+    
+    return _hedge_pool
 
-def get_llm(temperature: float = 0.3) -> UnifiedLLM:
-    """Get or create unified LLM instance."""
-    global _llm_instance
+
+# Singleton instances (one per temperature)
+_llm_instances: Dict[tuple, UnifiedLLM] = {}
+
+
+def get_llm(temperature: float = 0.3, task: Optional[str] = None) -> UnifiedLLM:
+    """Get or create unified LLM instance for a temperature (and task class)."""
+    from src.core.model_routing import model_router
+    
+    # The tier is part of the key: the same task may be downgraded (small_models_only)
+    key = (float(temperature), task, model_router.tier(task))
     
-    if _llm_instance is None:
-        _llm_instance = UnifiedLLM(temperature=temperature)
+    if key not in _llm_instances:
+        _llm_instances[key] = UnifiedLLM(temperature=key[0], task=task)
     
-    return _llm_instance
+    return _llm_instances[key]
 
 
 def reset_llm():
-    """Reset LLM instance (useful for testing)."""
-    global _llm_instance
-    _llm_instance = None
+    """Reset LLM instances (useful for testing)."""
+    _llm_instances.clear()
@@ -0,0 +1,95 @@
+"""
+LLM Scheduler - Priority classes for LLM calls (interactive before bulk)
+A human waiting on a review step is served ahead of any backlog of background analyses
+"""
+import heapq
+import asyncio
+import logging
+import itertools
+import contextvars
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# Lower rank is served first
+PRIORITY_RANK: Dict[str, int] = {INTERACTIVE: 0, BULK: 1}
+
+
+# Priority for calls whose UnifiedLLM does not set one
+_current_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_priority", default=None)
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run every LLM call made inside the block at `priority`."""
+    if priority not in PRIORITY_RANK:
+        raise ValueError(f"Unknown LLM priority: {priority}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Optional[str]:
+    return _current_priority.get()
+
+
+class PrioritySemaphore:
+    """
+    Concurrency limit whose waiters are woken by priority, then arrival.
+    
+    Used instead of asyncio.Semaphore for the per-provider in-flight cap,
+    so a freed slot always goes to a waiting interactive request before
+    any queued bulk request. Bound to the event loop it is first used on.
+    """
+    
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: List[tuple] = []
+        self._counter = itertools.count()
+        self.waits: Dict[str, int] = {priority: 0 for priority in PRIORITY_RANK}
+    
+    def waiting(self, priority: Optional[str] = None) -> int:
+        pending = [entry for entry in self._waiters if not entry[3].done()]
+        if priority is None:
+            return len(pending)
+        return sum(1 for entry in pending if entry[2] == priority)
+    
+    async def acquire(self, priority: str = INTERACTIVE):
+        if self._value > 0 and not self.waiting():
+            self._value -= 1
+            return
+        
+        self.waits[priority] = self.waits.get(priority, 0) + 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (PRIORITY_RANK.get(priority, len(PRIORITY_RANK)), next(self._counter), priority, future))
+        
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Woken and cancelled at the same time: hand the slot on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+    
+    def release(self):
+        while self._waiters:
+            future = heapq.heappop(self._waiters)[3]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+    
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
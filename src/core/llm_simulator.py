@@ -0,0 +1,267 @@
+"""
+LLM Simulator - Offline chat model with configurable latency, 429 and failure profiles
+Exercises UnifiedLLM's fallback, retry and backoff paths without spending API quota
+"""
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, fields, replace
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict, PrivateAttr
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SimulationProfile:
+    """
+    Behaviour of one simulated endpoint.
+    
+    Latency is drawn from `latency_distribution` ("fixed", "uniform" or
+    "lognormal") around `latency_mean`. Each call can fail with a 429
+    (`rate_limit_rate`) or a 5xx (`error_rate`); a 5xx starts a burst of
+    `burst_length` consecutive failures with probability `burst_rate`.
+    `rpm` > 0 enforces a server-side request quota like a real provider.
+    """
+    latency_mean: float = 0.2
+    latency_jitter: float = 0.3
+    latency_distribution: str = "lognormal"
+    rate_limit_rate: float = 0.0
+    error_rate: float = 0.0
+    burst_rate: float = 0.0
+    burst_length: int = 5
+    rpm: int = 0
+    retry_after: float = 2.0
+    tokens_per_second: float = 200.0
+
+
+PROFILES: Dict[str, SimulationProfile] = {
+    "ideal": SimulationProfile(latency_mean=0.0, latency_jitter=0.0, latency_distribution="fixed", tokens_per_second=0),
+    "steady": SimulationProfile(),
+    "slow": SimulationProfile(latency_mean=2.0, latency_jitter=0.6),
+    "flaky": SimulationProfile(error_rate=0.1, burst_rate=0.3, burst_length=4),
+    "rate_limit_storm": SimulationProfile(rate_limit_rate=0.3, rpm=30, retry_after=5.0),
+    "outage": SimulationProfile(error_rate=1.0),
+}
+
+
+def get_profile(name: str, overrides: Optional[Dict[str, Any]] = None) -> SimulationProfile:
+    """Look up a named profile and apply field overrides."""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown simulation profile '{name}' (choose from {', '.join(PROFILES)})")
+    
+    valid = {f.name for f in fields(SimulationProfile)}
+    overrides = {k: v for k, v in (overrides or {}).items() if k in valid}
+    return replace(PROFILES[name], **overrides)
+
+
+class SimulatedProviderError(Exception):
+    """
+    Error raised by a simulated endpoint.
+    
+    Carries a `response` with headers like the provider SDK errors do,
+    so the rate limiter can honour retry-after.
+    """
+    
+    def __init__(self, status_code: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+# ============================================
+# Canned Responses
+# ============================================
+
+_ANALYSIS_TEMPLATE = {
+    "role": "Software Engineer",
+    "company": "Simulated Corp",
+    "salary": "Not mentioned",
+    "tech_stack": ["Python", "SQL", "Docker"],
+    "matching_skills": ["Python", "SQL"],
+    "missing_skills": ["Kubernetes"],
+    "match_score": 75,
+    "reasoning": "Simulated analysis response.",
+}
+
+
+def default_responder(messages: List[BaseMessage]) -> str:
+    """Templated reply: a JobAnalysis for analyst prompts, generic JSON or text otherwise."""
+    text = "\n".join(str(m.content) for m in messages)
+    
+    if "match_score" in text:
+        return json.dumps(_ANALYSIS_TEMPLATE)
+    if "json" in text.lower():
+        return json.dumps({"simulated": True, "summary": "Simulated structured response."})
+    return "This is a simulated response."
+
+
+# ============================================
+# Chat Model
+# ============================================
+
+class SimulatedChatModel(BaseChatModel):
+    """
+    LangChain chat model that sleeps, fails and answers according to a profile.
+    
+    Failure state (bursts, request quota) is kept on the instance, so a
+    pooled client behaves like one provider endpoint across calls. Pass
+    `seed` for reproducible runs.
+    """
+    
+    model: str = "simulated-model"
+    profile: SimulationProfile = SimulationProfile()
+    responses: Optional[List[str]] = None
+    responder: Optional[Callable[[List[BaseMessage]], str]] = None
+    seed: Optional[int] = None
+    
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
+    _rng: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _burst_remaining: int = PrivateAttr(default=0)
+    _request_times: deque = PrivateAttr(default_factory=deque)
+    _response_index: int = PrivateAttr(default=0)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {"calls": 0, "rate_limited": 0, "errors": 0})
+    
+    def model_post_init(self, __context: Any):
+        self._rng = random.Random(self.seed)
+    
+    @property
+    def _llm_type(self) -> str:
+        return "simulated"
+    
+    def _get_ls_params(self, stop: Optional[List[str]] = None, **kwargs):
+        params = super()._get_ls_params(stop=stop, **kwargs)
+        params["ls_provider"] = "simulated"
+        params["ls_model_name"] = self.model
+        return params
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+    
+    # Behaviour
+    
+    def _sample_latency(self) -> float:
+        p = self.profile
+        if p.latency_distribution == "fixed" or p.latency_mean <= 0:
+            return max(0.0, p.latency_mean)
+        if p.latency_distribution == "uniform":
+            spread = p.latency_mean * p.latency_jitter
+            return max(0.0, self._rng.uniform(p.latency_mean - spread, p.latency_mean + spread))
+        # Lognormal with the configured mean: long right tail like real APIs
+        sigma = max(p.latency_jitter, 1e-6)
+        mu = math.log(p.latency_mean) - sigma ** 2 / 2
+        return self._rng.lognormvariate(mu, sigma)
+    
+    def _admit(self) -> float:
+        """Decide the outcome of a call; returns its latency or raises the injected error."""
+        p = self.profile
+        now = time.monotonic()
+        
+        with self._lock:
+            self._stats["calls"] += 1
+            
+            if p.rpm > 0:
+                while self._request_times and now - self._request_times[0] >= 60:
+                    self._request_times.popleft()
+                if len(self._request_times) >= p.rpm:
+                    self._stats["rate_limited"] += 1
+                    retry_after = 60 - (now - self._request_times[0])
+                    raise SimulatedProviderError(429, "Rate limit reached: requests per minute", {"retry-after": f"{retry_after:.2f}"})
+                self._request_times.append(now)
+            
+            if self._rng.random() < p.rate_limit_rate:
+                self._stats["rate_limited"] += 1
+                raise SimulatedProviderError(429, "Too Many Requests", {"retry-after": str(p.retry_after)})
+            
+            if self._burst_remaining > 0:
+                self._burst_remaining -= 1
+                self._stats["errors"] += 1
+                raise SimulatedProviderError(503, "Service unavailable (burst)")
+            
+            if self._rng.random() < p.error_rate:
+                if self._rng.random() < p.burst_rate:
+                    self._burst_remaining = max(0, p.burst_length - 1)
+                self._stats["errors"] += 1
+                raise SimulatedProviderError(500, "Internal server error")
+            
+            return self._sample_latency()
+    
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        if self.responses:
+            with self._lock:
+                reply = self.responses[self._response_index % len(self.responses)]
+                self._response_index += 1
+            return reply
+        return (self.responder or default_responder)(messages)
+    
+    def _message(self, messages: List[BaseMessage], text: str) -> AIMessage:
+        from src.core.rate_limiter import estimate_tokens
+        prompt_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+        completion_tokens = estimate_tokens(text)
+        return AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+        )
+    
+    def _chunks(self, text: str) -> List[str]:
+        words = text.split(" ")
+        return [word + (" " if i < len(words) - 1 else "") for i, word in enumerate(words)]
+    
+    def _chunk_delay(self, chunk: str) -> float:
+        tps = self.profile.tokens_per_second
+        return max(1, len(chunk) // 4) / tps if tps > 0 else 0.0
+    
+    # LangChain interface
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self._admit())
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, self._reply(messages)))])
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self._admit())
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, self._reply(messages)))])
+    
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._admit())
+        for chunk in self._chunks(self._reply(messages)):
+            time.sleep(self._chunk_delay(chunk))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+    
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._admit())
+        for chunk in self._chunks(self._reply(messages)):
+            await asyncio.sleep(self._chunk_delay(chunk))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+
+def build_simulated_model(model: str, endpoint: str) -> SimulatedChatModel:
+    """Create the simulated model for one endpoint from settings."""
+    seed = None
+    if settings.llm_simulated_seed is not None:
+        # Distinct but reproducible streams per endpoint
+        seed = settings.llm_simulated_seed + sum(map(ord, endpoint))
+    
+    return SimulatedChatModel(
+        model=model,
+        profile=get_profile(settings.llm_simulated_profile, settings.llm_simulated_overrides),
+        seed=seed
+    )
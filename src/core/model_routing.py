@@ -0,0 +1,122 @@
+"""
+Model Routing - Task classes mapped to model tiers with latency SLAs
+Cheap steps (extraction, classification) go to the small model; only scoring and long-form writing use the large one
+"""
+import logging
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TaskRoute:
+    """Where a task class runs and how long a call may take before the endpoint counts as too slow."""
+    tier: str
+    latency_sla: float  # seconds, p95 target per call
+
+
+# Models per tier and provider; providers missing from a tier use their configured default
+DEFAULT_TIERS: Dict[str, Dict[str, str]] = {
+    "small": {"groq": "llama-3.1-8b-instant"},
+    "large": {"groq": "llama-3.3-70b-versatile"},
+}
+
+DEFAULT_ROUTES: Dict[str, TaskRoute] = {
+    # Short structured answers from given text
+    "extraction": TaskRoute("small", 4.0),
+    "skill_extraction": TaskRoute("small", 4.0),
+    "classification": TaskRoute("small", 3.0),
+    "triage": TaskRoute("small", 2.0),
+    # Interactive drafting (questions, scripts) and agent tool orchestration
+    "drafting": TaskRoute("small", 6.0),
+    "orchestration": TaskRoute("small", 6.0),
+    # Steps where quality decides the outcome
+    "scoring": TaskRoute("large", 15.0),
+    "creative_writing": TaskRoute("large", 20.0),
+}
+
+
+# Set inside small_models_only(): every route is served from this tier
+_tier_cap: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_tier_cap", default=None)
+
+
+@contextmanager
+def small_models_only():
+    """Route every task to the small tier inside the block (e.g. when a run budget is low)."""
+    token = _tier_cap.set("small")
+    try:
+        yield
+    finally:
+        _tier_cap.reset(token)
+
+
+class ModelRouter:
+    """
+    Routing table from task class to model tier.
+    
+    Defaults above are merged with settings: LLM_MODEL_TIERS overrides
+    models per tier and provider, LLM_TASK_ROUTES re-points task classes
+    ({"scoring": "small"} or {"scoring": {"tier": "large", "latency_sla": 10}}).
+    Unknown tasks (and no task) keep the provider chain defaults.
+    """
+    
+    def tiers(self) -> Dict[str, Dict[str, str]]:
+        tiers = {name: dict(models) for name, models in DEFAULT_TIERS.items()}
+        for name, models in settings.llm_model_tiers.items():
+            tiers.setdefault(name, {}).update(models)
+        return tiers
+    
+    def route(self, task: Optional[str]) -> Optional[TaskRoute]:
+        if task is None:
+            return None
+        
+        route = DEFAULT_ROUTES.get(task)
+        override = settings.llm_task_routes.get(task)
+        if isinstance(override, str):
+            override = {"tier": override}
+        if override:
+            route = TaskRoute(
+                tier=override.get("tier", route.tier if route else "small"),
+                latency_sla=float(override.get("latency_sla", route.latency_sla if route else 0.0))
+            )
+        
+        if route is None:
+            logger.debug(f"No route for task '{task}', using provider defaults")
+        elif _tier_cap.get() and route.tier != _tier_cap.get():
+            route = TaskRoute(_tier_cap.get(), route.latency_sla)
+        return route
+    
+    def tier(self, task: Optional[str]) -> Optional[str]:
+        route = self.route(task)
+        return route.tier if route else None
+    
+    def models(self, task: Optional[str]) -> dict:
+        """Model per LLMProvider for a task class (empty for unrouted tasks)."""
+        from src.core.llm_provider import LLMProvider
+        
+        route = self.route(task)
+        if route is None:
+            return {}
+        
+        tier = self.tiers().get(route.tier)
+        if tier is None:
+            logger.warning(f"Task '{task}' routed to unknown tier '{route.tier}'")
+            return {}
+        return {LLMProvider(provider): model for provider, model in tier.items()}
+    
+    def model(self, task: Optional[str], provider, default: str) -> str:
+        """Model name for one provider (e.g. for a DeepAgent's chat model)."""
+        return self.models(task).get(provider, default)
+    
+    def latency_sla(self, task: Optional[str]) -> Optional[float]:
+        route = self.route(task)
+        return route.latency_sla if route and route.latency_sla > 0 else None
+
+
+# Singleton instance
+model_router = ModelRouter()
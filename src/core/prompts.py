@@ -0,0 +1,229 @@
+"""
+Prompt Templates - Prefix-cache-friendly prompt layout shared by the agents
+Static instructions first, then the candidate profile, then the per-job content
+"""
+import json
+import textwrap
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Union
+
+from langchain_core.messages import SystemMessage, HumanMessage
+
+
+Profile = Union[str, Dict[str, Any]]
+
+
+def canonical_profile(profile: Profile, limit: int = 0) -> str:
+    """
+    Byte-stable text for a candidate profile.
+    
+    Dicts are serialized with sorted keys so the same profile always
+    renders identically (provider prefix caches match on exact bytes).
+    """
+    if isinstance(profile, str):
+        text = profile.strip()
+    else:
+        text = json.dumps(profile, sort_keys=True, indent=1, ensure_ascii=False, default=str)
+    return text[:limit] if limit else text
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    A prompt split by how often each part changes.
+    
+    - system: static instructions and output format (never changes)
+    - profile_header: label for the candidate block (changes per candidate)
+    - job: str.format template for the per-job content, rendered last
+    
+    Everything up to the job block is identical across the jobs of a run,
+    so providers with prompt caching serve it from cache.
+    """
+    name: str
+    system: str
+    job: str
+    profile_header: str = "CANDIDATE PROFILE:"
+    
+    def prefix(self, profile: str) -> str:
+        return _render_prefix(self.profile_header, profile)
+    
+    def messages(self, job_fields: Dict[str, Any], profile: str = "") -> List:
+        """System message plus one user message: [profile block] + job block."""
+        job_text = self.job.format(**job_fields)
+        content = f"{self.prefix(profile)}{job_text}" if profile else job_text
+        return [SystemMessage(content=self.system), HumanMessage(content=content)]
+
+
+@lru_cache(maxsize=32)
+def _render_prefix(header: str, profile: str) -> str:
+    return f"{header}\n{profile}\n\n"
+
+
+def _block(text: str) -> str:
+    return textwrap.dedent(text).strip()
+
+
+# ============================================
+# Analyst
+# ============================================
+
+ANALYST_SCORING = PromptTemplate(
+    name="analyst_scoring",
+    system=_block("""
+        You are an expert HR Analyst and a precise data extractor. Analyze the JOB POSTING
+        against the CANDIDATE PROFILE (resume). Output ONLY valid JSON.
+        
+        Return a valid JSON object (NO markdown) with fields:
+        - role: (str) Job Title
+        - company: (str) Company Name
+        - salary: (str) Salary Range or "Not mentioned"
+        - tech_stack: (list[str]) Key technologies required (max 8)
+        - matching_skills: (list[str]) Skills candidate has that match the job (max 6)
+        - missing_skills: (list[str]) Skills required but candidate is missing (max 6)
+        - match_score: (int) 0-100 score based on overall fit
+        - reasoning: (str) Brief explanation for the match score (2-3 sentences)
+    """),
+    profile_header="CANDIDATE RESUME:",
+    job=_block("""
+        JOB POSTING URL: {url}
+        JOB POSTING TEXT:
+        {job_text}
+    """),
+)
+
+ANALYST_TRIAGE = PromptTemplate(
+    name="analyst_triage",
+    system=_block("""
+        You are a fast job-fit screener. Estimate how well the candidate fits the job.
+        Be quick and rough. Output ONLY valid JSON:
+        {"role": str, "company": str, "match_score": int 0-100,
+         "matching_skills": [str], "reasoning": "one sentence"}
+    """),
+    profile_header="CANDIDATE SKILLS:",
+    job=_block("""
+        JOB POSTING ({url}):
+        {summary}
+    """),
+)
+
+
+# ============================================
+# Resume
+# ============================================
+
+RESUME_TAILORING = PromptTemplate(
+    name="resume_tailoring",
+    system=_block("""
+        You are an ATS resume expert. Tailor the candidate's resume for the job. Make it ATS-optimized.
+        
+        INSTRUCTIONS:
+        1. Write a compelling 2-3 sentence summary targeting this role
+        2. Rewrite experience bullets to highlight relevant achievements
+        3. Prioritize matching skills at the top
+        4. Use action verbs and quantified results
+        5. Include keywords naturally throughout
+        
+        Return ONLY valid JSON with this structure:
+        {
+            "personal_information": {...from profile...},
+            "summary": "Tailored professional summary",
+            "skills": {
+                "primary": ["most relevant skills"],
+                "secondary": ["other skills"],
+                "tools": ["relevant tools/tech"]
+            },
+            "experience": [
+                {
+                    "company": "...",
+                    "title": "...",
+                    "dates": "...",
+                    "location": "...",
+                    "highlights": ["Tailored bullet 1", "Tailored bullet 2"]
+                }
+            ],
+            "projects": [...],
+            "education": [...],
+            "tailoring_notes": "Key changes made for this role"
+        }
+    """),
+    profile_header="PROFILE:",
+    job=_block("""
+        JOB:
+        - Role: {role}
+        - Company: {company}
+        - Keywords: {keywords}
+        - Must Have: {must_have}
+        {feedback}
+    """),
+)
+
+
+# ============================================
+# Cover Letter
+# ============================================
+
+COVER_LETTER_CULTURE = PromptTemplate(
+    name="cover_letter_culture",
+    system=_block("""
+        You analyze company culture from job postings. Based on the job posting, infer the company culture.
+        
+        Return JSON:
+        {
+            "culture_type": "startup/corporate/tech-forward/traditional",
+            "values": ["likely company values"],
+            "communication_style": "formal/casual/technical",
+            "unique_aspects": ["what makes them stand out"]
+        }
+        
+        Output ONLY valid JSON.
+    """),
+    job=_block("""
+        Company: {company}
+        Role: {role}
+        Tech Stack: {tech_stack}
+    """),
+)
+
+COVER_LETTER_CONTENT = PromptTemplate(
+    name="cover_letter_content",
+    system=_block("""
+        You write personalized cover letters. Be authentic and compelling.
+        
+        Generate a cover letter with:
+        1. Opening: Hook + genuine interest in THIS specific company/role
+        2. Body: 2-3 specific achievements that match job requirements
+        3. Closing: Enthusiasm + clear call to action
+        
+        Write the letter as plain text, paragraphs separated by a blank line:
+        
+        Dear Hiring Manager, (or personalized)
+        
+        Opening paragraph (2-3 compelling sentences)
+        
+        Body paragraph (3-4 sentences with specific examples)
+        
+        Closing paragraph (2 sentences with call to action)
+        
+        Sincerely,
+        [Name]
+        
+        Output ONLY the letter - no JSON, markdown or notes.
+    """),
+    profile_header="CANDIDATE:",
+    job=_block("""
+        JOB:
+        - Position: {role}
+        - Company: {company}
+        - Tech Stack: {tech_stack}
+        
+        COMPANY CULTURE:
+        - Type: {culture_type}
+        - Values: {values}
+        
+        MATCHING SKILLS: {matching_skills}
+        
+        TONE: {tone}
+        {feedback}
+    """),
+)
@@ -0,0 +1,238 @@
+"""
+LLM Provider Health - Circuit breakers and latency tracking per endpoint
+Lets the fallback chain skip dead providers and prefer fast ones
+"""
+import time
+import logging
+import threading
+from enum import Enum
+from collections import deque
+from typing import Optional, Dict, List, Tuple, Any
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"        # healthy, requests flow
+    OPEN = "open"            # failing, requests are skipped
+    HALF_OPEN = "half_open"  # cooling down, one probe request allowed
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class EndpointHealth:
+    """
+    Rolling outcome window and circuit for one (provider, model, key).
+    
+    The circuit opens once the error rate over the window reaches the
+    threshold, stays open for a cooldown that doubles on each failed
+    probe, then lets a single half-open probe through.
+    """
+    
+    PROBE_TIMEOUT = 60.0
+    
+    def __init__(
+        self,
+        window: int = 20,
+        error_threshold: float = 0.5,
+        min_calls: int = 3,
+        cooldown: float = 30.0,
+        max_cooldown: float = 300.0
+    ):
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        
+        self.outcomes: deque = deque(maxlen=window)    # True = success
+        self.latencies: deque = deque(maxlen=window)   # successful calls only
+        self.state = CircuitState.CLOSED
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+    
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+    
+    def p50(self) -> Optional[float]:
+        return percentile(list(self.latencies), 50)
+    
+    def p95(self) -> Optional[float]:
+        return percentile(list(self.latencies), 95)
+    
+    def retry_at(self) -> float:
+        return self.opened_at + self.cooldown
+    
+    def allow(self, now: float) -> bool:
+        """Whether a request may be sent now (claims the probe when half-open)."""
+        if self.state == CircuitState.CLOSED:
+            return True
+        
+        if self.state == CircuitState.OPEN:
+            if now < self.retry_at():
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self.probe_started = None
+        
+        # Half-open: one probe at a time (a lost probe frees up after a timeout)
+        if self.probe_started is None or now - self.probe_started > self.PROBE_TIMEOUT:
+            self.probe_started = now
+            return True
+        return False
+    
+    def record_success(self, latency: float):
+        self.outcomes.append(True)
+        self.latencies.append(latency)
+        
+        if self.state != CircuitState.CLOSED:
+            logger.info("Circuit closed after successful probe")
+            self.state = CircuitState.CLOSED
+            self.cooldown = self.base_cooldown
+            self.probe_started = None
+    
+    def record_failure(self, now: float):
+        self.outcomes.append(False)
+        
+        if self.state == CircuitState.HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open(now)
+        elif (
+            self.state == CircuitState.CLOSED
+            and len(self.outcomes) >= self.min_calls
+            and self.error_rate >= self.error_threshold
+        ):
+            self._open(now)
+    
+    def _open(self, now: float):
+        self.state = CircuitState.OPEN
+        self.opened_at = now
+        self.probe_started = None
+
+
+class ProviderHealth:
+    """
+    Registry of endpoint health, shared by every UnifiedLLM in the process.
+    
+    Endpoints are keyed by (provider, model, api key) so a bad key or a
+    slow model does not drag down its siblings.
+    """
+    
+    def __init__(
+        self,
+        window: Optional[int] = None,
+        error_threshold: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        cooldown: Optional[float] = None,
+        max_cooldown: Optional[float] = None
+    ):
+        self.params = {
+            "window": window or settings.llm_circuit_window,
+            "error_threshold": error_threshold or settings.llm_circuit_error_threshold,
+            "min_calls": min_calls or settings.llm_circuit_min_calls,
+            "cooldown": cooldown or settings.llm_circuit_cooldown,
+            "max_cooldown": max_cooldown or settings.llm_circuit_max_cooldown,
+        }
+        self._endpoints: Dict[Tuple[str, str, str], EndpointHealth] = {}
+        self._lock = threading.Lock()
+    
+    def _endpoint(self, config) -> EndpointHealth:
+        key = (config.provider.value, config.model, config.api_key)
+        if key not in self._endpoints:
+            self._endpoints[key] = EndpointHealth(**self.params)
+        return self._endpoints[key]
+    
+    def get(self, config) -> EndpointHealth:
+        with self._lock:
+            return self._endpoint(config)
+    
+    def order(self, configs: list, latency_sla: Optional[float] = None) -> list:
+        """
+        Order a provider chain for the next call.
+        
+        Endpoints with open circuits are dropped; the rest are sorted by
+        observed p50 latency, with unmeasured endpoints kept in their
+        configured order after measured ones. With a `latency_sla`,
+        endpoints whose p95 exceeds it go behind those that meet it.
+        If every circuit is open, the endpoint closest to its retry time
+        is kept as the only probe.
+        """
+        now = time.monotonic()
+        
+        with self._lock:
+            endpoints = [(config, self._endpoint(config)) for config in configs]
+        
+        available = [
+            (config, health) for config, health in endpoints
+            if health.state == CircuitState.CLOSED or now >= health.retry_at()
+        ]
+        
+        if not available:
+            if not endpoints:
+                return []
+            config, health = min(endpoints, key=lambda item: item[1].retry_at())
+            with self._lock:
+                if health.state == CircuitState.OPEN:
+                    health.state = CircuitState.HALF_OPEN
+                    health.probe_started = None
+            return [config]
+        
+        def latency_key(item):
+            p50, p95 = item[1].p50(), item[1].p95()
+            too_slow = latency_sla is not None and p95 is not None and p95 > latency_sla
+            return (too_slow, 0, p50) if p50 is not None else (too_slow, 1, 0.0)
+        
+        return [config for config, _ in sorted(available, key=latency_key)]
+    
+    def allow(self, config) -> bool:
+        with self._lock:
+            return self._endpoint(config).allow(time.monotonic())
+    
+    def record_success(self, config, latency: float):
+        with self._lock:
+            self._endpoint(config).record_success(latency)
+    
+    def record_failure(self, config):
+        with self._lock:
+            health = self._endpoint(config)
+            was_open = health.state == CircuitState.OPEN
+            health.record_failure(time.monotonic())
+            if health.state == CircuitState.OPEN and not was_open:
+                logger.warning(
+                    f"Circuit opened for {config.provider.value}/{config.model} "
+                    f"(error rate {health.error_rate:.0%}, retry in {health.cooldown:.0f}s)"
+                )
+    
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint state, error rate and latency percentiles (keys masked)."""
+        with self._lock:
+            return {
+                f"{provider}/{model}:...{api_key[-4:]}": {
+                    "state": health.state.value,
+                    "error_rate": round(health.error_rate, 3),
+                    "p50": round(health.p50(), 3) if health.p50() is not None else None,
+                    "p95": round(health.p95(), 3) if health.p95() is not None else None,
+                    "calls": len(health.outcomes),
+                }
+                for (provider, model, api_key), health in self._endpoints.items()
+            }
+
+
+# Singleton instance
+provider_health = ProviderHealth()
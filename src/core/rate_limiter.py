@@ -0,0 +1,376 @@
+"""
+LLM Rate Limiter - Proactive per-key RPM/TPM token buckets
+Queues callers until capacity frees up instead of discovering limits via 429s
+"""
+import re
+import time
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, List, Tuple, Mapping, Any
+
+from src.core.config import settings
+from src.core.llm_scheduler import INTERACTIVE, BULK
+
+logger = logging.getLogger(__name__)
+
+# Providers whose x-ratelimit-*-requests headers describe a daily budget (others: per minute)
+DAILY_REQUEST_HEADERS = {"groq"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parse a rate-limit reset/retry value into seconds.
+    
+    Accepts plain seconds ("7.5"), Groq-style durations ("1m2.5s", "120ms")
+    and HTTP dates ("Wed, 21 Oct 2015 07:28:00 GMT").
+    """
+    if value is None:
+        return None
+    
+    value = str(value).strip()
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    parts = re.findall(r"([0-9.]+)(ms|h|m|s)", value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+        return sum(float(n) * scale[u] for n, u in parts)
+    
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Reservation-style token bucket.
+    
+    Callers take capacity up front and are told how long to wait, so the
+    level can go negative and later callers queue behind earlier ones.
+    """
+    
+    def __init__(self, capacity: float, per_seconds: float = 60.0):
+        self.capacity = float(capacity)
+        self.per_seconds = per_seconds
+        self.rate = self.capacity / per_seconds
+        self.level = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float):
+        # `now` may predate a bucket created while it was being looked up
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+    
+    def delay_for(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (requests larger than the bucket wait for a full one)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+    
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+    
+    def cap(self, level: float, now: float):
+        """Lower the level to what the provider reports as remaining."""
+        self._refill(now)
+        self.level = min(self.level, float(level))
+    
+    def resize(self, capacity: float, now: float):
+        """Set the capacity to what the provider reports as the limit (up or down), keeping what is used."""
+        self._refill(now)
+        used = self.capacity - self.level
+        self.capacity = float(capacity)
+        self.rate = self.capacity / self.per_seconds
+        self.level = min(self.capacity, self.capacity - used)
+
+
+class KeyLimiter:
+    """Request and token buckets for one provider API key and model."""
+    
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.daily_requests: Optional[TokenBucket] = None  # only known from response headers
+        self.blocked_until = 0.0
+        self.waits = 0
+        self.total_wait = 0.0
+    
+    def _request_buckets(self) -> List[TokenBucket]:
+        return [bucket for bucket in (self.requests, self.daily_requests) if bucket]
+    
+    def delay_for(self, tokens: int, now: float, reserve: float = 0.0) -> float:
+        """Seconds until the request fits, keeping `reserve` (a fraction of each bucket) untouched."""
+        delay = max(0.0, self.blocked_until - now)
+        for bucket in self._request_buckets():
+            delay = max(delay, bucket.delay_for(1 + reserve * bucket.capacity, now))
+        if self.tokens:
+            delay = max(delay, self.tokens.delay_for(tokens + reserve * self.tokens.capacity, now))
+        return delay
+    
+    def take(self, tokens: int):
+        for bucket in self._request_buckets():
+            bucket.take(1)
+        if self.tokens:
+            self.tokens.take(tokens)
+    
+    def set_limit(self, kind: str, capacity: float, per_seconds: float, now: float):
+        """Size the `kind` bucket ("requests", "daily_requests", "tokens") to a provider-reported limit."""
+        if capacity <= 0:
+            return
+        bucket = getattr(self, kind)
+        if bucket is None or bucket.per_seconds != per_seconds:
+            setattr(self, kind, TokenBucket(capacity, per_seconds))
+        else:
+            bucket.resize(capacity, now)
+    
+    def block_for(self, seconds: float, now: float):
+        self.blocked_until = max(self.blocked_until, now + seconds)
+    
+    def headroom(self, now: float) -> float:
+        """Fraction of the tighter bucket still available (0 while blocked)."""
+        if now < self.blocked_until:
+            return 0.0
+        
+        fractions = [1.0]
+        for bucket in (self.requests, self.daily_requests, self.tokens):
+            if bucket:
+                bucket._refill(now)
+                fractions.append(max(0.0, bucket.level) / bucket.capacity)
+        return min(fractions)
+
+
+class RateLimiter:
+    """
+    Registry of per-key, per-model limiters.
+    
+    Starting limits come from settings (requests/tokens per minute under
+    "provider:model", else "provider"), since providers such as Groq and
+    Gemini meter each model separately. At runtime the buckets are sized
+    from x-ratelimit-limit-* headers (so a paid key is not held to
+    free-tier numbers) and tightened from Retry-After and
+    x-ratelimit-remaining-*. Calls without a model (key-wide 429
+    penalties) block every model of the key.
+    """
+    
+    def __init__(self, limits: Optional[Dict[str, Dict[str, int]]] = None):
+        self.limits = limits if limits is not None else settings.llm_rate_limits
+        self._limiters: Dict[Tuple[str, str, str], KeyLimiter] = {}
+        self._lock = threading.Lock()
+    
+    def _limiter(self, provider: str, api_key: str, model: str = "") -> KeyLimiter:
+        key = (provider, api_key, model)
+        if key not in self._limiters:
+            limits = self.limits.get(f"{provider}:{model}") or self.limits.get(provider, {})
+            self._limiters[key] = KeyLimiter(
+                rpm=int(limits.get("rpm", 0)),
+                tpm=int(limits.get("tpm", 0))
+            )
+        return self._limiters[key]
+    
+    def _key_blocked_until(self, provider: str, api_key: str, model: str) -> float:
+        """Key-wide block (set without a model) that also applies to `model`."""
+        if not model:
+            return 0.0
+        key_wide = self._limiters.get((provider, api_key, ""))
+        return key_wide.blocked_until if key_wide else 0.0
+    
+    def reserve(
+        self,
+        provider: str,
+        api_key: str,
+        tokens: int,
+        max_wait: Optional[float] = None,
+        priority: str = INTERACTIVE,
+        model: str = ""
+    ) -> Optional[float]:
+        """
+        Reserve one request and `tokens` tokens for a key.
+        
+        Bulk requests leave LLM_INTERACTIVE_RESERVE of each bucket to
+        interactive ones, and reserve nothing while they have to wait:
+        they call again after the delay, so a bulk backlog never queues
+        ahead of interactive calls.
+        
+        Returns:
+            Seconds the caller must wait before sending, or None if the
+            wait would exceed `max_wait` (nothing is reserved then).
+        """
+        now = time.monotonic()
+        reserve = settings.llm_interactive_reserve if priority == BULK else 0.0
+        
+        with self._lock:
+            limiter = self._limiter(provider, api_key, model)
+            delay = max(
+                limiter.delay_for(tokens, now, reserve),
+                self._key_blocked_until(provider, api_key, model) - now
+            )
+            
+            if max_wait is not None and delay > max_wait:
+                return None
+            
+            if priority == BULK and delay > 0:
+                limiter.waits += 1
+                limiter.total_wait += delay
+                return delay
+            
+            limiter.take(tokens)
+            if delay > 0:
+                limiter.waits += 1
+                limiter.total_wait += delay
+            
+            return delay
+    
+    def headroom(self, provider: str, api_key: str, model: str = "") -> float:
+        """
+        Remaining quota of a key (for `model`, or its tightest model) as a
+        fraction (1.0 = idle, 0.0 = exhausted or cooling down).
+        """
+        now = time.monotonic()
+        with self._lock:
+            if model:
+                if now < self._key_blocked_until(provider, api_key, model):
+                    return 0.0
+                return self._limiter(provider, api_key, model).headroom(now)
+            
+            limiters = [
+                limiter for (p, k, _), limiter in self._limiters.items()
+                if p == provider and k == api_key
+            ]
+            return min((limiter.headroom(now) for limiter in limiters), default=1.0)
+    
+    def record_usage(
+        self,
+        provider: str,
+        api_key: str,
+        estimated: int,
+        actual: Optional[int],
+        model: str = ""
+    ):
+        """Reconcile the token estimate with the provider-reported usage."""
+        if not actual:
+            return
+        
+        with self._lock:
+            limiter = self._limiter(provider, api_key, model)
+            if limiter.tokens:
+                limiter.tokens.level -= (actual - estimated)
+    
+    def observe_headers(self, provider: str, api_key: str, headers: Mapping[str, Any], model: str = ""):
+        """
+        Size and tighten a key's limiter from response headers.
+        
+        Understands Retry-After, x-ratelimit-limit-{requests,tokens} (bucket
+        capacity, raised or lowered), Groq's
+        x-ratelimit-{remaining,reset}-{requests,tokens} and OpenRouter's
+        x-ratelimit-limit / -remaining / -reset (epoch ms).
+        """
+        headers = {str(k).lower(): v for k, v in headers.items()}
+        now = time.monotonic()
+        
+        with self._lock:
+            limiter = self._limiter(provider, api_key, model)
+            
+            # Reported limits replace the configured ones
+            limit_requests = _as_float(headers.get("x-ratelimit-limit-requests"))
+            if limit_requests and provider in DAILY_REQUEST_HEADERS:
+                limiter.set_limit("daily_requests", limit_requests, 86400.0, now)
+            elif limit_requests:
+                limiter.set_limit("requests", limit_requests, 60.0, now)
+            limit_tokens = _as_float(headers.get("x-ratelimit-limit-tokens"))
+            if limit_tokens:
+                limiter.set_limit("tokens", limit_tokens, 60.0, now)
+            limit = _as_float(headers.get("x-ratelimit-limit"))
+            if limit:
+                limiter.set_limit("requests", limit, 60.0, now)
+            
+            retry_after = parse_duration(headers.get("retry-after"))
+            if retry_after:
+                limiter.block_for(retry_after, now)
+            
+            # Groq: requests are a daily budget, tokens a per-minute one
+            remaining_requests = _as_float(headers.get("x-ratelimit-remaining-requests"))
+            if remaining_requests is not None:
+                bucket = limiter.daily_requests if provider in DAILY_REQUEST_HEADERS else limiter.requests
+                if bucket:
+                    bucket.cap(remaining_requests, now)
+                if remaining_requests <= 0:
+                    reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+                    if reset:
+                        limiter.block_for(reset, now)
+            
+            remaining_tokens = _as_float(headers.get("x-ratelimit-remaining-tokens"))
+            if remaining_tokens is not None and limiter.tokens:
+                limiter.tokens.cap(remaining_tokens, now)
+                if remaining_tokens <= 0:
+                    reset = parse_duration(headers.get("x-ratelimit-reset-tokens"))
+                    if reset:
+                        limiter.block_for(reset, now)
+            
+            # OpenRouter: per-interval request budget with epoch-ms reset
+            remaining = _as_float(headers.get("x-ratelimit-remaining"))
+            if remaining is not None:
+                if limiter.requests:
+                    limiter.requests.cap(remaining, now)
+                reset_ms = _as_float(headers.get("x-ratelimit-reset"))
+                if remaining <= 0 and reset_ms:
+                    limiter.block_for(max(0.0, reset_ms / 1000.0 - time.time()), now)
+    
+    def penalize(
+        self,
+        provider: str,
+        api_key: str,
+        error: Exception,
+        fallback_seconds: float,
+        model: str = ""
+    ):
+        """
+        Block a key (for `model`, or all its models) after a rate-limit error.
+        
+        Uses the error's response headers when the SDK exposes them,
+        otherwise backs off for `fallback_seconds`.
+        """
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        
+        if headers and parse_duration(headers.get("retry-after")) is not None:
+            self.observe_headers(provider, api_key, headers, model)
+        else:
+            with self._lock:
+                self._limiter(provider, api_key, model).block_for(fallback_seconds, time.monotonic())
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-key/model wait counters (keys are masked)."""
+        with self._lock:
+            return {
+                f"{provider}:...{api_key[-4:]}" + (f":{model}" if model else ""): {
+                    "waits": limiter.waits,
+                    "total_wait": round(limiter.total_wait, 2),
+                }
+                for (provider, api_key, model), limiter in self._limiters.items()
+            }
+
+
+def _as_float(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+# Singleton instance
+rate_limiter = RateLimiter()
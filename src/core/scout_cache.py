@@ -0,0 +1,217 @@
+"""
+Scout Result Cache - Search results reused across runs instead of re-spending SerpAPI quota
+SQLite store keyed by normalized query, location and ATS domain set, with TTL
+"""
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Result fields worth keeping (the rest of a SerpAPI organic result is layout noise)
+KEPT_FIELDS = ("link", "title", "snippet", "date")
+
+
+def normalize_text(text: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a query or location."""
+    return " ".join(re.sub(r"[^\w+#.]+", " ", (text or "").lower()).split())
+
+
+@dataclass
+class CachedSearch:
+    """Organic results for one (query, location) search."""
+    results: List[Dict[str, Any]]
+    max_results: int  # how far the search was paged
+    complete: bool  # reached the last page before max_results
+    fetched_at: float
+    
+    def covers(self, max_results: int) -> bool:
+        """A deeper or exhausted search also answers a shallower one."""
+        return self.complete or self.max_results >= max_results
+
+
+class ScoutCache:
+    """
+    Per-search result cache shared by all scout runs.
+    
+    Keys hash the normalized query, location and sorted ATS domain set,
+    so "Python Developer  / NYC" and "python developer / nyc" share an
+    entry, and a sweep over several locations reuses every location
+    that was searched recently. Entries expire after `ttl_seconds`.
+    Without a path the cache lives in memory only.
+    """
+    
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 12 * 3600):
+        self.path = Path(path) if path else None
+        self.ttl_seconds = ttl_seconds
+        
+        self._memory: Dict[str, Tuple[CachedSearch, float]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+    
+    @staticmethod
+    def make_key(query: str, location: str, domains: Iterable[str]) -> str:
+        payload = json.dumps(
+            {
+                "query": normalize_text(query),
+                "location": normalize_text(location),
+                "domains": sorted({d.lower().removeprefix("site:") for d in domains}),
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        
+        if self._conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS scout_cache (
+                        key TEXT PRIMARY KEY,
+                        query TEXT NOT NULL,
+                        location TEXT NOT NULL,
+                        results TEXT NOT NULL,
+                        max_results INTEGER NOT NULL,
+                        complete INTEGER NOT NULL,
+                        fetched_at REAL NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                    """
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Scout cache unavailable ({self.path}): {e}")
+                self.path = None
+                self._conn = None
+        
+        return self._conn
+    
+    def get(self, query: str, location: str, domains: Iterable[str], max_results: int) -> Optional[CachedSearch]:
+        """Fresh cached results deep enough for `max_results`, or None."""
+        key = self.make_key(query, location, domains)
+        now = time.time()
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                entry = self._disk_get(key)
+                if entry is not None:
+                    self._memory[key] = entry
+            
+            if entry is not None:
+                cached, expires_at = entry
+                if expires_at > now and cached.covers(max_results):
+                    self.hits += 1
+                    return cached
+            
+            self.misses += 1
+            return None
+    
+    def _disk_get(self, key: str) -> Optional[Tuple[CachedSearch, float]]:
+        conn = self._connect()
+        if conn is None:
+            return None
+        
+        try:
+            row = conn.execute(
+                "SELECT results, max_results, complete, fetched_at, expires_at FROM scout_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Scout cache read failed: {e}")
+            return None
+        
+        if row is None:
+            return None
+        results, max_results, complete, fetched_at, expires_at = row
+        return CachedSearch(json.loads(results), max_results, bool(complete), fetched_at), expires_at
+    
+    def set(
+        self,
+        query: str,
+        location: str,
+        domains: Iterable[str],
+        results: List[Dict[str, Any]],
+        max_results: int,
+        complete: bool
+    ):
+        """Store the organic results of a fresh search."""
+        key = self.make_key(query, location, domains)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        kept = [{k: r[k] for k in KEPT_FIELDS if k in r} for r in results]
+        cached = CachedSearch(kept, max_results, complete, now)
+        
+        with self._lock:
+            self._memory[key] = (cached, expires_at)
+            self.writes += 1
+            
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO scout_cache "
+                    "(key, query, location, results, max_results, complete, fetched_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, normalize_text(query), normalize_text(location), json.dumps(kept),
+                     max_results, int(complete), now, expires_at)
+                )
+                conn.execute("DELETE FROM scout_cache WHERE expires_at <= ?", (now,))
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Scout cache write failed: {e}")
+    
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            if conn is not None:
+                conn.execute("DELETE FROM scout_cache")
+                conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "writes": self.writes,
+        }
+
+
+# Singleton instance
+_cache_instance: Optional[ScoutCache] = None
+
+
+def get_scout_cache() -> ScoutCache:
+    """Get or create the process-wide scout result cache."""
+    global _cache_instance
+    
+    if _cache_instance is None:
+        _cache_instance = ScoutCache(
+            path=settings.scout_cache_path or None,
+            ttl_seconds=settings.scout_cache_ttl_hours * 3600
+        )
+    
+    return _cache_instance
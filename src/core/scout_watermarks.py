@@ -0,0 +1,184 @@
+"""
+Scout Watermarks - Per saved search record of postings already returned
+Repeat runs of a search only surface postings that are new (or changed) since the last run
+"""
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.core.config import settings
+from src.core.job_urls import job_key
+from src.core.scout_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+def search_key(kind: str, *terms: Sequence[str]) -> str:
+    """
+    Stable id of a saved search: the source (`kind`) plus its normalized,
+    order-independent term lists (queries, locations, boards, ...).
+    """
+    payload = json.dumps([kind, *[sorted({normalize_text(t) for t in group}) for group in terms]])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def fingerprint(*parts: Optional[str]) -> str:
+    """Content hash used to notice that a posting changed between runs."""
+    return hashlib.sha256("\x1f".join(p or "" for p in parts).encode("utf-8")).hexdigest()[:16]
+
+
+class SearchWatermarks:
+    """
+    Postings each saved search has already returned, with the content
+    fingerprint seen last time and first/last-seen timestamps.
+    
+    `select` returns only postings a search has not returned before
+    (with `resurface_changed`, also ones whose fingerprint moved) without
+    touching the watermark; `commit` advances it once a returned posting
+    has actually been processed, so postings a run never reached come
+    back next time. Memory-only without a path.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self._memory: Dict[Tuple[str, str], Tuple[str, float, float]] = {}
+        self._runs: Dict[str, float] = {}
+        self._offered: Dict[Tuple[str, str], str] = {}  # fingerprints handed out by select
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        
+        if self._conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS scout_watermarks (
+                        search TEXT NOT NULL,
+                        posting TEXT NOT NULL,
+                        fingerprint TEXT NOT NULL,
+                        first_seen REAL NOT NULL,
+                        last_seen REAL NOT NULL,
+                        PRIMARY KEY (search, posting)
+                    )
+                    """
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS scout_runs (search TEXT PRIMARY KEY, last_run REAL NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Scout watermarks unavailable ({self.path}): {e}")
+                self.path = None
+                self._conn = None
+        
+        return self._conn
+    
+    def _load(self, search: str) -> Dict[str, Tuple[str, float, float]]:
+        marks = {posting: entry for (s, posting), entry in self._memory.items() if s == search}
+        conn = self._connect()
+        if conn is not None:
+            try:
+                for posting, fp, first, last in conn.execute(
+                    "SELECT posting, fingerprint, first_seen, last_seen FROM scout_watermarks WHERE search = ?",
+                    (search,)
+                ):
+                    marks.setdefault(posting, (fp, first, last))
+            except sqlite3.Error as e:
+                logger.warning(f"Scout watermarks read failed: {e}")
+        return marks
+    
+    def last_run(self, search: str) -> Optional[float]:
+        """When `search` last advanced its watermark (None if never)."""
+        with self._lock:
+            if search in self._runs:
+                return self._runs[search]
+            conn = self._connect()
+            if conn is None:
+                return None
+            row = conn.execute("SELECT last_run FROM scout_runs WHERE search = ?", (search,)).fetchone()
+            return row[0] if row else None
+    
+    @staticmethod
+    def _posting(url: str) -> str:
+        key = job_key(url)
+        return key.id if key else url
+    
+    def select(self, search: str, postings: Dict[str, str], resurface_changed: bool = False) -> List[str]:
+        """
+        URLs from `postings` ({url: fingerprint}) that `search` has not
+        returned before (or that changed, with `resurface_changed`).
+        The watermark is left alone; `commit` the ones you process.
+        """
+        selected = []
+        
+        with self._lock:
+            marks = self._load(search)
+            for url, fp in postings.items():
+                posting = self._posting(url)
+                previous = marks.get(posting)
+                
+                if previous is None or (resurface_changed and previous[0] != fp):
+                    selected.append(url)
+                    self._offered[(search, posting)] = fp
+        
+        return selected
+    
+    def commit(self, search: str, urls: Sequence[str]):
+        """
+        Advance `search`'s watermark past `urls` (returned by `select`),
+        recording the fingerprint they were selected with.
+        """
+        now = time.time()
+        rows = []
+        
+        with self._lock:
+            marks = self._load(search)
+            for url in urls:
+                posting = self._posting(url)
+                fp = self._offered.pop((search, posting), None)
+                if fp is None:
+                    continue
+                previous = marks.get(posting)
+                first_seen = previous[1] if previous else now
+                self._memory[(search, posting)] = (fp, first_seen, now)
+                rows.append((search, posting, fp, first_seen, now))
+            
+            if not rows:
+                return
+            self._runs[search] = now
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO scout_watermarks "
+                        "(search, posting, fingerprint, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)",
+                        rows
+                    )
+                    conn.execute("INSERT OR REPLACE INTO scout_runs (search, last_run) VALUES (?, ?)", (search, now))
+                    conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Scout watermarks write failed: {e}")
+
+
+# Singleton instance
+_watermarks_instance: Optional[SearchWatermarks] = None
+
+
+def get_search_watermarks() -> SearchWatermarks:
+    """Get or create the process-wide saved-search watermarks."""
+    global _watermarks_instance
+    
+    if _watermarks_instance is None:
+        _watermarks_instance = SearchWatermarks(path=settings.scout_watermarks_path or None)
+    
+    return _watermarks_instance
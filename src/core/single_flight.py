@@ -0,0 +1,81 @@
+"""
+Single-Flight - Coalesce identical in-flight calls onto one execution
+Duplicate callers wait on the first caller's result instead of repeating the work
+"""
+import asyncio
+import weakref
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+    
+    Callers that arrive while a call with the same key is in flight
+    share its result (or exception). Once it finishes the key is free,
+    so later calls run again (caching is a separate concern).
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+        self.executed = 0
+        self.coalesced = 0
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run `fn` unless an identical call is in flight on another thread."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+    
+    async def ado(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async version of do.
+        
+        The work runs in a shared task, so one caller being cancelled
+        does not cancel it for the others.
+        """
+        loop = asyncio.get_running_loop()
+        
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            if task is None:
+                task = asyncio.ensure_future(coro_fn())
+                tasks[key] = task
+                task.add_done_callback(lambda done: tasks.pop(key, None) if tasks.get(key) is done else None)
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        
+        return await asyncio.shield(task)
+    
+    def stats(self) -> Dict[str, int]:
+        return {"executed": self.executed, "coalesced": self.coalesced}
+
+
+# Singleton instance
+llm_single_flight = SingleFlight()
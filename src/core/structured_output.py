@@ -0,0 +1,203 @@
+"""
+Structured Output - Shared JSON extraction, schema validation and repair for LLM responses
+Finds the JSON in a response, validates it, and asks for one cheap repair instead of a full retry
+"""
+import json
+import logging
+from typing import Any, List, Optional, Type, Union
+
+from pydantic import BaseModel, ValidationError
+
+from src.core.llm_provider import LLMError
+
+logger = logging.getLogger(__name__)
+
+
+# The repair request carries only the broken output, not the original prompt
+REPAIR_SYSTEM_PROMPT = "You fix malformed JSON. Output ONLY the corrected JSON, with no explanation."
+REPAIR_MAX_CHARS = 6000
+
+
+class StructuredOutputError(LLMError):
+    """The response could not be turned into valid structured output."""
+    
+    def __init__(self, message: str, raw: str = ""):
+        super().__init__(message)
+        self.raw = raw
+
+
+# ============================================
+# Extraction
+# ============================================
+
+def _balanced_end(text: str, start: int) -> int:
+    """Index just past the bracket that closes text[start], or -1 (string-aware)."""
+    closers = {"{": "}", "[": "]"}
+    stack = [closers[text[start]]]
+    in_string = False
+    escaped = False
+    
+    for i in range(start + 1, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in closers:
+            stack.append(closers[char])
+        elif char in "}]":
+            if char != stack.pop():
+                return -1
+            if not stack:
+                return i + 1
+    return -1
+
+
+def extract_json(text: str) -> Any:
+    """
+    Extract the first JSON object or array from an LLM response.
+    
+    Handles markdown fences, prose before/after the JSON and braces
+    inside string values.
+    
+    Raises:
+        StructuredOutputError: No parseable JSON found
+    """
+    content = (text or "").strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+    
+    last_error = "no JSON object found"
+    for start, char in enumerate(content):
+        if char not in "{[":
+            continue
+        end = _balanced_end(content, start)
+        if end == -1:
+            continue
+        try:
+            return json.loads(content[start:end])
+        except json.JSONDecodeError as e:
+            last_error = str(e)
+    
+    raise StructuredOutputError(f"Could not parse JSON: {last_error}", raw=text)
+
+
+def parse_structured(
+    text: str,
+    schema: Optional[Type[BaseModel]] = None
+) -> Union[BaseModel, Any]:
+    """
+    Extract JSON and validate it against `schema` if given.
+    
+    Returns:
+        A schema instance, or the parsed JSON when no schema is given
+    """
+    data = extract_json(text)
+    if schema is None:
+        return data
+    
+    try:
+        return schema.model_validate(data)
+    except ValidationError as e:
+        raise StructuredOutputError(f"Schema validation failed: {e}", raw=text) from e
+
+
+# ============================================
+# Repair
+# ============================================
+
+def _uncache(llm, raw: str):
+    # A cached response that failed validation would fail the same way for the whole TTL
+    uncache = getattr(llm, "uncache", None)
+    if uncache is not None:
+        uncache(raw)
+
+
+def _schema_hint(schema: Optional[Type[BaseModel]]) -> str:
+    if schema is None:
+        return ""
+    
+    json_schema = schema.model_json_schema()
+    fields = {
+        name: prop.get("type", "any")
+        for name, prop in json_schema.get("properties", {}).items()
+    }
+    required = json_schema.get("required", [])
+    return f"\nExpected fields (type): {json.dumps(fields)}\nRequired: {', '.join(required) or 'none'}"
+
+
+def _repair_messages(raw: str, error: Exception, schema: Optional[Type[BaseModel]]) -> List[dict]:
+    return [
+        {"role": "system", "content": REPAIR_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": (
+                f"This output failed to parse: {str(error)[:300]}{_schema_hint(schema)}\n\n"
+                f"Output to fix:\n{raw[:REPAIR_MAX_CHARS]}"
+            )
+        },
+    ]
+
+
+def parse_or_repair(
+    llm,
+    raw: str,
+    schema: Optional[Type[BaseModel]] = None,
+    caller: Optional[str] = None
+) -> Union[BaseModel, Any]:
+    """
+    Parse a response, sending one short repair request to `llm` if it fails.
+    
+    Raises:
+        StructuredOutputError: The repaired output is still invalid
+    """
+    try:
+        return parse_structured(raw, schema)
+    except StructuredOutputError as e:
+        logger.warning(f"Structured output invalid, requesting repair: {e}")
+        _uncache(llm, raw)
+        repaired = llm.invoke(_repair_messages(raw, e, schema), use_cache=False, caller=caller)
+        return parse_structured(repaired, schema)
+
+
+async def aparse_or_repair(
+    llm,
+    raw: str,
+    schema: Optional[Type[BaseModel]] = None,
+    caller: Optional[str] = None
+) -> Union[BaseModel, Any]:
+    """Async version of parse_or_repair."""
+    try:
+        return parse_structured(raw, schema)
+    except StructuredOutputError as e:
+        logger.warning(f"Structured output invalid, requesting repair: {e}")
+        _uncache(llm, raw)
+        repaired = await llm.ainvoke(_repair_messages(raw, e, schema), use_cache=False, caller=caller)
+        return parse_structured(repaired, schema)
+
+
+def structured_invoke(
+    llm,
+    messages: list,
+    schema: Optional[Type[BaseModel]] = None,
+    caller: Optional[str] = None
+) -> Union[BaseModel, Any]:
+    """Invoke a UnifiedLLM and return validated structured output."""
+    return parse_or_repair(llm, llm.invoke(messages, caller=caller), schema, caller)
+
+
+async def astructured_invoke(
+    llm,
+    messages: list,
+    schema: Optional[Type[BaseModel]] = None,
+    caller: Optional[str] = None
+) -> Union[BaseModel, Any]:
+    """Async version of structured_invoke."""
+    return await aparse_or_repair(llm, await llm.ainvoke(messages, caller=caller), schema, caller)
@@ -18,6 +18,33 @@ class JobAnalysis(BaseModel):
     
     model_config = ConfigDict(extra='ignore')
 
+class JobTriage(BaseModel):
+    """
+    Quick fit estimate from the Analyst's triage stage (small model or keyword overlap).
+    """
+    role: str = Field(default="Unknown", description="The job title")
+    company: str = Field(default="Unknown", description="The company name")
+    match_score: int = Field(..., description="Rough match score between 0 and 100")
+    matching_skills: List[str] = Field(default_factory=list, description="Profile skills mentioned in the posting")
+    reasoning: Optional[str] = Field(default=None, description="One-sentence reason for the score")
+    
+    model_config = ConfigDict(extra='ignore')
+
+class JobPosting(BaseModel):
+    """
+    A posting pulled straight from an ATS job board API, description included.
+    """
+    url: str = Field(..., description="Canonical posting URL")
+    platform: str = Field(..., description="greenhouse, lever or ashby")
+    company: str = Field(..., description="Company board slug")
+    posting_id: str = Field(..., description="Posting id on the board")
+    title: str = Field(default="", description="The job title")
+    location: str = Field(default="", description="Location as listed on the board")
+    description: str = Field(default="", description="Plain-text job description")
+    updated_at: Optional[str] = Field(default=None, description="Last update time reported by the board")
+    
+    model_config = ConfigDict(extra='ignore')
+
 class JobApplication(BaseModel):
     """
     Tracking model for a job application status.
@@ -305,6 +305,29 @@ class DatabaseService:
         except Exception as e:
             console.warning(f"Could not get summary: {e}")
             return {"total": 0, "by_status": {}, "error": str(e)}
+    
+    def get_discovered_urls(self, page_size: int = 1000) -> List[str]:
+        """
+        Get the URL of every discovered job.
+        
+        Reads in pages of `page_size` rows (Supabase caps a single select).
+        """
+        urls = []
+        try:
+            start = 0
+            while True:
+                result = supabase_client.table("discovered_jobs").select("url").range(
+                    start, start + page_size - 1
+                ).execute()
+                rows = result.data or []
+                urls.extend(row["url"] for row in rows if row.get("url"))
+                if len(rows) < page_size:
+                    return urls
+                start += page_size
+            
+        except Exception as e:
+            console.warning(f"Could not load discovered jobs: {e}")
+            return urls
 
 
 # Singleton instance
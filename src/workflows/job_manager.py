@@ -4,13 +4,20 @@ Orchestrates all agents for end-to-end job application pipeline
 """
 import asyncio
 import yaml
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Sequence
 
 from src.core.logger import logger
 from src.core.console import console
+from src.core.config import settings
+from src.core.llm_metrics import llm_metrics
+from src.core.llm_budget import RunBudget, SKIP_COVER_LETTER, SMALL_MODEL, STOP_TAILORING, STOP
+from src.core.model_routing import small_models_only
+from src.core.job_prefilter import SnippetPrefilter
 from src.models.profile import UserProfile
 from src.automators.scout import ScoutAgent
+from src.automators.ats_boards import ATSBoardScout
 from src.automators.analyst import AnalystAgent
 from src.automators.applier import ApplierAgent
 from src.services.db_service import db_service
@@ -22,26 +29,46 @@ class JobApplicationWorkflow:
     Integrates all 9 agents for a complete pipeline.
     """
     
-    def __init__(self, use_resume_tailoring: bool = True, use_cover_letter: bool = True):
+    def __init__(
+        self,
+        use_resume_tailoring: bool = True,
+        use_cover_letter: bool = True,
+        metrics_path: Optional[str] = None,
+        bulk_analysis: bool = False,
+        use_prefilter: Optional[bool] = None
+    ):
         """
         Initialize workflow with optional features.
         
         Args:
             use_resume_tailoring: Enable AI resume tailoring
             use_cover_letter: Generate cover letters
+            metrics_path: Write per-call LLM metrics JSON here after each run
+            bulk_analysis: Score all jobs up front through the LLM batch API
+            use_prefilter: Screen search results on title/snippet before fetching
+                (default SCOUT_PREFILTER_ENABLED)
         """
         # Core agents (original)
         self.scout = ScoutAgent()
+        self.board_scout = ATSBoardScout()
         self.analyst = AnalystAgent()
         self.applier = ApplierAgent()
         
         # Feature flags
         self.use_resume_tailoring = use_resume_tailoring
         self.use_cover_letter = use_cover_letter
+        self.metrics_path = metrics_path or settings.llm_metrics_path
+        self.bulk_analysis = bulk_analysis
         
         # Load user profile
         self.profile = self._load_profile()
         
+        # Title/snippet prefilter, scored against the profile's skills
+        if settings.scout_prefilter_enabled if use_prefilter is None else use_prefilter:
+            prefilter = SnippetPrefilter(skills=[s for items in self.profile.skills.values() for s in items])
+            self.scout.prefilter = prefilter
+            self.board_scout.prefilter = prefilter
+        
         # Stats tracking
         self.stats = {
             "total_jobs": 0,
@@ -49,9 +76,14 @@ class JobApplicationWorkflow:
             "applied": 0,
             "skipped": 0,
             "resumes_tailored": 0,
-            "cover_letters": 0
+            "cover_letters": 0,
+            "budget_degraded": 0
         }
         
+        # LLM usage per caller, filled in at the end of each run
+        self.llm_usage: Dict[str, Dict] = {}
+        self.budget = RunBudget()
+        
         # Lazy load new agents
         self._resume_agent = None
         self._cover_letter_agent = None
@@ -128,10 +160,36 @@ class JobApplicationWorkflow:
     # Main Workflow
     # ============================================
     
-    async def run(self, query: str, location: str, min_match_score: int = 70):
+    async def run(
+        self,
+        query: str,
+        location: str,
+        min_match_score: int = 70,
+        budget: Optional[RunBudget] = None,
+        queries: Sequence[str] = (),
+        locations: Sequence[str] = (),
+        refresh_search: bool = False,
+        include_seen: bool = False,
+        watchlist: Optional[Sequence[str]] = None,
+        since_last_run: bool = False,
+        resurface_changed: bool = False
+    ):
         """
         Run the full job application pipeline.
         
+        `budget` caps LLM tokens/calls/spend for the run and per stage;
+        as it runs low, later jobs skip cover letters, tailor with the
+        small model, then skip tailoring, and the run stops when it is
+        exhausted. `queries` and `locations` add search variants that the
+        scout sweeps concurrently alongside `query` and `location`;
+        `refresh_search` skips the scout result cache; `include_seen` keeps
+        postings analyzed in earlier runs. Company boards in `watchlist`
+        (default ATS_WATCHLIST) are read alongside the search, and their
+        postings are analyzed from the board's description. With
+        `since_last_run`, both sources only return postings that are new
+        to this saved search (`resurface_changed`: or changed) since the
+        previous run; postings a run stops before analyzing come back.
+        
         Pipeline:
         1. Scout - Find jobs
         2. Analyst - Analyze fit
@@ -145,24 +203,49 @@ class JobApplicationWorkflow:
         console.info(f"Cover Letters: {'✅' if self.use_cover_letter else '❌'}")
         
         logger.info(f"🚀 Starting Job Application Workflow for '{query}' in '{location}'")
+        llm_metrics.reset()
+        self.budget = budget or RunBudget()
+        
+        # 1. Scout - Find jobs (search and watched boards together)
+        job_urls, postings = await asyncio.gather(
+            self.scout.run(
+                query, location, queries=queries, locations=locations,
+                refresh=refresh_search, include_seen=include_seen,
+                since_last_run=since_last_run, resurface_changed=resurface_changed
+            ),
+            self.board_scout.run(watchlist, query, since_last_run, resurface_changed)
+        )
         
-        # 1. Scout - Find jobs
-        job_urls = await self.scout.run(query, location)
+        seen_jobs = None if include_seen else self.scout.seen_jobs
+        job_texts = {p.url: p.description for p in postings if seen_jobs is None or p.url not in seen_jobs}
+        job_urls = list(dict.fromkeys([*job_urls, *job_texts]))
         self.stats["total_jobs"] = len(job_urls)
         
         if not job_urls:
             logger.info("No jobs found. Exiting.")
             console.workflow_no_jobs()
             console.workflow_summary(0, 0, 0, 0)
+            self._report_llm_usage()
             return
         
         resume_text = self.profile.to_resume_text()
         
+        # Bulk mode: score every job in one batch before processing
+        bulk_analyses = {}
+        if self.bulk_analysis:
+            console.info(f"Batch-scoring {len(job_urls)} jobs (this can take a while)...")
+            bulk_analyses = await self.analyst.run_bulk(job_urls, resume_text, min_match_score, job_texts)
+        
         # 2. Process each job
         for i, url in enumerate(job_urls, 1):
             console.workflow_job_progress(i, len(job_urls), url)
             logger.info(f"--- Processing Job {i}/{len(job_urls)} ---")
             
+            if STOP in self.budget.degradation() or self.budget.exhausted("analyst"):
+                console.warning(f"LLM budget exhausted - stopping before job {i}/{len(job_urls)}")
+                logger.warning(f"LLM budget exhausted: {self.budget.summary()}")
+                break
+            
             # Initialize IDs for database tracking
             job_id = None
             analysis_id = None
@@ -171,8 +254,15 @@ class JobApplicationWorkflow:
             
             # 3. Analyze fit
             try:
-                analysis = await self.analyst.run(url, resume_text)
+                analysis = bulk_analyses.get(url) or await self.analyst.run(
+                    url, resume_text, min_match_score, job_text=job_texts.get(url)
+                )
                 self.stats["analyzed"] += 1
+                # Only scored postings are marked seen; failed analyses raise and are retried next run
+                if self.scout.seen_jobs is not None:
+                    self.scout.seen_jobs.add([url])
+                self.scout.commit_watermark([url])
+                self.board_scout.commit_watermark([url])
                 
                 # Save discovered job to database
                 job_id = db_service.save_discovered_job(
@@ -215,13 +305,23 @@ class JobApplicationWorkflow:
             
             # 4. Tailor resume (if enabled)
             tailored_resume = None
-            if self.use_resume_tailoring:
+            resume_steps = self.budget.degradation("resume")
+            if self.use_resume_tailoring and STOP_TAILORING in resume_steps:
+                console.warning("LLM budget low - skipping resume tailoring")
+                self.stats["budget_degraded"] += 1
+            elif self.use_resume_tailoring:
                 try:
                     console.step(1, 4, "Tailoring resume...")
-                    tailored_resume = await self.resume_agent.run(
-                        job_analysis=analysis,
-                        user_profile=self.profile
-                    )
+                    tier_cap = nullcontext()
+                    if SMALL_MODEL in resume_steps:
+                        console.warning("LLM budget low - tailoring with the small model")
+                        self.stats["budget_degraded"] += 1
+                        tier_cap = small_models_only()
+                    with tier_cap:
+                        tailored_resume = await self.resume_agent.run(
+                            job_analysis=analysis,
+                            user_profile=self.profile
+                        )
                     self.stats["resumes_tailored"] += 1
                     console.success("Resume tailored")
                     
@@ -240,7 +340,10 @@ class JobApplicationWorkflow:
             
             # 5. Generate cover letter (if enabled)
             cover_letter = None
-            if self.use_cover_letter:
+            if self.use_cover_letter and SKIP_COVER_LETTER in self.budget.degradation("cover_letter"):
+                console.warning("LLM budget low - skipping cover letter")
+                self.stats["budget_degraded"] += 1
+            elif self.use_cover_letter:
                 try:
                     console.step(2, 4, "Generating cover letter...")
                     cover_letter = await self.cover_letter_agent.run(
@@ -313,6 +416,41 @@ class JobApplicationWorkflow:
             console.info(f"Resumes Tailored: {self.stats['resumes_tailored']}")
         if self.use_cover_letter:
             console.info(f"Cover Letters: {self.stats['cover_letters']}")
+        if self.stats["budget_degraded"]:
+            console.info(f"Steps degraded by LLM budget: {self.stats['budget_degraded']}")
+        
+        self._report_llm_usage()
+    
+    def _report_llm_usage(self):
+        """Summarize this run's LLM calls per caller and optionally dump them to JSON."""
+        self.llm_usage = llm_metrics.summary()
+        if not self.llm_usage:
+            return
+        
+        rows = [
+            [
+                caller,
+                str(usage["calls"]),
+                str(usage["total_tokens"]),
+                f"${usage['cost_usd']:.4f}",
+                f"{usage['latency_p95']:.2f}s" if usage["latency_p95"] is not None else "-",
+                str(usage["retries"]),
+                str(usage["fallback_hops"]),
+            ]
+            for caller, usage in self.llm_usage.items()
+        ]
+        console.table(
+            ["Caller", "Calls", "Tokens", "Cost", "p95", "Retries", "Fallbacks"],
+            rows,
+            title="LLM Usage"
+        )
+        
+        if self.metrics_path:
+            try:
+                llm_metrics.to_json(self.metrics_path)
+                console.info(f"LLM metrics saved to {self.metrics_path}")
+            except OSError as e:
+                logger.warning(f"Could not write LLM metrics: {e}")
 
 
 # ============================================
@@ -0,0 +1,90 @@
+"""
+Shared Test Fixtures
+Isolated LLM registries (cache, metrics, health, rate limits) and a fake-model UnifiedLLM factory
+"""
+import inspect
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import pytest
+
+from src.core import llm_cache as cache_module
+from src.core import llm_metrics as metrics_module
+from src.core import provider_health as health_module
+from src.core import rate_limiter as limiter_module
+from src.core.llm_cache import LLMCache
+from src.core.llm_metrics import LLMMetrics
+from src.core.provider_health import ProviderHealth
+from src.core.rate_limiter import RateLimiter
+from src.core.llm_provider import UnifiedLLM, LLMConfig
+
+
+# ============================================
+# Registries
+# ============================================
+
+@pytest.fixture
+def fresh_cache(monkeypatch) -> LLMCache:
+    """Empty in-memory response cache."""
+    cache = LLMCache(path=None)
+    monkeypatch.setattr(cache_module, "_cache_instance", cache)
+    return cache
+
+
+@pytest.fixture
+def fresh_metrics(monkeypatch) -> LLMMetrics:
+    """Empty usage metrics registry."""
+    metrics = LLMMetrics()
+    monkeypatch.setattr(metrics_module, "llm_metrics", metrics)
+    return metrics
+
+
+@pytest.fixture
+def fresh_health(monkeypatch) -> ProviderHealth:
+    """Provider health with every circuit closed and no latency history."""
+    health = ProviderHealth()
+    monkeypatch.setattr(health_module, "provider_health", health)
+    return health
+
+
+@pytest.fixture
+def no_rate_limits(monkeypatch) -> RateLimiter:
+    """Rate limiter with no configured limits, so calls never wait."""
+    limiter = RateLimiter(limits={})
+    monkeypatch.setattr(limiter_module, "rate_limiter", limiter)
+    return limiter
+
+
+# ============================================
+# Fake models
+# ============================================
+
+@pytest.fixture
+def make_llm():
+    """
+    Factory for a UnifiedLLM whose chat models are fakes.
+    
+    `models` is one model for every config, a dict keyed by provider (or
+    by api_key when several configs share a provider), or a function of
+    the LLMConfig. `providers` replaces the fallback chain; other keyword
+    arguments go to UnifiedLLM.
+    """
+    def make(
+        models: Union[Any, Dict, Callable[[LLMConfig], Any]],
+        providers: Optional[List[LLMConfig]] = None,
+        **kwargs
+    ) -> UnifiedLLM:
+        llm = UnifiedLLM(**kwargs)
+        if providers is not None:
+            llm.providers = list(providers)
+        
+        if isinstance(models, dict):
+            llm._create_llm = lambda config: (
+                models[config.provider] if config.provider in models else models[config.api_key]
+            )
+        elif inspect.isfunction(models):
+            llm._create_llm = models
+        else:
+            llm._create_llm = lambda config: models
+        return llm
+    
+    return make
@@ -0,0 +1,144 @@
+"""
+Test Analyst Triage
+Cheap first-pass scoring gates the full analysis by distance to min_match_score (offline)
+"""
+import asyncio
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core.config import settings
+from src.core.llm_provider import LLMError
+from src.automators.analyst import AnalystAgent
+
+
+RESUME = """Name: Test Candidate
+
+SKILLS:
+- Languages: Python, Go, SQL
+- Cloud: AWS, Docker
+
+EXPERIENCE:
+Backend Engineer at Acme (2021 - Present)
+Built APIs"""
+
+JOB = "Senior Backend Engineer at Globex\nWe use Python, Docker and AWS.\n" + "About us. " * 500
+
+FULL = json.dumps({
+    "role": "Senior Backend Engineer", "company": "Globex", "match_score": 82,
+    "matching_skills": ["Python"], "missing_skills": [], "tech_stack": ["Python"],
+    "reasoning": "Strong backend fit."
+})
+
+
+class BrokenModel(FakeListChatModel):
+    def _call(self, *args, **kwargs):
+        raise RuntimeError("provider down")
+
+
+@pytest.fixture
+def make_agent(make_llm, fresh_cache, no_rate_limits):
+    """Factory for an analyst with canned page text; returns (agent, calls per stage)."""
+    def make(triage_score: int = None, full_fails: bool = False) -> tuple:
+        calls = {"triage": [], "full": 0}
+        
+        class TriageModel(FakeListChatModel):
+            def _call(self, messages, *args, **kwargs):
+                calls["triage"].append(messages[-1].content)
+                return json.dumps({"role": "Backend Engineer", "company": "Globex", "match_score": triage_score})
+        
+        class FullModel(FakeListChatModel):
+            def _call(self, *args, **kwargs):
+                calls["full"] += 1
+                return FULL
+        
+        agent = AnalystAgent()
+        agent._fetch_page_content = lambda url: JOB
+        agent.triage_llm = make_llm(
+            TriageModel(responses=["x"]) if triage_score is not None else BrokenModel(responses=["x"]),
+            temperature=0.0, task="triage", caller="analyst_triage", max_retries=1
+        )
+        agent.llm = make_llm(
+            BrokenModel(responses=["x"]) if full_fails else FullModel(responses=["x"]),
+            temperature=0.0, task="scoring", caller="analyst", max_retries=1
+        )
+        return agent, calls
+    return make
+
+
+def test_low_triage_score_skips_full_analysis(make_agent):
+    agent, calls = make_agent(triage_score=30)
+    
+    analysis = asyncio.run(agent.run("https://jobs.example/1", RESUME, min_match_score=70))
+    
+    assert calls["full"] == 0
+    assert analysis.match_score == 30
+    assert analysis.reasoning.startswith("Triage")
+
+
+def test_score_within_margin_gets_full_analysis(make_agent):
+    agent, calls = make_agent(triage_score=70 - settings.analyst_triage_margin)
+    
+    analysis = asyncio.run(agent.run("https://jobs.example/2", RESUME, min_match_score=70))
+    
+    assert calls["full"] == 1
+    assert analysis.match_score == 82
+
+
+def test_triage_prompt_is_compressed(make_agent):
+    agent, calls = make_agent(triage_score=90)
+    asyncio.run(agent.run("https://jobs.example/3", RESUME, min_match_score=70))
+    
+    prompt = calls["triage"][0]
+    assert len(prompt) < len(JOB)
+    assert "Python, Go, SQL, AWS, Docker" in prompt
+    assert "Backend Engineer at Acme" not in prompt  # Skills only, not the whole resume
+
+
+def test_without_threshold_there_is_no_triage(make_agent):
+    agent, calls = make_agent(triage_score=10)
+    asyncio.run(agent.run("https://jobs.example/4", RESUME))
+    
+    assert calls["triage"] == [] and calls["full"] == 1
+
+
+def test_resume_without_skills_skips_triage(make_agent):
+    agent, calls = make_agent(triage_score=10)
+    resume = RESUME.replace("SKILLS:", "TOOLS:")
+    
+    analysis = asyncio.run(agent.run("https://jobs.example/8", resume, min_match_score=70))
+    
+    assert calls["triage"] == [] and calls["full"] == 1
+    assert analysis.match_score == 82
+
+
+def test_keyword_fallback_when_triage_model_fails(make_agent):
+    agent, calls = make_agent(triage_score=None)
+    
+    triage = asyncio.run(agent.triage("https://jobs.example/5", JOB, RESUME))
+    
+    assert set(triage.matching_skills) == {"Python", "AWS", "Docker"}
+    assert triage.match_score == 60  # 3 of 5 skills
+    assert triage.reasoning.startswith("Keyword triage")
+
+
+def test_failed_analysis_raises_instead_of_scoring_zero(make_agent):
+    agent, _ = make_agent(full_fails=True)
+    
+    try:
+        asyncio.run(agent.run("https://jobs.example/6", RESUME))
+        assert False, "expected LLMError"
+    except LLMError:
+        pass
+    
+    async def batch_unavailable(batch):
+        raise LLMError("batch API down")
+    
+    # Batch and per-job fallback both fail: the job is left out, not scored 0
+    agent.llm.abatch_invoke = batch_unavailable
+    assert asyncio.run(agent.run_bulk(["https://jobs.example/7"], RESUME)) == {}
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
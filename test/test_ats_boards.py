@@ -0,0 +1,158 @@
+"""
+Test ATS Board Scout
+Greenhouse/Lever/Ashby board ingestion, conditional requests and scrape-free analysis against fixture boards (offline)
+"""
+import json
+import asyncio
+
+import httpx
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core.job_urls import job_key
+from src.automators.ats_boards import ATSBoardScout, BoardStore, parse_watchlist
+from src.automators.analyst import AnalystAgent
+
+
+LEVER_ID = "5ac21346-8e0c-4494-8e7a-3eb92ff77902"
+ASHBY_ID = "0b2c3d4e-1111-2222-3333-444455556666"
+
+BOARDS = {
+    "/v1/boards/acme/jobs": {"jobs": [{
+        "id": 4012345, "title": "Senior Python Developer", "company_name": "Acme",
+        "location": {"name": "Remote"}, "updated_at": "2026-10-01T10:00:00-04:00",
+        "content": "&lt;p&gt;We build &lt;strong&gt;Python&lt;/strong&gt; services.&lt;/p&gt;",
+    }]},
+    "/v0/postings/globex": [{
+        "id": LEVER_ID, "text": "Go Developer", "categories": {"location": "Berlin"},
+        "descriptionPlain": "Globex ships Go.", "createdAt": 1759312800000,
+        "lists": [{"text": "Requirements", "content": "<li>5 years of Go</li>"}],
+    }],
+    "/posting-api/job-board/initech": {"jobs": [
+        {"id": ASHBY_ID, "title": "Python Developer", "location": "NYC", "descriptionPlain": "Python at Initech."},
+        {"id": "unlisted", "title": "Hidden", "isListed": False},
+    ]},
+}
+
+
+class FixtureBoards:
+    """Serves BOARDS with ETags; answers 304 when the client already has the current body."""
+    
+    def __init__(self):
+        self.requests = []
+    
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append(path)
+        if path not in BOARDS:
+            return httpx.Response(404, json={"error": "not found"})
+        
+        etag = f'"{path}-v1"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, json=BOARDS[path], headers={"ETag": etag})
+
+
+WATCHLIST = ["greenhouse:acme", "lever:globex", "ashby:initech"]
+
+
+def make_scout(server: FixtureBoards, store: BoardStore = None) -> ATSBoardScout:
+    return ATSBoardScout(
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(server)),
+        store=store or BoardStore(path=None)
+    )
+
+
+def test_watchlist_parsing():
+    assert parse_watchlist(["greenhouse:acme", "Lever:globex", "greenhouse:acme"]) == [
+        ("greenhouse", "acme"), ("lever", "globex")
+    ]
+    try:
+        parse_watchlist(["workday:acme"])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_boards_emit_postings_with_descriptions():
+    postings = asyncio.run(make_scout(FixtureBoards()).run(WATCHLIST))
+    by_platform = {p.platform: p for p in postings}
+    
+    assert len(postings) == 3  # Unlisted Ashby job dropped
+    greenhouse = by_platform["greenhouse"]
+    assert greenhouse.url == "https://job-boards.greenhouse.io/acme/jobs/4012345"
+    assert greenhouse.description == "We build\nPython\nservices."
+    assert greenhouse.company == "acme" and greenhouse.location == "Remote"
+    assert {p.company for p in postings} == {"acme", "globex", "initech"}  # Same convention on every board
+    
+    lever = by_platform["lever"]
+    assert "Requirements\n5 years of Go" in lever.description
+    assert lever.updated_at.startswith("2025-10-01")
+    
+    # Board URLs are already canonical
+    for posting in postings:
+        key = job_key(posting.url)
+        assert key is not None and key.posting_id == posting.posting_id.lower()
+
+
+def test_query_filter_and_failed_board():
+    server = FixtureBoards()
+    postings = asyncio.run(make_scout(server).run(WATCHLIST + ["lever:missing"], query="python developer"))
+    
+    assert sorted(p.company for p in postings) == ["acme", "initech"]
+    assert "/v0/postings/missing" in server.requests
+    
+    # Whole words only, and seniority/work-mode words don't drop postings
+    postings = asyncio.run(make_scout(FixtureBoards()).run(WATCHLIST, query="senior go developer remote"))
+    assert [p.company for p in postings] == ["globex"]
+
+
+def test_unchanged_boards_answer_304():
+    server, store = FixtureBoards(), BoardStore(path=None)
+    
+    first = asyncio.run(make_scout(server, store).run(WATCHLIST))
+    scout = make_scout(server, store)
+    second = asyncio.run(scout.run(WATCHLIST))
+    
+    assert scout.not_modified == 3
+    assert [p.url for p in second] == [p.url for p in first]
+    assert [p.description for p in second] == [p.description for p in first]
+
+
+def test_unexpected_status_is_an_error_and_not_cached():
+    responses = {"/v1/boards/acme/jobs": httpx.Response(304), "/v0/postings/globex": httpx.Response(302)}
+    store = BoardStore(path=None)
+    scout = ATSBoardScout(
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(lambda request: responses[request.url.path])),
+        store=store
+    )
+    
+    assert asyncio.run(scout.run(["greenhouse:acme", "lever:globex"])) == []
+    assert scout.not_modified == 0
+    assert store.get("greenhouse:acme") is None and store.get("lever:globex") is None
+
+
+def test_analyst_uses_board_description_without_scraping(make_llm, fresh_cache, no_rate_limits):
+    prompts = []
+    
+    class ScoringModel(FakeListChatModel):
+        def _call(self, messages, *args, **kwargs):
+            prompts.append(messages[-1].content)
+            return json.dumps({"role": "Go Developer", "company": "globex", "match_score": 75})
+    
+    def no_scraping(url):
+        raise AssertionError("page should not be fetched")
+    
+    posting = asyncio.run(make_scout(FixtureBoards()).run(["lever:globex"]))[0]
+    agent = AnalystAgent()
+    agent._fetch_page_content = no_scraping
+    agent.llm = make_llm(ScoringModel(responses=["x"]), temperature=0.0, task="scoring", caller="analyst")
+    
+    analysis = asyncio.run(agent.run(posting.url, "SKILLS:\n- Go", job_text=posting.description))
+    
+    assert analysis.match_score == 75
+    assert prompts[0].endswith(posting.description)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,69 @@
+"""
+Test Cover Letter Agent
+The draft streams as plain letter text and is split into sections afterwards (offline)
+"""
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.agents import cover_letter_agent as cover_letter_module
+from src.agents.cover_letter_agent import CoverLetterAgent
+
+
+LETTER = """Dear Acme Team,
+
+I am excited to apply for the Backend Engineer role at Acme.
+
+At Globex I cut API latency by 40% with Python and PostgreSQL.
+
+I also led the migration of our services to Kubernetes.
+
+I would welcome the chance to discuss how I can help Acme scale.
+
+Sincerely,
+[Name]"""
+
+
+def test_split_letter_sections():
+    content = CoverLetterAgent._split_letter(LETTER)
+    
+    assert content["greeting"] == "Dear Acme Team,"
+    assert content["opening"].startswith("I am excited")
+    assert content["body"].count("\n\n") == 1 and "Kubernetes" in content["body"]
+    assert content["closing"].startswith("I would welcome")
+    assert content["signature"] == "Sincerely,\n\n[Name]"
+    
+    # Sign-off split over two paragraphs, no greeting
+    content = CoverLetterAgent._split_letter("Opening.\n\nBody.\n\nClosing.\n\nBest regards,\n\nJane Doe")
+    assert content["greeting"] == "Dear Hiring Manager,"
+    assert content["signature"] == "Best regards,\n\nJane Doe"
+    assert (content["opening"], content["body"], content["closing"]) == ("Opening.", "Body.", "Closing.")
+
+
+def test_generated_content_streams_plain_text(make_llm, fresh_cache, monkeypatch):
+    chunks = []
+    monkeypatch.setattr(cover_letter_module.console, "stream_chunk", chunks.append)
+    
+    agent = CoverLetterAgent()
+    agent.llm = make_llm(FakeListChatModel(responses=[LETTER]), temperature=0.6, task="creative_writing", caller="cover_letter")
+    state = asyncio.run(agent._generate_content_node({
+        "job_analysis": {"role": "Backend Engineer", "company": "Acme"},
+        "user_profile": {"personal_information": {"full_name": "Jane Doe"}},
+    }))
+    
+    assert "".join(chunks) == LETTER
+    assert "{" not in "".join(chunks)
+    assert state["content"]["signature"] == "Sincerely,\n\nJane Doe"
+    assert "error" not in state
+
+
+def test_culture_call_is_hedged():
+    agent = CoverLetterAgent()
+    
+    assert agent.fast_llm._should_hedge(None)
+    assert not agent.llm._should_hedge(None)  # The draft streams instead
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
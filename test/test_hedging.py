@@ -0,0 +1,99 @@
+"""
+Test LLM Request Hedging
+Slow primaries are duplicated to a backup provider within the hedge budget (offline)
+"""
+import time
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core import hedging as hedging_module
+from src.core.hedging import HedgeBudget, hedged_requests
+from src.core.llm_provider import UnifiedLLM, LLMConfig, LLMProvider
+
+
+PRIMARY = LLMConfig(provider=LLMProvider.GROQ, api_key="hedge-k1", model="slow-model", temperature=0.7)
+BACKUP = LLMConfig(provider=LLMProvider.OPENROUTER, api_key="hedge-k2", model="fast-model", temperature=0.7)
+
+cancelled = []
+
+
+class DelayedModel(FakeListChatModel):
+    delay: float = 0.0
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            cancelled.append(self.responses[0])
+            raise
+        return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+    
+    def _call(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return super()._call(*args, **kwargs)
+
+
+@pytest.fixture
+def hedging_llm(make_llm, fresh_health, monkeypatch) -> UnifiedLLM:
+    """Hedged LLM over a slow primary and a fast backup, with a one-hedge budget."""
+    monkeypatch.setattr(hedging_module, "hedge_budget", HedgeBudget(max_ratio=0.0, burst=1))
+    
+    # Primary's p95 is 50ms, so it is hedged almost immediately
+    fresh_health.record_success(PRIMARY, 0.05)
+    cancelled.clear()
+    return make_llm(
+        {
+            LLMProvider.GROQ: DelayedModel(responses=["primary"], delay=1.0),
+            LLMProvider.OPENROUTER: DelayedModel(responses=["backup"], delay=0.0),
+        },
+        providers=[PRIMARY, BACKUP], temperature=0.7, hedge=True
+    )
+
+
+def test_budget_caps_hedge_share():
+    budget = HedgeBudget(max_ratio=0.1, burst=1)
+    
+    assert budget.try_acquire()          # burst
+    assert not budget.try_acquire()
+    
+    for _ in range(10):
+        budget.record_call()
+    assert budget.try_acquire()          # 10% of 10 calls earned one more
+    assert not budget.try_acquire()
+
+
+def test_async_hedge_wins_and_cancels_primary(hedging_llm):
+    llm = hedging_llm
+    
+    started = time.monotonic()
+    assert asyncio.run(llm.ainvoke([{"role": "user", "content": "quick prep"}])) == "backup"
+    assert time.monotonic() - started < 0.8
+    assert cancelled == ["primary"]
+    assert hedging_module.hedge_budget.stats()["hedge_wins"] == 1
+
+
+def test_budget_exhausted_waits_for_primary(hedging_llm):
+    llm = hedging_llm
+    hedging_module.hedge_budget.hedges = 1
+    
+    assert asyncio.run(llm.ainvoke([{"role": "user", "content": "quick prep"}])) == "primary"
+    assert cancelled == []
+
+
+def test_sync_hedge_via_context(hedging_llm):
+    llm = hedging_llm
+    llm.hedge = False
+    
+    with hedged_requests():
+        assert llm.invoke([{"role": "user", "content": "quick prep"}]) == "backup"
+    assert hedging_module.hedge_budget.stats()["hedges"] == 1
+    
+    # Outside the block calls are not hedged
+    llm.invoke([{"role": "user", "content": "again"}])
+    assert hedging_module.hedge_budget.stats()["hedges"] == 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
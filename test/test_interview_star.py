@@ -0,0 +1,65 @@
+"""
+Test Interview STAR Responses
+The answer streams as plain labelled text and is split into the structured response afterwards (offline)
+"""
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.agents import interview_agent as interview_module
+from src.agents.interview_agent import _split_star, create_star_response
+
+
+ANSWER = """SITUATION: Our checkout API timed out during sales.
+TASK: I owned its latency.
+ACTION: I added caching and moved reports to a queue.
+RESULT: p95 latency fell by 40%.
+
+FULL ANSWER:
+At Globex our checkout API timed out during sales.
+
+I added caching and the p95 fell by 40%.
+
+KEY POINTS:
+- Quantified impact
+- Ownership
+
+FOLLOW-UPS:
+- How did you measure it?
+
+TIPS:
+- Keep it under two minutes"""
+
+
+def test_split_star_sections():
+    parsed = _split_star(ANSWER, "Tell me about a time you fixed performance.")
+    
+    assert parsed["question"] == "Tell me about a time you fixed performance."
+    assert parsed["star_response"]["action"] == "I added caching and moved reports to a queue."
+    assert parsed["full_answer"].count("\n\n") == 1
+    assert parsed["key_points_to_emphasize"] == ["Quantified impact", "Ownership"]
+    assert parsed["potential_follow_ups"] == ["How did you measure it?"]
+    assert parsed["tips"] == ["Keep it under two minutes"]
+    
+    # Markdown-decorated headings, no full answer section
+    parsed = _split_star("**Situation:** A\n**Task:** B\n**Action:** C\n**Result:** D", "Q")
+    assert parsed["star_response"] == {"situation": "A", "task": "B", "action": "C", "result": "D"}
+    assert parsed["full_answer"] == "A\n\nB\n\nC\n\nD"
+
+
+def test_star_response_streams_plain_text(make_llm, fresh_cache, monkeypatch):
+    chunks = []
+    monkeypatch.setattr(interview_module.console, "stream_chunk", chunks.append)
+    monkeypatch.setattr(interview_module, "get_llm", lambda **kwargs: make_llm(FakeListChatModel(responses=[ANSWER]), **kwargs))
+    
+    result = json.loads(create_star_response("Tell me about a time...", json.dumps({"experience": []})))
+    
+    assert "".join(chunks) == ANSWER
+    assert "{" not in "".join(chunks)
+    assert result["star_response"]["result"] == "p95 latency fell by 40%."
+    assert "error" not in result
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,108 @@
+"""
+Test Job Prefilter
+Title/snippet rules drop irrelevant search results and board postings before anything is fetched (offline)
+"""
+import asyncio
+
+import httpx
+
+from src.core.scout_cache import ScoutCache
+from src.core.job_urls import SeenJobs
+from src.core.job_prefilter import SnippetPrefilter
+from src.automators.scout import ScoutAgent
+from src.automators.ats_boards import ATSBoardScout, BoardStore
+
+
+def lever(n: int) -> str:
+    return f"https://jobs.lever.co/acme/00000000-0000-0000-0000-{n:012d}"
+
+
+def make_prefilter(**rules) -> SnippetPrefilter:
+    defaults = {"include": [], "exclude": [], "exclude_text": [], "min_skill_hits": 0}
+    return SnippetPrefilter(**{**defaults, **rules})
+
+
+def test_rules_and_reasons():
+    prefilter = make_prefilter(
+        skills=["Python", "FastAPI", "PostgreSQL"],
+        include=["developer", "engineer"],
+        exclude=["intern", "staff"],
+        exclude_text=["security clearance"],
+        min_skill_hits=2
+    )
+    
+    assert prefilter.check("Python Developer", "FastAPI and PostgreSQL") is None
+    assert prefilter.check("Software Engineer Intern", "Python") == "title has excluded term 'intern'"
+    assert prefilter.check("Backend Engineer", "Requires security clearance") == "mentions excluded term 'security clearance'"
+    assert prefilter.check("Product Manager", "Python, FastAPI") == "title matches no include term"
+    assert prefilter.check("Backend Engineer", "Java and Python") == "mentions 1 profile skills (< 2)"
+    
+    # Excluded titles win over everything else
+    assert prefilter.check("Staff Python Developer", "FastAPI, PostgreSQL").startswith("title has excluded")
+
+
+def test_terms_match_whole_words():
+    prefilter = make_prefilter(skills=["C++", "Go", ".NET", "Node.js"], exclude=["intern"])
+    
+    assert prefilter.check("International Sales Engineer") is None
+    assert prefilter.check("Internal Tools Developer") is None
+    assert prefilter.check("Intern, Backend") is not None
+    assert prefilter.skill_hits("C++ / Go Engineer", "Django, MongoDB, .NET and Node.js") == ["C++", "Go", ".NET", "Node.js"]
+    assert prefilter.skill_hits("Google Cloud Engineer", "C and C#") == []
+
+
+def test_scout_drops_results_before_fetching():
+    fetched = []
+    
+    def serpapi(request: httpx.Request) -> httpx.Response:
+        fetched.append(str(request.url))
+        return httpx.Response(200, json={"organic_results": [
+            {"link": lever(1), "title": "Python Developer - Acme", "snippet": "Python and FastAPI"},
+            {"link": lever(2), "title": "Python Developer Intern - Acme", "snippet": "Python"},
+            {"link": lever(3), "title": "Account Executive - Acme", "snippet": "Sales"},
+        ]})
+    
+    seen = SeenJobs(path=None)
+    seen.warmed = True
+    scout = ScoutAgent(
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(serpapi)),
+        cache=ScoutCache(path=None), seen_jobs=seen,
+        prefilter=make_prefilter(include=["developer"], exclude=["intern"])
+    )
+    urls = asyncio.run(scout.run("Python Developer", "Remote"))
+    
+    assert urls == [lever(1)]
+    assert scout.dropped == [
+        (lever(2), "title has excluded term 'intern'"),
+        (lever(3), "title matches no include term"),
+    ]
+    assert all("serpapi.com" in url for url in fetched)  # Only the search itself went out
+
+
+def test_board_postings_are_screened():
+    board = {"jobs": [
+        {"id": 1, "title": "Python Developer", "content": "Python and FastAPI"},
+        {"id": 2, "title": "Staff Python Developer", "content": "Python"},
+    ]}
+    
+    def boards(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=board)
+    
+    scout = ATSBoardScout(
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(boards)),
+        store=BoardStore(path=None), prefilter=make_prefilter(exclude=["staff"])
+    )
+    postings = asyncio.run(scout.run(["greenhouse:acme"]))
+    
+    assert [p.posting_id for p in postings] == ["1"]
+    assert scout.dropped == [(
+        "https://job-boards.greenhouse.io/acme/jobs/2", "title has excluded term 'staff'"
+    )]
+
+
+if __name__ == "__main__":
+    test_rules_and_reasons()
+    test_terms_match_whole_words()
+    test_scout_drops_results_before_fetching()
+    test_board_postings_are_screened()
+    print("✅ All job prefilter tests passed!")
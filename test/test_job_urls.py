@@ -0,0 +1,102 @@
+"""
+Test Job URL Canonicalization
+Per-ATS posting keys, the persistent seen-set and scout-side de-duplication (offline)
+"""
+import asyncio
+import tempfile
+from pathlib import Path
+
+import httpx
+
+from src.core.job_urls import JobKey, SeenJobs, canonicalize, job_key
+from src.core.scout_cache import ScoutCache
+from src.automators.scout import ScoutAgent
+
+
+LEVER_ID = "5ac21346-8e0c-4494-8e7a-3eb92ff77902"
+ASHBY_ID = "0b2c3d4e-1111-2222-3333-444455556666"
+
+
+def test_greenhouse_variants_share_a_key():
+    key = JobKey("greenhouse", "acme", "4012345")
+    for url in [
+        "https://boards.greenhouse.io/acme/jobs/4012345",
+        "https://job-boards.greenhouse.io/acme/jobs/4012345/",
+        "https://boards.greenhouse.io/Acme/jobs/4012345?gh_src=linkedin&utm_source=google#app",
+        "https://boards.greenhouse.io/embed/job_app?for=acme&token=4012345",
+        "https://boards.greenhouse.io/acme?gh_jid=4012345",
+    ]:
+        assert job_key(url) == key, url
+    
+    assert canonicalize("https://boards.greenhouse.io/acme/jobs/4012345?x=1")[1] == \
+        "https://job-boards.greenhouse.io/acme/jobs/4012345"
+    assert canonicalize("https://job-boards.eu.greenhouse.io/acme/jobs/4012345")[1] == \
+        "https://job-boards.eu.greenhouse.io/acme/jobs/4012345"
+
+
+def test_lever_and_ashby_suffixes_are_dropped():
+    lever = [
+        f"https://jobs.lever.co/acme/{LEVER_ID}",
+        f"https://jobs.lever.co/acme/{LEVER_ID}/apply?lever-source=LinkedIn",
+        f"https://jobs.lever.co/acme/{LEVER_ID.upper()}/",
+    ]
+    assert {job_key(url) for url in lever} == {JobKey("lever", "acme", LEVER_ID)}
+    assert canonicalize(lever[1])[1] == lever[0]
+    
+    ashby = job_key(f"https://jobs.ashbyhq.com/Acme/{ASHBY_ID}/application?utm_source=x")
+    assert ashby == JobKey("ashby", "acme", ASHBY_ID)
+    assert ashby.id == f"ashby:acme:{ASHBY_ID}"
+
+
+def test_non_postings_have_no_key():
+    for url in [
+        "https://boards.greenhouse.io/acme",
+        "https://jobs.lever.co/acme",
+        "https://jobs.ashbyhq.com/acme",
+        "https://www.linkedin.com/jobs/view/1",
+        "not a url",
+        "",
+    ]:
+        assert canonicalize(url) is None, url
+
+
+def test_seen_set_persists():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "seen.sqlite")
+        seen = SeenJobs(path=path)
+        assert seen.add([f"https://jobs.lever.co/acme/{LEVER_ID}/apply", "https://example.com/job"]) == 1
+        assert seen.add([f"https://jobs.lever.co/acme/{LEVER_ID}"]) == 0
+        
+        reopened = SeenJobs(path=path)
+        assert f"https://jobs.lever.co/acme/{LEVER_ID}?ref=x" in reopened
+        assert len(reopened) == 1
+
+
+def test_scout_drops_seen_and_duplicate_postings():
+    seen = SeenJobs(path=None)
+    seen.warmed = True
+    seen.add(["https://boards.greenhouse.io/acme/jobs/1"])
+    
+    organic = [
+        {"link": "https://job-boards.greenhouse.io/acme/jobs/1?gh_src=x"},
+        {"link": f"https://jobs.lever.co/acme/{LEVER_ID}/apply"},
+        {"link": f"https://jobs.lever.co/acme/{LEVER_ID}?lever-source=Google"},
+        {"link": "https://jobs.lever.co/acme"},
+    ]
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"organic_results": organic}))
+    scout = ScoutAgent(http_client=httpx.AsyncClient(transport=transport), cache=ScoutCache(path=None), seen_jobs=seen)
+    
+    assert asyncio.run(scout.run("Engineer")) == [f"https://jobs.lever.co/acme/{LEVER_ID}"]
+    assert scout.dropped == [("https://job-boards.greenhouse.io/acme/jobs/1", "seen")]
+    
+    everything = asyncio.run(scout.run("Engineer", include_seen=True))
+    assert len(everything) == 2
+
+
+if __name__ == "__main__":
+    test_greenhouse_variants_share_a_key()
+    test_lever_and_ashby_suffixes_are_dropped()
+    test_non_postings_have_no_key()
+    test_seen_set_persists()
+    test_scout_drops_seen_and_duplicate_postings()
+    print("✅ All job URL tests passed!")
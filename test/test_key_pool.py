@@ -0,0 +1,131 @@
+"""
+Test API Key Pool
+N keys per provider, balanced by remaining quota with per-key 429 cooldowns (offline)
+"""
+from collections import Counter
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.tools import tool
+from pydantic import SecretStr
+
+from src.core import rate_limiter as limiter_module
+from src.core.config import settings
+from src.core.key_pool import KeyPool
+from src.core.rate_limiter import RateLimiter
+from src.core.llm_clients import PooledChatModel
+from src.core.llm_provider import UnifiedLLM, LLMConfig, LLMProvider
+
+
+POOL = ["pool-key-1", "pool-key-2", "pool-key-3"]
+
+
+@pytest.fixture
+def key_pool(fresh_health, monkeypatch) -> RateLimiter:
+    """Three Groq keys in settings and a fresh limiter; returns the limiter."""
+    monkeypatch.setattr(settings, "groq_api_key", SecretStr(POOL[0]))
+    monkeypatch.setattr(settings, "groq_api_key_fallback", SecretStr(POOL[1]))
+    monkeypatch.setattr(settings, "groq_api_keys", [SecretStr(POOL[1]), SecretStr(POOL[2])])
+    
+    limiter = RateLimiter(limits={"groq": {"rpm": 30, "tpm": 0}})
+    monkeypatch.setattr(limiter_module, "rate_limiter", limiter)
+    return limiter
+
+
+def test_keys_from_settings_are_deduplicated(key_pool):
+    assert settings.api_keys("groq") == POOL
+    
+    groq = [c.api_key for c in UnifiedLLM().providers if c.provider == LLMProvider.GROQ]
+    assert groq == POOL
+
+
+def test_ranking_prefers_remaining_quota(key_pool):
+    pool = KeyPool()
+    
+    for _ in range(10):
+        key_pool.reserve("groq", POOL[0], 1)
+    assert pool.ranked("groq")[-1] == POOL[0]
+    
+    # A 429 cools the key down to zero headroom
+    key_pool.penalize("groq", POOL[1], Exception("429"), 30.0)
+    assert pool.ranked("groq") == [POOL[2], POOL[0], POOL[1]]
+
+
+def test_idle_keys_are_rotated(key_pool):
+    pool = KeyPool()
+    firsts = [pool.ranked("groq")[0] for _ in range(3)]
+    assert sorted(firsts) == POOL
+
+
+def test_balance_keeps_provider_slots():
+    pool = KeyPool()
+    chain = [
+        LLMConfig(provider=LLMProvider.OPENROUTER, api_key="or-1", model="m"),
+        LLMConfig(provider=LLMProvider.GROQ, api_key="g-1", model="m"),
+        LLMConfig(provider=LLMProvider.GROQ, api_key="g-2", model="m"),
+    ]
+    balanced = pool.balance(chain)
+    
+    assert [c.provider for c in balanced] == [c.provider for c in chain]
+    assert {c.api_key for c in balanced} == {"or-1", "g-1", "g-2"}
+
+
+def test_unified_llm_spreads_calls_over_keys(key_pool, make_llm):
+    used = Counter()
+    
+    def create(config):
+        used[config.api_key] += 1
+        return FakeListChatModel(responses=["ok"])
+    llm = make_llm(create, temperature=0.9)
+    
+    for i in range(30):
+        llm.invoke([{"role": "user", "content": f"score job {i}"}])
+    
+    assert set(used) >= set(POOL)
+    assert max(used[k] for k in POOL) - min(used[k] for k in POOL) <= 2
+
+
+class RateLimitedModel(FakeListChatModel):
+    def _call(self, *args, **kwargs):
+        raise RuntimeError("Error code: 429 - rate_limit_exceeded")
+
+
+class ScriptedPooledModel(PooledChatModel):
+    """Pooled model whose per-key clients are fakes; the first key tried is rate limited."""
+    
+    def _client(self, api_key: str):
+        if not limited:
+            limited.append(api_key)
+            return RateLimitedModel(responses=["x"])
+        return FakeListChatModel(responses=[f"answered by {api_key}"])
+
+
+limited = []
+
+
+def test_pooled_chat_model_moves_to_next_key_on_429(key_pool):
+    limited.clear()
+    model = ScriptedPooledModel(provider=LLMProvider.GROQ, model="llama-3.1-8b-instant")
+    
+    answer = model.invoke("research Acme").content
+    
+    assert answer.startswith("answered by pool-key-")
+    assert limited[0] not in answer
+    assert key_pool.headroom("groq", limited[0]) == 0.0
+
+
+def test_pooled_chat_model_binds_tools_like_the_provider(key_pool):
+    @tool
+    def lookup(company: str) -> str:
+        """Look up a company."""
+        return company
+    
+    model = PooledChatModel(provider=LLMProvider.GROQ, model="llama-3.1-8b-instant")
+    bound = model.bind_tools([lookup])
+    
+    assert bound.bound is model
+    assert bound.kwargs["tools"][0]["function"]["name"] == "lookup"
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,156 @@
+"""
+Test LLM Batch Mode
+JSONL batch submission, polling and result mapping against local stand-in endpoints (offline)
+"""
+import json
+import asyncio
+
+import httpx
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core.config import settings
+from src.core.llm_metrics import estimate_cost
+from src.core.llm_batch import BatchBackend, OpenAIBatchBackend, LocalBatchBackend, request_line, run_batch
+from src.core.llm_provider import UnifiedLLM, LLMConfig, LLMProvider
+
+
+GROQ = LLMConfig(provider=LLMProvider.GROQ, api_key="batch-key", model="llama-3.3-70b-versatile", temperature=0.0)
+
+
+def jobs(n: int) -> list:
+    return [[{"role": "user", "content": f"Score job {i}"}] for i in range(n)]
+
+
+class EchoModel(FakeListChatModel):
+    """Answers with the last user message, failing on job 2."""
+    
+    def _call(self, messages, *args, **kwargs):
+        text = messages[-1].content
+        if text.endswith("2"):
+            raise RuntimeError("provider down")
+        return f"scored: {text}"
+
+
+@pytest.fixture
+def batch_llm(make_llm, fresh_cache, fresh_metrics, monkeypatch) -> UnifiedLLM:
+    """Analyst LLM on the in-process batch backend, with a memory cache and fresh metrics."""
+    monkeypatch.setattr(settings, "llm_batch_backend", "local")
+    monkeypatch.setattr(settings, "llm_batch_poll_interval", 0.01)
+    return make_llm(
+        lambda config: EchoModel(responses=["x"]),
+        providers=[GROQ], temperature=0.0, max_retries=1, retry_delay=0.0, caller="analyst"
+    )
+
+
+def test_results_map_back_in_order(batch_llm):
+    responses = batch_llm.batch_invoke(jobs(4))
+    
+    assert responses[0] == "scored: Score job 0"
+    assert responses[3] == "scored: Score job 3"
+    assert responses[2] is None  # Failed inside the batch
+
+
+def test_cached_requests_are_not_submitted(batch_llm, monkeypatch):
+    batch_llm.batch_invoke(jobs(2))
+    
+    submitted = []
+    original = LocalBatchBackend.submit
+    monkeypatch.setattr(LocalBatchBackend, "submit", lambda self, lines: submitted.extend(lines) or original(self, lines))
+    responses = batch_llm.batch_invoke(jobs(4))
+    
+    assert responses[1] == "scored: Score job 1"
+    assert [line["custom_id"] for line in submitted] == ["request-2", "request-3"]
+
+
+def test_metrics_are_batched_and_discounted(batch_llm, fresh_metrics):
+    asyncio.run(batch_llm.abatch_invoke(jobs(3)))
+    
+    records = fresh_metrics.records()
+    assert len(records) == 3 and all(r.batched and r.caller == "analyst" for r in records)
+    assert sum(not r.success for r in records) == 1
+    
+    ok = records[0]
+    full_price = estimate_cost(ok.model, ok.prompt_tokens, ok.completion_tokens)
+    assert ok.cost == full_price * settings.llm_batch_discount
+    assert fresh_metrics.summary()["analyst"]["batched"] == 3
+
+
+def fake_batch_api() -> httpx.MockTransport:
+    """Minimal /files + /batches server that completes every batch immediately."""
+    state = {"files": {}, "batches": {}, "polls": 0}
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["authorization"] == "Bearer batch-key"
+        path = request.url.path.removeprefix("/openai/v1")
+        
+        if request.method == "POST" and path == "/files":
+            body = request.content.decode()
+            lines = [json.loads(raw) for raw in body[body.index("{"):body.rindex("}") + 1].splitlines()]
+            state["files"]["file_in"] = lines
+            return httpx.Response(200, json={"id": "file_in"})
+        
+        if request.method == "POST" and path == "/batches":
+            lines = state["files"][json.loads(request.content)["input_file_id"]]
+            output = [
+                {"custom_id": line["custom_id"], "response": {"status_code": 200, "body": {
+                    "choices": [{"message": {"content": line["body"]["messages"][-1]["content"].upper()}}],
+                    "usage": {"prompt_tokens": 12, "completion_tokens": 3},
+                }}}
+                for line in lines[:-1]
+            ]
+            errors = [{"custom_id": lines[-1]["custom_id"], "error": {"message": "invalid request"}}]
+            state["files"]["file_out"] = "\n".join(json.dumps(line) for line in output)
+            state["files"]["file_err"] = json.dumps(errors[0])
+            state["batches"]["batch_1"] = {"id": "batch_1"}
+            return httpx.Response(200, json={"id": "batch_1", "status": "validating"})
+        
+        if request.method == "GET" and path == "/batches/batch_1":
+            state["polls"] += 1
+            if state["polls"] < 2:
+                return httpx.Response(200, json={"id": "batch_1", "status": "in_progress"})
+            return httpx.Response(200, json={
+                "id": "batch_1", "status": "completed",
+                "output_file_id": "file_out", "error_file_id": "file_err",
+            })
+        
+        if request.method == "GET" and path.startswith("/files/") and path.endswith("/content"):
+            return httpx.Response(200, text=state["files"][path.split("/")[2]])
+        
+        return httpx.Response(404, json={"error": "not found"})
+    
+    return httpx.MockTransport(handler)
+
+
+def test_openai_backend_round_trip():
+    backend = OpenAIBatchBackend(
+        "https://api.groq.com/openai/v1", "batch-key",
+        http_client=httpx.Client(transport=fake_batch_api())
+    )
+    lines = [
+        request_line(f"request-{i}", {"model": "m", "messages": [{"role": "user", "content": f"job {i}"}]})
+        for i in range(3)
+    ]
+    
+    results = run_batch(backend, lines, poll_interval=0.0)
+    
+    assert results["request-0"].content == "JOB 0"
+    assert results["request-1"].usage["prompt_tokens"] == 12
+    assert not results["request-2"].ok and "invalid request" in results["request-2"].error
+
+
+def test_incomplete_backend_fails_on_creation():
+    class SubmitOnly(BatchBackend):
+        def submit(self, lines):
+            return "batch-1"
+    
+    try:
+        SubmitOnly()
+    except TypeError as e:
+        assert "status" in str(e) and "results" in str(e)
+    else:
+        raise AssertionError("Backend without status/results was created")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,105 @@
+"""
+Test LLM Run Budget
+Run and stage limits read from the metrics registry, degradation steps and CLI parsing (offline)
+"""
+import pytest
+
+from src.core.llm_metrics import LLMCallRecord
+from src.core.llm_budget import (
+    RunBudget, BudgetLimits, parse_stage_limits,
+    SKIP_COVER_LETTER, SMALL_MODEL, STOP_TAILORING, STOP
+)
+from src.core.model_routing import model_router, small_models_only
+from src.core.llm_provider import get_llm, LLMProvider
+
+
+@pytest.fixture
+def spend(fresh_metrics):
+    """Record an LLM call for `caller` in an isolated metrics registry."""
+    def record(caller: str, tokens: int, cost: float = 0.0, cached: bool = False):
+        fresh_metrics.record(LLMCallRecord(
+            caller=caller, provider="groq", model="m",
+            prompt_tokens=tokens, completion_tokens=0, cost=cost, cached=cached
+        ))
+    return record
+
+
+def test_unlimited_budget_never_degrades(spend):
+    spend("analyst", 1_000_000)
+    budget = RunBudget()
+    assert budget.remaining() == 1.0
+    assert budget.degradation() == []
+
+
+def test_steps_kick_in_as_budget_runs_low(spend):
+    budget = RunBudget(run=BudgetLimits(max_tokens=1000))
+    
+    spend("analyst", 400)
+    assert budget.degradation() == []
+    
+    spend("resume", 150)  # 45% left
+    assert budget.degradation() == [SKIP_COVER_LETTER]
+    
+    spend("resume", 200)  # 25% left
+    assert budget.degradation() == [SKIP_COVER_LETTER, SMALL_MODEL]
+    
+    spend("resume", 150)  # 10% left
+    assert STOP_TAILORING in budget.degradation() and STOP not in budget.degradation()
+    
+    spend("analyst", 100)
+    assert budget.exhausted() and STOP in budget.degradation()
+
+
+def test_stage_limits_only_affect_their_stage(spend):
+    budget = RunBudget(
+        run=BudgetLimits(max_calls=100),
+        stages={"cover_letter": BudgetLimits(max_cost=0.01)}
+    )
+    spend("cover_letter", 100, cost=0.008)
+    spend("analyst", 100, cost=0.5)
+    
+    assert SKIP_COVER_LETTER in budget.degradation("cover_letter")
+    assert budget.degradation("analyst") == []
+    
+    # Cache hits are free calls
+    spend("analyst", 0, cached=True)
+    assert budget.usage()["calls"] == 2
+
+
+def test_triage_counts_against_analyst_stage(spend):
+    budget = RunBudget(stages={"analyst": BudgetLimits(max_tokens=1000)})
+    spend("analyst", 600)
+    spend("analyst_triage", 400)
+    
+    assert budget.usage("analyst")["tokens"] == 1000
+    assert budget.exhausted("analyst")
+
+
+def test_parse_stage_limits():
+    stages = parse_stage_limits(["cover_letter:tokens=5000,calls=4", "resume:cost=0.02"])
+    assert stages["cover_letter"] == BudgetLimits(max_tokens=5000, max_calls=4)
+    assert stages["resume"].max_cost == 0.02
+    
+    for bad in ["resume", "resume:minutes=3"]:
+        try:
+            parse_stage_limits([bad])
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+def test_small_models_only_downgrades_routes():
+    assert model_router.tier("creative_writing") == "large"
+    large = get_llm(temperature=0.3, task="creative_writing")
+    
+    with small_models_only():
+        assert model_router.tier("creative_writing") == "small"
+        small = get_llm(temperature=0.3, task="creative_writing")
+    
+    assert small is not large
+    assert small.models[LLMProvider.GROQ] == "llama-3.1-8b-instant"
+    assert get_llm(temperature=0.3, task="creative_writing") is large
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
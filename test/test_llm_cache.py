@@ -0,0 +1,131 @@
+"""
+Test LLM Response Cache
+Memory/disk tiers, TTL expiry, eviction and UnifiedLLM integration (offline)
+"""
+import time
+import tempfile
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core import llm_cache as cache_module
+from src.core.llm_cache import LLMCache
+
+
+MESSAGES = [
+    {"role": "system", "content": "Output only valid JSON."},
+    {"role": "user", "content": "Salary for Python Developer in Remote"}
+]
+
+
+def test_key_is_stable_and_sensitive():
+    """Same inputs hash the same; any field change alters the key."""
+    key = LLMCache.make_key("groq", "llama-3.1-8b-instant", 0.3, MESSAGES)
+    
+    assert key == LLMCache.make_key("groq", "llama-3.1-8b-instant", 0.3, list(MESSAGES))
+    assert key != LLMCache.make_key("groq", "llama-3.1-8b-instant", 0.0, MESSAGES)
+    assert key != LLMCache.make_key("openrouter", "llama-3.1-8b-instant", 0.3, MESSAGES)
+    assert key != LLMCache.make_key("groq", "llama-3.1-8b-instant", 0.3, MESSAGES[:1])
+
+
+def test_disk_tier_survives_new_instance():
+    """A second cache on the same file serves entries from disk."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.sqlite"
+        
+        first = LLMCache(path=str(path))
+        first.set("k1", "cached response")
+        assert first.get(["k1"]) == "cached response"
+        assert first.stats()["memory_hits"] == 1
+        
+        second = LLMCache(path=str(path))
+        assert second.get(["missing", "k1"]) == "cached response"
+        stats = second.stats()
+        assert stats["disk_hits"] == 1
+        assert stats["hits"] == 1 and stats["misses"] == 0
+
+
+def test_ttl_expiry():
+    """Expired entries are misses in both tiers."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCache(path=str(Path(tmp) / "cache.sqlite"))
+        cache.set("k1", "stale", ttl_seconds=0.01)
+        time.sleep(0.05)
+        
+        assert cache.get(["k1"]) is None
+        assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    """Both tiers stay within their size bounds, dropping oldest first."""
+    memory_only = LLMCache(path=None, max_memory_entries=2)
+    memory_only.set("a", "1")
+    memory_only.set("b", "2")
+    memory_only.get(["a"])  # touch a so b is the LRU entry
+    memory_only.set("c", "3")
+    
+    assert memory_only.stats()["memory_entries"] == 2
+    assert memory_only.get(["b"]) is None
+    assert memory_only.get(["a"]) == "1"
+    assert memory_only.get(["c"]) == "3"
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCache(path=str(Path(tmp) / "cache.sqlite"), max_disk_entries=2)
+        for key in ["a", "b", "c"]:
+            cache.set(key, key.upper())
+        
+        rows = cache._connect().execute("SELECT key FROM llm_cache ORDER BY key").fetchall()
+        assert [r[0] for r in rows] == ["b", "c"]
+
+
+def test_unified_llm_skips_repeat_calls(make_llm, fresh_cache):
+    """A repeated low-temperature prompt is answered without a model call."""
+    calls = []
+    
+    class CountingModel(FakeListChatModel):
+        def _call(self, *args, **kwargs):
+            calls.append(1)
+            return super()._call(*args, **kwargs)
+    
+    model = CountingModel(responses=['{"p50": 95000}'])
+    llm = make_llm(model, temperature=0.0)
+    
+    assert llm.invoke(MESSAGES) == '{"p50": 95000}'
+    assert llm.invoke(MESSAGES) == '{"p50": 95000}'
+    assert len(calls) == 1
+    
+    # High-temperature calls bypass the cache
+    make_llm(model, temperature=0.7).invoke(MESSAGES)
+    assert len(calls) == 2
+
+
+def test_invalid_response_is_evicted(make_llm, monkeypatch, tmp_path):
+    """A cached response that fails validation is not served again."""
+    from src.core.structured_output import parse_or_repair, StructuredOutputError
+    
+    monkeypatch.setattr(cache_module, "_cache_instance", LLMCache(path=str(tmp_path / "cache.sqlite")))
+    responses = ['{"p50": 95000', "still broken", '{"p50": 95000}']
+    calls = []
+    
+    class ScriptedModel(FakeListChatModel):
+        def _call(self, *args, **kwargs):
+            calls.append(1)
+            return responses[len(calls) - 1]
+    
+    model = ScriptedModel(responses=["x"])
+    llm = make_llm(model, temperature=0.0)
+    
+    try:
+        parse_or_repair(llm, llm.invoke(MESSAGES))
+        assert False, "expected StructuredOutputError"
+    except StructuredOutputError:
+        pass
+    
+    # Neither tier serves the malformed text; the next call asks the model again
+    assert make_llm(model, temperature=0.0).invoke(MESSAGES) == '{"p50": 95000}'
+    assert len(calls) == 3
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
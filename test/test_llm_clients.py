@@ -0,0 +1,53 @@
+"""
+Test LLM Client Registry
+Checks that chat-model clients and HTTP pools are shared, not rebuilt per call
+"""
+from src.core.llm_provider import LLMProvider, LLMConfig
+from src.core.llm_clients import ClientRegistry
+
+
+def test_same_key_reuses_client():
+    """Identical (provider, key, model, temperature) returns the same client."""
+    registry = ClientRegistry()
+    
+    first = registry.get(LLMProvider.GROQ, "gsk_test", "llama-3.1-8b-instant", 0.3)
+    second = registry.get(LLMProvider.GROQ, "gsk_test", "llama-3.1-8b-instant", 0.3)
+    
+    assert first is second
+    assert registry.stats() == {"clients": 1, "created": 1, "reused": 1}
+
+
+def test_different_temperature_gets_own_client():
+    """Temperature is part of the key, but the HTTP pool is shared."""
+    registry = ClientRegistry()
+    
+    cold = registry.get(LLMProvider.GROQ, "gsk_test", "llama-3.1-8b-instant", 0.0)
+    warm = registry.get(LLMProvider.GROQ, "gsk_test", "llama-3.1-8b-instant", 0.7)
+    
+    assert cold is not warm
+    assert cold.http_client is warm.http_client
+    assert cold.http_async_client is warm.http_async_client
+
+
+def test_from_config():
+    """LLMConfig lookups share entries with direct lookups."""
+    registry = ClientRegistry()
+    config = LLMConfig(
+        provider=LLMProvider.OPENROUTER,
+        api_key="sk-or-test",
+        model="qwen/qwen-2.5-coder-32b-instruct:free",
+        temperature=0.3
+    )
+    
+    assert registry.from_config(config) is registry.get(
+        LLMProvider.OPENROUTER, "sk-or-test", "qwen/qwen-2.5-coder-32b-instruct:free", 0.3
+    )
+    registry.close()
+    assert registry.stats()["clients"] == 0
+
+
+if __name__ == "__main__":
+    test_same_key_reuses_client()
+    test_different_temperature_gets_own_client()
+    test_from_config()
+    print("✅ All client registry tests passed!")
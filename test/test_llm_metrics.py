@@ -0,0 +1,116 @@
+"""
+Test LLM Usage Metrics
+Per-call records with caller labels, fallback hops, cache hits and JSON export (offline)
+"""
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core.llm_metrics import LLMMetrics, LLMCallRecord, llm_caller, estimate_cost
+from src.core.llm_provider import UnifiedLLM, LLMConfig, LLMProvider, LLMError
+
+
+PRIMARY = LLMConfig(provider=LLMProvider.GROQ, api_key="metrics-k1", model="llama-3.3-70b-versatile", temperature=0.7)
+BACKUP = LLMConfig(provider=LLMProvider.OPENROUTER, api_key="metrics-k2", model="backup-model", temperature=0.7)
+
+MESSAGES = [{"role": "user", "content": "Score this job"}]
+
+
+class FailingModel(FakeListChatModel):
+    def _call(self, *args, **kwargs):
+        raise RuntimeError("provider down")
+
+
+@pytest.fixture
+def metrics_llm(make_llm, fresh_metrics, fresh_health):
+    """Factory for an LLM over a primary (optionally failing) and a backup provider."""
+    def make(primary_fails: bool = False, **kwargs) -> UnifiedLLM:
+        return make_llm(
+            {
+                LLMProvider.GROQ: FailingModel(responses=["x"]) if primary_fails else FakeListChatModel(responses=["primary"]),
+                LLMProvider.OPENROUTER: FakeListChatModel(responses=["backup"]),
+            },
+            providers=[PRIMARY, BACKUP], temperature=0.7, **kwargs
+        )
+    return make
+
+
+def test_caller_label_resolution(metrics_llm, fresh_metrics):
+    metrics_llm(caller="analyst").invoke(MESSAGES)
+    metrics_llm(caller="analyst").invoke(MESSAGES, caller="salary")
+    with llm_caller("company"):
+        metrics_llm().invoke(MESSAGES)
+    metrics_llm().invoke(MESSAGES)
+    
+    callers = [r.caller for r in fresh_metrics.records()]
+    assert callers == ["analyst", "salary", "company", "other"]
+
+
+def test_fallback_hops_and_failures(metrics_llm, fresh_metrics):
+    assert metrics_llm(primary_fails=True, caller="resume").invoke(MESSAGES) == "backup"
+    
+    record = fresh_metrics.records("resume")[0]
+    assert record.provider == "openrouter"
+    assert record.fallback_hops == 1
+    assert record.completion_tokens > 0
+    
+    llm = metrics_llm(primary_fails=True, caller="resume")
+    llm.providers = [PRIMARY]
+    try:
+        llm.invoke(MESSAGES)
+        assert False, "expected LLMError"
+    except LLMError:
+        pass
+    
+    summary = fresh_metrics.summary()
+    assert summary["resume"]["calls"] == 2
+    assert summary["resume"]["failures"] == 1
+
+
+def test_cache_hits_are_recorded_free(metrics_llm, fresh_metrics, fresh_cache):
+    llm = metrics_llm(caller="analyst")
+    llm.invoke(MESSAGES, use_cache=True)
+    llm.invoke(MESSAGES, use_cache=True)
+    
+    first, second = fresh_metrics.records()
+    assert not first.cached and first.cost > 0
+    assert second.cached and second.provider == "cache" and second.cost == 0
+    assert fresh_metrics.summary()["analyst"]["cached"] == 1
+
+
+def test_summary_and_json_export():
+    metrics = LLMMetrics()
+    metrics.record(LLMCallRecord("analyst", "groq", "llama-3.3-70b-versatile", 1000, 200, latency=1.5))
+    metrics.record(LLMCallRecord("cover_letter", "groq", "llama-3.3-70b-versatile", 500, 800, latency=3.0, retries=1))
+    
+    summary = metrics.summary()
+    assert summary["total"]["calls"] == 2
+    assert summary["total"]["total_tokens"] == 2500
+    assert summary["cover_letter"]["retries"] == 1
+    assert summary["analyst"]["cost_usd"] == round(estimate_cost("llama-3.3-70b-versatile", 1000, 200), 6)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "run" / "metrics.json"
+        metrics.to_json(str(path))
+        data = json.loads(path.read_text())
+    
+    assert set(data["summary"]) == {"analyst", "cover_letter", "total"}
+    assert len(data["records"]) == 2
+
+
+def test_callback_records_direct_model_calls():
+    metrics = LLMMetrics()
+    model = FakeListChatModel(responses=["interview plan"])
+    
+    model.invoke("prepare me", config={"callbacks": [metrics.callback("interview")]})
+    
+    records = metrics.records("interview")
+    assert len(records) == 1
+    assert records[0].success
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,102 @@
+"""
+Test LLM Scheduler
+Interactive calls are admitted ahead of bulk ones for provider slots and rate-limit quota (offline)
+"""
+import time
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core.rate_limiter import RateLimiter
+from src.core.llm_scheduler import PrioritySemaphore, llm_priority, INTERACTIVE, BULK
+from src.core.llm_provider import UnifiedLLM, LLMConfig, LLMProvider
+
+
+def test_interactive_waiters_go_first():
+    async def scenario():
+        semaphore = PrioritySemaphore(1)
+        order = []
+        
+        async def job(name, priority):
+            async with semaphore.slot(priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+        
+        await semaphore.acquire(BULK)  # Slot busy
+        tasks = [asyncio.create_task(job(f"bulk-{i}", BULK)) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(job("interactive", INTERACTIVE)))
+        await asyncio.sleep(0)
+        
+        semaphore.release()
+        await asyncio.gather(*tasks)
+        return order
+    
+    assert asyncio.run(scenario()) == ["interactive", "bulk-0", "bulk-1", "bulk-2"]
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def scenario():
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+        
+        waiter = asyncio.create_task(semaphore.acquire(BULK))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        
+        semaphore.release()
+        await asyncio.wait_for(semaphore.acquire(), timeout=1)
+        return semaphore.waiting()
+    
+    assert asyncio.run(scenario()) == 0
+
+
+def test_bulk_leaves_quota_for_interactive():
+    limiter = RateLimiter(limits={"groq": {"rpm": 10, "tpm": 0}})
+    
+    # Default reserve is 20%: bulk gets 8 of 10 requests, then waits without reserving
+    assert all(limiter.reserve("groq", "k", 1, priority=BULK) == 0 for _ in range(8))
+    assert limiter.reserve("groq", "k", 1, priority=BULK) > 0
+    
+    assert limiter.reserve("groq", "k", 1, max_wait=0, priority=INTERACTIVE) == 0
+    assert limiter.reserve("groq", "k", 1, max_wait=0, priority=INTERACTIVE) == 0
+
+
+class SlowModel(FakeListChatModel):
+    def _call(self, messages, *args, **kwargs):
+        time.sleep(0.05)
+        finished.append(messages[-1].content)
+        return "ok"
+
+
+finished = []
+
+
+def test_interactive_call_overtakes_bulk_backlog(make_llm, no_rate_limits, fresh_health):
+    finished.clear()
+    
+    def scheduled_llm(priority=None) -> UnifiedLLM:
+        return make_llm(
+            lambda config: SlowModel(responses=["ok"]),
+            providers=[LLMConfig(provider=LLMProvider.GROQ, api_key="sched-key", model="m", temperature=0.9)],
+            temperature=0.9, max_concurrency={"groq": 1}, priority=priority
+        )
+    
+    async def scenario():
+        bulk, chat = scheduled_llm(priority=BULK), scheduled_llm()
+        tasks = [asyncio.create_task(bulk.ainvoke([{"role": "user", "content": f"bulk {i}"}])) for i in range(5)]
+        await asyncio.sleep(0.01)
+        with llm_priority(INTERACTIVE):
+            tasks.append(asyncio.create_task(chat.ainvoke([{"role": "user", "content": "interactive"}])))
+        await asyncio.gather(*tasks)
+    
+    asyncio.run(scenario())
+    
+    # Only the bulk call already in flight finishes before the interactive one
+    assert finished.index("interactive") == 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,120 @@
+"""
+Test LLM Simulator
+Simulated endpoints inject latency, 429s and error bursts into the real fallback logic (offline)
+"""
+import asyncio
+
+import pytest
+
+from src.core import rate_limiter as limiter_module
+from src.core.config import settings
+from src.core.rate_limiter import RateLimiter
+from src.core.llm_simulator import SimulatedChatModel, SimulatedProviderError, get_profile
+from src.core.llm_provider import UnifiedLLM, LLMConfig, LLMProvider, LLMError
+
+
+SIM_A = LLMConfig(provider=LLMProvider.SIMULATED, api_key="sim-a", model="llama-3.1-8b-instant", temperature=0.7)
+SIM_B = LLMConfig(provider=LLMProvider.SIMULATED, api_key="sim-b", model="llama-3.1-8b-instant", temperature=0.7)
+
+MESSAGES = [{"role": "user", "content": "Summarize the company culture"}]
+
+
+@pytest.fixture
+def limiter(fresh_health, monkeypatch) -> RateLimiter:
+    """Rate limiter with room for 60 simulated requests a minute."""
+    limiter = RateLimiter(limits={"simulated": {"rpm": 60, "tpm": 0}})
+    monkeypatch.setattr(limiter_module, "rate_limiter", limiter)
+    return limiter
+
+
+@pytest.fixture
+def sim_llm(make_llm, limiter):
+    """Factory for an LLM over two simulated endpoints; returns (llm, models by key)."""
+    def make(profile_a: str, profile_b: str = "ideal", **overrides_a) -> tuple:
+        models = {
+            "sim-a": SimulatedChatModel(profile=get_profile(profile_a, overrides_a), responses=["from a"], seed=1),
+            "sim-b": SimulatedChatModel(profile=get_profile(profile_b), responses=["from b"], seed=2),
+        }
+        llm = make_llm(models, providers=[SIM_A, SIM_B], temperature=0.7, retry_delay=0.0)
+        
+        # sim-b has less quota left, so the key pool tries sim-a first
+        for _ in range(10):
+            limiter.reserve("simulated", "sim-b", 1)
+        return llm, models
+    return make
+
+
+def test_outage_falls_back_to_next_endpoint(sim_llm):
+    llm, models = sim_llm("outage")
+    
+    assert asyncio.run(llm.ainvoke(MESSAGES)) == "from b"
+    assert models["sim-a"].stats["errors"] == 1
+
+
+def test_injected_429s_are_retried_then_skipped(sim_llm):
+    llm, models = sim_llm("rate_limit_storm", rate_limit_rate=1.0, retry_after=0.05)
+    
+    assert llm.invoke(MESSAGES) == "from b"
+    assert models["sim-a"].stats["rate_limited"] == llm.max_retries
+
+
+def test_total_outage_raises(sim_llm):
+    llm, _ = sim_llm("outage", "outage")
+    try:
+        llm.invoke(MESSAGES)
+        assert False, "expected LLMError"
+    except LLMError:
+        pass
+
+
+def test_error_bursts():
+    model = SimulatedChatModel(profile=get_profile("flaky", {"error_rate": 1.0, "burst_rate": 1.0, "burst_length": 3}))
+    
+    for _ in range(3):
+        try:
+            model.invoke("hi")
+            assert False, "expected SimulatedProviderError"
+        except SimulatedProviderError as e:
+            assert e.status_code >= 500
+        model.profile.error_rate = 0.0  # Only the burst keeps failing
+    
+    assert model.invoke("hi").content
+    assert model.stats["errors"] == 3
+
+
+def test_server_side_rpm_quota():
+    model = SimulatedChatModel(profile=get_profile("ideal", {"rpm": 2}))
+    model.invoke("one")
+    model.invoke("two")
+    
+    try:
+        model.invoke("three")
+        assert False, "expected 429"
+    except SimulatedProviderError as e:
+        assert e.status_code == 429
+        assert float(e.response.headers["retry-after"]) > 0
+
+
+def test_seeded_latency_is_reproducible():
+    profile = get_profile("slow")
+    a = SimulatedChatModel(profile=profile, seed=42)
+    b = SimulatedChatModel(profile=profile, seed=42)
+    
+    samples_a = [a._sample_latency() for _ in range(5)]
+    assert samples_a == [b._sample_latency() for _ in range(5)]
+    assert all(s > 0 for s in samples_a)
+
+
+def test_settings_profile_replaces_provider_chain(limiter, monkeypatch):
+    monkeypatch.setattr(settings, "llm_simulated_profile", "ideal")
+    
+    llm = UnifiedLLM(temperature=0.9, models={LLMProvider.GROQ: "llama-3.3-70b-versatile"})
+    assert {c.provider for c in llm.providers} == {LLMProvider.SIMULATED}
+    assert llm.providers[0].model == "llama-3.3-70b-versatile"
+    
+    analysis = llm.generate_json("Return match_score and role as JSON")
+    assert analysis["match_score"] == 75
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,99 @@
+"""
+Test LLM Streaming
+UnifiedLLM.stream/astream: progressive chunks, fallback only before the first token (offline)
+"""
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core.llm_provider import UnifiedLLM, LLMConfig, LLMProvider, LLMError
+
+
+PRIMARY = LLMConfig(provider=LLMProvider.GROQ, api_key="stream-k1", model="m", temperature=0.6)
+BACKUP = LLMConfig(provider=LLMProvider.OPENROUTER, api_key="stream-k2", model="m", temperature=0.6)
+
+LETTER = "Dear Hiring Manager, I am excited to apply."
+MESSAGES = [{"role": "user", "content": "Write a cover letter"}]
+
+
+@pytest.fixture
+def letter_llm(make_llm, fresh_health):
+    """Factory for an LLM whose primary streams LETTER (optionally failing at a chunk)."""
+    def make(primary_error_at=None) -> UnifiedLLM:
+        return make_llm(
+            {
+                LLMProvider.GROQ: FakeListChatModel(responses=[LETTER], error_on_chunk_number=primary_error_at),
+                LLMProvider.OPENROUTER: FakeListChatModel(responses=["Backup letter"]),
+            },
+            providers=[PRIMARY, BACKUP], temperature=0.6
+        )
+    return make
+
+
+async def collect(llm: UnifiedLLM, **kwargs) -> list:
+    return [chunk async for chunk in llm.astream(MESSAGES, **kwargs)]
+
+
+def test_astream_yields_progressively(letter_llm):
+    chunks = asyncio.run(collect(letter_llm()))
+    
+    assert len(chunks) > 1
+    assert "".join(chunks) == LETTER
+
+
+def test_fallback_before_first_token(letter_llm):
+    chunks = asyncio.run(collect(letter_llm(primary_error_at=0)))
+    assert "".join(chunks) == "Backup letter"
+    
+    sync_chunks = list(letter_llm(primary_error_at=0).stream(MESSAGES))
+    assert "".join(sync_chunks) == "Backup letter"
+
+
+def test_no_fallback_after_first_token(letter_llm):
+    received = []
+    
+    async def run():
+        async for chunk in letter_llm(primary_error_at=3).astream(MESSAGES):
+            received.append(chunk)
+    
+    try:
+        asyncio.run(run())
+        assert False, "expected LLMError"
+    except LLMError as e:
+        assert "mid-response" in str(e)
+    
+    # Partial output from the primary only, never mixed with the backup
+    assert "".join(received) == LETTER[:3]
+
+
+def test_empty_stream_completes(make_llm, fresh_health):
+    class SilentModel:
+        """Client whose stream ends without a single chunk."""
+        def stream(self, messages):
+            return iter(())
+        
+        async def astream(self, messages):
+            return
+            yield
+    
+    llm = make_llm(SilentModel(), providers=[PRIMARY, BACKUP], temperature=0.6)
+    
+    # No chunk at all is an empty completion, not a metrics crash
+    assert asyncio.run(collect(llm)) == []
+    assert list(llm.stream(MESSAGES)) == []
+
+
+def test_completed_stream_is_cached(letter_llm, make_llm, fresh_cache):
+    assert "".join(letter_llm().stream(MESSAGES, use_cache=True)) == LETTER
+    
+    # Second stream is served whole from the cache, even if the provider breaks
+    broken = make_llm(
+        FakeListChatModel(responses=["x"], error_on_chunk_number=0),
+        providers=[PRIMARY, BACKUP], temperature=0.6
+    )
+    assert list(broken.stream(MESSAGES, use_cache=True)) == [LETTER]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,69 @@
+"""
+Test Local LLM Tier
+Local model server placement in the chain and pinning for cheap task classes (offline)
+"""
+import pytest
+
+from src.core.config import settings
+from src.core.provider_health import ProviderHealth
+from src.core.llm_clients import ClientRegistry
+from src.core.llm_provider import UnifiedLLM, LLMProvider
+
+
+@pytest.fixture
+def local_server(fresh_health, monkeypatch) -> ProviderHealth:
+    """A local server appended to the chain; returns the fresh provider health."""
+    monkeypatch.setattr(settings, "local_llm_base_url", "http://localhost:11434/v1")
+    monkeypatch.setattr(settings, "local_llm_chain_position", -1)
+    return fresh_health
+
+
+def planned_providers(llm: UnifiedLLM) -> list:
+    return [config.provider for _, config, _ in llm._attempt_plan()]
+
+
+def test_local_tier_appended_by_default(local_server):
+    llm = UnifiedLLM()
+    assert llm.providers[-1].provider == LLMProvider.LOCAL
+    assert llm.providers[-1].model == settings.local_llm_model
+
+
+def test_local_tier_at_configured_position(local_server, monkeypatch):
+    monkeypatch.setattr(settings, "local_llm_chain_position", 0)
+    llm = UnifiedLLM()
+    assert llm.providers[0].provider == LLMProvider.LOCAL
+
+
+def test_latency_ordering_does_not_promote_local(local_server):
+    llm = UnifiedLLM()
+    local, hosted = llm.providers[-1], llm.providers[0]
+    local_server.record_success(local, 0.01)
+    local_server.record_success(hosted, 1.5)
+    
+    assert planned_providers(llm)[-1] == LLMProvider.LOCAL
+
+
+def test_pinned_task_prefers_local_until_it_fails(local_server):
+    llm = UnifiedLLM(task="triage")
+    local = llm.providers[-1]
+    assert planned_providers(llm)[0] == LLMProvider.LOCAL
+    
+    # Local server down: circuit opens and the hosted chain takes over
+    for _ in range(settings.llm_circuit_min_calls):
+        local_server.record_failure(local)
+    assert LLMProvider.LOCAL not in planned_providers(llm)
+
+
+def test_registry_builds_openai_compatible_client(monkeypatch):
+    monkeypatch.setattr(settings, "local_llm_base_url", "http://localhost:8080/v1")
+    registry = ClientRegistry()
+    try:
+        client = registry.get(LLMProvider.LOCAL, "local", "qwen2.5:7b", 0.0)
+        assert str(client.openai_api_base).startswith("http://localhost:8080/v1")
+        assert client.model_name == "qwen2.5:7b"
+    finally:
+        registry.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
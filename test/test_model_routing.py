@@ -0,0 +1,66 @@
+"""
+Test Model Routing
+Task classes to model tiers, settings overrides and latency-SLA ordering (offline)
+"""
+import pytest
+
+from src.core.config import settings
+from src.core.model_routing import model_router
+from src.core.llm_provider import UnifiedLLM, LLMConfig, LLMProvider
+
+
+@pytest.fixture(autouse=True)
+def no_overrides(fresh_health, monkeypatch):
+    """No routing overrides in settings and fresh provider health for every test."""
+    monkeypatch.setattr(settings, "llm_model_tiers", {})
+    monkeypatch.setattr(settings, "llm_task_routes", {})
+
+
+def groq_model(llm: UnifiedLLM) -> str:
+    return next(c.model for c in llm.providers if c.provider == LLMProvider.GROQ)
+
+
+def test_cheap_tasks_use_small_model():
+    assert groq_model(UnifiedLLM(task="classification")) == "llama-3.1-8b-instant"
+    assert groq_model(UnifiedLLM(task="scoring")) == "llama-3.3-70b-versatile"
+    assert groq_model(UnifiedLLM(task="creative_writing")) == "llama-3.3-70b-versatile"
+    
+    # No task (or an unknown one) keeps the chain defaults
+    assert groq_model(UnifiedLLM()) == "llama-3.1-8b-instant"
+    assert model_router.models("unknown") == {}
+
+
+def test_explicit_models_win():
+    llm = UnifiedLLM(task="scoring", models={LLMProvider.GROQ: "custom-model"})
+    assert groq_model(llm) == "custom-model"
+
+
+def test_settings_override_tiers_and_routes(monkeypatch):
+    monkeypatch.setattr(settings, "llm_model_tiers", {"large": {"groq": "llama-4-maverick"}})
+    monkeypatch.setattr(settings, "llm_task_routes", {"scoring": "small", "creative_writing": {"latency_sla": 5}})
+    
+    assert groq_model(UnifiedLLM(task="scoring")) == "llama-3.1-8b-instant"
+    
+    writer = UnifiedLLM(task="creative_writing")
+    assert groq_model(writer) == "llama-4-maverick"
+    assert writer.latency_sla == 5.0
+
+
+def test_endpoints_over_sla_are_demoted(fresh_health):
+    slow = LLMConfig(provider=LLMProvider.GROQ, api_key="slow", model="m")
+    fast = LLMConfig(provider=LLMProvider.OPENROUTER, api_key="fast", model="m")
+    health = fresh_health
+    for _ in range(10):
+        health.record_success(slow, 1.0)
+        health.record_success(fast, 2.5)
+    
+    # Within the SLA the lower p50 wins; a p95 over the SLA moves the endpoint behind
+    assert health.order([slow, fast]) == [slow, fast]
+    assert health.order([slow, fast], latency_sla=3.0) == [slow, fast]
+    for _ in range(2):
+        health.record_success(slow, 9.0)
+    assert health.order([slow, fast], latency_sla=3.0) == [fast, slow]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
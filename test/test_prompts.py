@@ -0,0 +1,72 @@
+"""
+Test Prompt Templates
+Static prefix, then profile, then per-job content - byte-stable across calls (offline)
+"""
+from src.core.prompts import (
+    ANALYST_SCORING, RESUME_TAILORING, COVER_LETTER_CONTENT, canonical_profile
+)
+from src.automators.analyst import AnalystAgent
+
+
+RESUME = "Name: Test Candidate\n\nSKILLS:\n- Languages: Python, Go"
+
+
+def shared_prefix(a: str, b: str) -> int:
+    n = 0
+    while n < min(len(a), len(b)) and a[n] == b[n]:
+        n += 1
+    return n
+
+
+def test_profile_rendering_is_byte_stable():
+    one = {"skills": {"languages": ["Python"]}, "personal_information": {"full_name": "A"}}
+    two = {"personal_information": {"full_name": "A"}, "skills": {"languages": ["Python"]}}
+    
+    assert canonical_profile(one) == canonical_profile(two)
+    assert canonical_profile("  text \n") == "text"
+    assert len(canonical_profile(one, limit=10)) == 10
+
+
+def test_volatile_job_content_comes_last():
+    first = AnalystAgent()._build_messages("https://jobs.example/1", "Acme wants Python", RESUME)
+    second = AnalystAgent()._build_messages("https://jobs.example/2", "Globex wants Go", RESUME)
+    
+    assert first[0].content == second[0].content
+    user_a, user_b = first[1].content, second[1].content
+    assert user_a.startswith("CANDIDATE RESUME:\n" + RESUME)
+    
+    # Everything before the job block is shared between jobs
+    assert shared_prefix(user_a, user_b) >= user_a.index("JOB POSTING URL")
+    assert user_a.endswith("Acme wants Python")
+
+
+def test_job_fields_may_contain_braces():
+    messages = ANALYST_SCORING.messages({"url": "u", "job_text": "Use {json} and {{templates}}"}, profile=RESUME)
+    assert messages[1].content.endswith("Use {json} and {{templates}}")
+
+
+def test_templates_render_every_field():
+    resume = RESUME_TAILORING.messages(
+        {"role": "Engineer", "company": "Acme", "keywords": "python", "must_have": "go", "feedback": ""},
+        profile=canonical_profile({"name": "A"})
+    )
+    assert "- Role: Engineer" in resume[1].content
+    assert "Return ONLY valid JSON" in resume[0].content
+    
+    letter = COVER_LETTER_CONTENT.messages(
+        {
+            "role": "Engineer", "company": "Acme", "tech_stack": "Python", "culture_type": "startup",
+            "values": "speed", "matching_skills": "Python", "tone": "Be direct.", "feedback": "",
+        },
+        profile="- Name: A"
+    )
+    assert letter[1].content.startswith("CANDIDATE:\n- Name: A")
+    assert "[Name]" in letter[0].content
+
+
+if __name__ == "__main__":
+    test_profile_rendering_is_byte_stable()
+    test_volatile_job_content_comes_last()
+    test_job_fields_may_contain_braces()
+    test_templates_render_every_field()
+    print("✅ All prompt template tests passed!")
@@ -0,0 +1,115 @@
+"""
+Test LLM Provider Health
+Circuit breaker transitions and latency-aware ordering of the fallback chain (offline)
+"""
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core import provider_health as health_module
+from src.core.provider_health import ProviderHealth, CircuitState, percentile
+from src.core.llm_provider import LLMConfig, LLMProvider, LLMError
+
+
+def make_config(provider: LLMProvider, key: str) -> LLMConfig:
+    return LLMConfig(provider=provider, api_key=key, model="test-model")
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([], 50) is None
+
+
+def test_circuit_opens_and_recovers():
+    """Closed -> open after repeated errors -> half-open probe -> closed."""
+    health = ProviderHealth(window=10, error_threshold=0.5, min_calls=3, cooldown=30)
+    groq = make_config(LLMProvider.GROQ, "k1")
+    
+    for _ in range(3):
+        assert health.allow(groq)
+        health.record_failure(groq)
+    
+    endpoint = health.get(groq)
+    assert endpoint.state == CircuitState.OPEN
+    assert not health.allow(groq)
+    
+    # Cooldown elapsed: exactly one probe is let through
+    endpoint.opened_at -= 31
+    assert health.allow(groq)
+    assert endpoint.state == CircuitState.HALF_OPEN
+    assert not health.allow(groq)
+    
+    health.record_success(groq, 0.4)
+    assert endpoint.state == CircuitState.CLOSED
+    assert health.allow(groq)
+
+
+def test_failed_probe_doubles_cooldown():
+    health = ProviderHealth(min_calls=1, cooldown=10, max_cooldown=15)
+    groq = make_config(LLMProvider.GROQ, "k1")
+    
+    health.record_failure(groq)
+    endpoint = health.get(groq)
+    endpoint.opened_at -= 11
+    assert health.allow(groq)
+    health.record_failure(groq)
+    
+    assert endpoint.state == CircuitState.OPEN
+    assert endpoint.cooldown == 15
+
+
+def test_order_skips_open_and_prefers_fast():
+    """Open circuits are dropped; measured endpoints sort by p50, unmeasured keep config order."""
+    health = ProviderHealth(min_calls=1)
+    groq = make_config(LLMProvider.GROQ, "k1")
+    groq_fallback = make_config(LLMProvider.GROQ, "k2")
+    openrouter = make_config(LLMProvider.OPENROUTER, "k3")
+    gemini = make_config(LLMProvider.GEMINI, "k4")
+    
+    health.record_success(groq_fallback, 2.0)
+    health.record_success(openrouter, 0.5)
+    health.record_failure(groq)
+    
+    assert health.order([groq, groq_fallback, openrouter, gemini]) == [openrouter, groq_fallback, gemini]
+
+
+def test_all_open_keeps_one_probe():
+    health = ProviderHealth(min_calls=1)
+    groq = make_config(LLMProvider.GROQ, "k1")
+    openrouter = make_config(LLMProvider.OPENROUTER, "k2")
+    
+    health.record_failure(groq)
+    health.record_failure(openrouter)
+    health.get(openrouter).opened_at -= 5
+    
+    assert health.order([groq, openrouter]) == [openrouter]
+    assert health.allow(openrouter)
+
+
+def test_unified_llm_fails_fast_when_circuit_open(make_llm, monkeypatch):
+    """A dead provider costs one attempt per call once its circuit is open."""
+    monkeypatch.setattr(health_module, "provider_health", ProviderHealth(min_calls=2, cooldown=60))
+    calls = []
+    
+    class BrokenModel(FakeListChatModel):
+        def _call(self, *args, **kwargs):
+            calls.append(1)
+            raise RuntimeError("503 Service Unavailable")
+    
+    llm = make_llm(BrokenModel(responses=["unused"]), temperature=0.7, max_retries=3)
+    
+    for _ in range(4):
+        try:
+            llm.invoke([{"role": "user", "content": "hi"}])
+            assert False, "expected LLMError"
+        except LLMError:
+            pass
+    
+    # Two calls open the circuit; the rest are single half-open probes at most
+    per_endpoint = len(llm.providers)
+    assert len(calls) <= 2 * per_endpoint + 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,124 @@
+"""
+Test LLM Rate Limiter
+Token-bucket queueing, header parsing and UnifiedLLM deferral (offline)
+"""
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core import rate_limiter as limiter_module
+from src.core.rate_limiter import RateLimiter, parse_duration
+from src.core.llm_provider import LLMError
+
+
+def test_requests_queue_behind_each_other():
+    """Once the bucket is empty, callers get increasing waits instead of 429s."""
+    limiter = RateLimiter({"groq": {"rpm": 2, "tpm": 0}})
+    
+    assert limiter.reserve("groq", "k1", 100) == 0
+    assert limiter.reserve("groq", "k1", 100) == 0
+    
+    third = limiter.reserve("groq", "k1", 100)
+    fourth = limiter.reserve("groq", "k1", 100)
+    assert 29 < third <= 30
+    assert 59 < fourth <= 60
+    
+    # Other keys have their own buckets
+    assert limiter.reserve("groq", "k2", 100) == 0
+
+
+def test_max_wait_reserves_nothing():
+    """A reservation that would wait too long is refused and leaves the bucket untouched."""
+    limiter = RateLimiter({"groq": {"rpm": 0, "tpm": 1000}})
+    
+    assert limiter.reserve("groq", "k", 900) == 0
+    assert limiter.reserve("groq", "k", 500, max_wait=5) is None
+    assert limiter.reserve("groq", "k", 100, max_wait=5) == 0
+
+
+def test_parse_duration():
+    assert parse_duration("7") == 7.0
+    assert parse_duration("7.66s") == 7.66
+    assert parse_duration("1m2.5s") == 62.5
+    assert parse_duration("120ms") == 0.12
+    assert parse_duration("soon") is None
+    assert parse_duration(None) is None
+
+
+def test_headers_tighten_limits():
+    """Groq token headers and Retry-After block the key until reset."""
+    limiter = RateLimiter({"groq": {"rpm": 30, "tpm": 6000}})
+    
+    limiter.observe_headers("groq", "k", {
+        "x-ratelimit-remaining-requests": "14000",
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-tokens": "7.5s",
+    })
+    assert 7 < limiter.reserve("groq", "k", 10) <= 7.5
+    
+    limiter.observe_headers("groq", "other", {"Retry-After": "12"})
+    assert 11 < limiter.reserve("groq", "other", 10) <= 12
+
+
+def test_limit_headers_resize_buckets():
+    """A paid key's reported limits lift the configured free-tier numbers (and can lower them)."""
+    limiter = RateLimiter({"groq": {"rpm": 30, "tpm": 6000}})
+    
+    limiter.observe_headers("groq", "paid", {
+        "x-ratelimit-limit-requests": "500000",
+        "x-ratelimit-limit-tokens": "300000",
+        "x-ratelimit-remaining-tokens": "299000",
+    }, model="m")
+    assert limiter.reserve("groq", "paid", 50000, model="m") == 0
+    assert limiter.reserve("groq", "paid", 50000, model="m") == 0
+    
+    limiter.observe_headers("openrouter", "k", {"x-ratelimit-limit": "2"}, model="m")
+    limiter.reserve("openrouter", "k", 1, model="m")
+    limiter.reserve("openrouter", "k", 1, model="m")
+    assert 29 < limiter.reserve("openrouter", "k", 1, model="m") <= 30
+
+
+def test_limits_are_per_model():
+    limiter = RateLimiter({"groq": {"rpm": 1, "tpm": 0}, "groq:big": {"rpm": 2, "tpm": 0}})
+    
+    assert limiter.reserve("groq", "k", 1, model="small") == 0
+    assert limiter.reserve("groq", "k", 1, model="small") > 0
+    
+    # Another model on the same key has its own (configured) buckets
+    assert limiter.reserve("groq", "k", 1, model="big") == 0
+    assert limiter.reserve("groq", "k", 1, model="big") == 0
+    assert limiter.headroom("groq", "k") == 0.0
+    
+    # A key-wide penalty (no model) blocks every model of the key
+    limiter.penalize("groq", "k2", Exception("429"), 60)
+    assert 59 < limiter.reserve("groq", "k2", 1, model="small") <= 60
+
+
+def test_unified_llm_skips_saturated_key(make_llm, monkeypatch):
+    """A key that cannot be served within the queue limit is never called."""
+    limiter = RateLimiter({"groq": {"rpm": 1, "tpm": 0}})
+    monkeypatch.setattr(limiter_module, "rate_limiter", limiter)
+    calls = []
+    
+    class CountingModel(FakeListChatModel):
+        def _call(self, *args, **kwargs):
+            calls.append(1)
+            return super()._call(*args, **kwargs)
+    
+    llm = make_llm(lambda config: CountingModel(responses=["ok"]), temperature=0.7, max_retries=1)
+    
+    assert llm.invoke([{"role": "user", "content": "hi"}]) == "ok"
+    
+    for config in llm.providers:
+        limiter.penalize(config.provider.value, config.api_key, Exception("429"), 3600)
+    
+    try:
+        llm.invoke([{"role": "user", "content": "hi again"}])
+        assert False, "expected LLMError"
+    except LLMError:
+        pass
+    
+    assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,138 @@
+"""
+Test Scout Agent
+Paginated, concurrent SerpAPI fan-out with streaming de-duplication against a mock transport (offline)
+"""
+import time
+import asyncio
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from src.core.config import settings
+from src.core.scout_cache import ScoutCache
+from src.core.job_urls import SeenJobs
+from src.automators.scout import ScoutAgent
+
+
+PAGE_DELAY = 0.2
+
+
+def lever_url(page: int, i: int) -> str:
+    return f"https://jobs.lever.co/acme/00000000-0000-0000-{page:04d}-{i:012d}"
+
+
+class FakeSerpAPI:
+    """Three pages of results per query; the same postings show up for every location."""
+    
+    def __init__(self, pages: int = 3, fail_on: str = ""):
+        self.pages = pages
+        self.fail_on = fail_on
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        params = parse_qs(urlparse(str(request.url)).query)
+        query, start, num = params["q"][0], int(params["start"][0]), int(params["num"][0])
+        self.requests.append((query, start))
+        
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(PAGE_DELAY)
+        self.in_flight -= 1
+        
+        if self.fail_on and self.fail_on in query:
+            return httpx.Response(500, json={"error": "boom"})
+        
+        page = start // num
+        if page >= self.pages:
+            return httpx.Response(200, json={"organic_results": []})
+        results = [
+            {"link": lever_url(page, i), "title": f"Job {page}-{i}"}
+            for i in range(num)
+        ] + [{"link": "https://www.linkedin.com/jobs/view/1"}]
+        body = {"organic_results": results}
+        if page + 1 < self.pages:
+            body["serpapi_pagination"] = {"next": "https://serpapi.com/search.json?start=..."}
+        return httpx.Response(200, json=body)
+
+
+def make_scout(server: FakeSerpAPI, seen_jobs: SeenJobs = None) -> ScoutAgent:
+    if seen_jobs is None:
+        seen_jobs = SeenJobs(path=None)
+        seen_jobs.warmed = True
+    return ScoutAgent(
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(server)),
+        cache=ScoutCache(path=None),
+        seen_jobs=seen_jobs
+    )
+
+
+@pytest.fixture(autouse=True)
+def scout_settings(monkeypatch):
+    """Small pages and a known concurrency cap for every test."""
+    monkeypatch.setattr(settings, "scout_page_size", 5)
+    monkeypatch.setattr(settings, "scout_max_results", 100)
+    monkeypatch.setattr(settings, "scout_concurrency", 10)
+
+
+def test_pages_until_last_page():
+    server = FakeSerpAPI(pages=3)
+    urls = asyncio.run(make_scout(server).run("Python Developer", "Remote"))
+    
+    assert len(urls) == 15
+    assert [start for _, start in server.requests] == [0, 5, 10]
+    assert "site:lever.co" in server.requests[0][0]
+
+
+def test_max_results_stops_paging():
+    server = FakeSerpAPI(pages=10)
+    urls = asyncio.run(make_scout(server).run("Python Developer", max_results=10))
+    
+    assert len(urls) == 10
+    assert len(server.requests) == 2
+
+
+def test_locations_fan_out_concurrently_and_merge():
+    server = FakeSerpAPI(pages=1)
+    locations = [f"City {i}" for i in range(9)]
+    
+    started = time.perf_counter()
+    urls = asyncio.run(make_scout(server).run("Python Developer", "Remote", locations=locations))
+    elapsed = time.perf_counter() - started
+    
+    assert len(server.requests) == 10
+    assert len(urls) == len(set(urls)) == 5  # Same postings in every location
+    assert elapsed < PAGE_DELAY * 3  # Roughly one search, not ten
+
+
+def test_concurrency_cap_and_failed_search(monkeypatch):
+    monkeypatch.setattr(settings, "scout_concurrency", 2)
+    server = FakeSerpAPI(pages=1, fail_on="Berlin")
+    urls = asyncio.run(make_scout(server).run(
+        "Python Developer", "Berlin", queries=["Backend Engineer"], locations=["Remote"]
+    ))
+    
+    assert server.max_in_flight == 2
+    assert len(server.requests) == 4
+    assert len(urls) == 5  # Remote searches still return
+
+
+def test_stream_yields_before_sweep_finishes():
+    async def scenario():
+        scout = make_scout(FakeSerpAPI(pages=3))
+        stream = scout.search_stream(["Python Developer"], ["Remote"])
+        started = time.perf_counter()
+        first = await stream.__anext__()
+        waited = time.perf_counter() - started
+        await stream.aclose()
+        return first, waited
+    
+    first, waited = asyncio.run(scenario())
+    assert first.startswith("https://jobs.lever.co/acme/00000000-0000-0000-0000-")
+    assert waited < PAGE_DELAY * 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
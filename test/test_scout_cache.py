@@ -0,0 +1,107 @@
+"""
+Test Scout Result Cache
+Normalized keys, TTL, depth coverage and ScoutAgent quota savings (offline)
+"""
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.core.config import settings
+from src.core.scout_cache import ScoutCache, normalize_text
+from src.core.job_urls import SeenJobs
+from src.automators.scout import ScoutAgent
+
+DOMAINS = ["site:greenhouse.io", "site:lever.co", "site:ashbyhq.com"]
+RESULTS = [{"link": "https://jobs.lever.co/acme/1", "title": "Engineer", "position": 1, "favicon": "x"}]
+
+
+class FakeSerpAPI:
+    """Two pages of Lever results per search; records every request."""
+    
+    def __init__(self):
+        self.requests = []
+    
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        start = int(request.url.params["start"])
+        self.requests.append((request.url.params["q"], start))
+        body = {"organic_results": [
+            {"link": f"https://jobs.lever.co/acme/00000000-0000-0000-0000-{start + i:012d}"} for i in range(5)
+        ]}
+        if start == 0:
+            body["serpapi_pagination"] = {"next": "..."}
+        return httpx.Response(200, json=body)
+
+
+def test_keys_are_normalized():
+    assert normalize_text("  Python   Developer!! ") == "python developer"
+    assert normalize_text("C++ / C#") == "c++ c#"
+    
+    key = ScoutCache.make_key("Python Developer", "NYC", DOMAINS)
+    assert ScoutCache.make_key(" python developer ", "nyc", list(reversed(DOMAINS))) == key
+    assert ScoutCache.make_key("Python Developer", "NYC", DOMAINS[:2]) != key
+    assert ScoutCache.make_key("Python Developer", "Boston", DOMAINS) != key
+
+
+def test_ttl_and_depth():
+    cache = ScoutCache(path=None, ttl_seconds=60)
+    cache.set("Python Developer", "NYC", DOMAINS, RESULTS, max_results=40, complete=False)
+    
+    cached = cache.get("python developer", "nyc", DOMAINS, max_results=20)
+    assert cached is not None and cached.results == [{"link": RESULTS[0]["link"], "title": "Engineer"}]
+    assert cache.get("Python Developer", "NYC", DOMAINS, max_results=100) is None  # Not paged that deep
+    
+    cache.set("Rare Role", "NYC", DOMAINS, RESULTS, max_results=20, complete=True)
+    assert cache.get("Rare Role", "NYC", DOMAINS, max_results=100) is not None  # Already exhausted
+    
+    cache.ttl_seconds = -1
+    cache.set("Python Developer", "NYC", DOMAINS, RESULTS, max_results=40, complete=False)
+    assert cache.get("Python Developer", "NYC", DOMAINS, max_results=20) is None
+
+
+def test_disk_entries_survive_restarts():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "scout.sqlite")
+        ScoutCache(path=path).set("Python Developer", "NYC", DOMAINS, RESULTS, 20, False)
+        
+        cached = ScoutCache(path=path).get("Python Developer", "NYC", DOMAINS, 20)
+        assert cached is not None and cached.results[0]["link"] == RESULTS[0]["link"]
+        assert cached.fetched_at <= time.time()
+
+
+def test_repeat_and_overlapping_sweeps_hit_the_cache(monkeypatch):
+    monkeypatch.setattr(settings, "scout_page_size", 5)
+    monkeypatch.setattr(settings, "scout_max_results", 100)
+    
+    cache = ScoutCache(path=None)
+    seen_jobs = SeenJobs(path=None)
+    seen_jobs.warmed = True
+    server = FakeSerpAPI()
+    scout = ScoutAgent(
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(server)),
+        cache=cache,
+        seen_jobs=seen_jobs
+    )
+    
+    first = asyncio.run(scout.run("Python Developer", "NYC"))
+    assert len(server.requests) == 2
+    
+    # Same search, different spelling: no new requests
+    assert asyncio.run(scout.run("python  developer", "nyc")) == first
+    assert len(server.requests) == 2
+    
+    # Overlapping sweep only queries the new location
+    asyncio.run(scout.run("Python Developer", "NYC", locations=["Boston"]))
+    assert len(server.requests) == 4
+    
+    # An explicit refresh spends quota again
+    asyncio.run(scout.run("Python Developer", "NYC", refresh=True))
+    assert len(server.requests) == 6
+    assert cache.stats()["hits"] == 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
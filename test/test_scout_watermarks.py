@@ -0,0 +1,129 @@
+"""
+Test Scout Watermarks
+Saved searches only re-surface new (or changed) postings across runs (offline)
+"""
+import asyncio
+import tempfile
+from pathlib import Path
+
+import httpx
+
+from src.core.scout_cache import ScoutCache
+from src.core.job_urls import SeenJobs
+from src.core.scout_watermarks import SearchWatermarks, search_key, fingerprint
+from src.automators.scout import ScoutAgent
+from src.automators.ats_boards import ATSBoardScout, BoardStore
+
+
+def lever(n: int) -> str:
+    return f"https://jobs.lever.co/acme/00000000-0000-0000-0000-{n:012d}"
+
+
+def test_search_keys_ignore_order_and_spelling():
+    key = search_key("serpapi", ["Python Developer", "Backend Engineer"], ["NYC"])
+    assert search_key("serpapi", ["backend engineer", "python  developer"], ["nyc"]) == key
+    assert search_key("serpapi", ["Python Developer"], ["NYC"]) != key
+    assert search_key("boards", ["Python Developer", "Backend Engineer"], ["NYC"]) != key
+
+
+def test_only_new_and_changed_postings_come_back():
+    with tempfile.TemporaryDirectory() as tmp:
+        marks = SearchWatermarks(path=str(Path(tmp) / "marks.sqlite"))
+        first = {lever(1): "a", lever(2): "b"}
+        assert marks.select("daily", first) == [lever(1), lever(2)]
+        assert marks.last_run("daily") is None  # Selecting alone moves nothing
+        marks.commit("daily", [lever(1), lever(2)])
+        assert marks.last_run("daily") is not None
+        
+        # Tracking params still match the stored posting
+        second = {lever(1) + "?lever-source=x": "a", lever(2): "b2", lever(3): "c"}
+        reopened = SearchWatermarks(path=str(Path(tmp) / "marks.sqlite"))
+        assert reopened.select("daily", second) == [lever(3)]
+        reopened.commit("daily", [lever(3)])
+        
+        third = {lever(2): "b3", lever(3): "c"}
+        assert reopened.select("daily", third, resurface_changed=True) == [lever(2)]
+        
+        # Other saved searches keep their own watermark
+        assert reopened.select("weekly", third) == [lever(2), lever(3)]
+        assert reopened.last_run("never") is None
+
+
+def test_postings_not_committed_come_back():
+    marks = SearchWatermarks(path=None)
+    postings = {lever(1): "a", lever(2): "b", lever(3): "c"}
+    
+    # The run stopped (budget, crash) after processing the first posting
+    assert marks.select("daily", postings) == [lever(1), lever(2), lever(3)]
+    marks.commit("daily", [lever(1)])
+    
+    assert marks.select("daily", postings) == [lever(2), lever(3)]
+    marks.commit("daily", [lever(4)])  # Never selected: ignored
+    assert marks.select("daily", {lever(4): "d"}) == [lever(4)]
+
+
+def test_daily_scout_run_returns_only_new_postings():
+    day = {"n": 1}
+    
+    def serpapi(request: httpx.Request) -> httpx.Response:
+        # Day 1: postings 1-3; day 2: posting 3's snippet changed and posting 4 appeared
+        results = [{"link": lever(i), "title": f"Job {i}", "snippet": "Python"} for i in (1, 2, 3)]
+        if day["n"] == 2:
+            results[2]["snippet"] = "Python, now hybrid"
+            results.append({"link": lever(4), "title": "Job 4", "snippet": "Python"})
+        return httpx.Response(200, json={"organic_results": results})
+    
+    seen = SeenJobs(path=None)
+    seen.warmed = True
+    marks = SearchWatermarks(path=None)
+    
+    def run(**kwargs):
+        scout = ScoutAgent(
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(serpapi)),
+            cache=ScoutCache(path=None), seen_jobs=seen, watermarks=marks
+        )
+        urls = asyncio.run(scout.run("Python Developer", "Remote", since_last_run=True, **kwargs))
+        scout.commit_watermark(urls)
+        return urls
+    
+    assert run() == [lever(1), lever(2), lever(3)]
+    day["n"] = 2
+    assert run() == [lever(4)]
+    
+    marks = SearchWatermarks(path=None)
+    day["n"] = 1
+    run()
+    day["n"] = 2
+    assert run(resurface_changed=True) == [lever(3), lever(4)]
+
+
+def test_board_postings_use_the_same_watermarks():
+    board = {"jobs": [{"id": 1, "title": "Python Developer", "content": "Python"}]}
+    
+    def boards(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=board)
+    
+    marks = SearchWatermarks(path=None)
+    
+    def run():
+        scout = ATSBoardScout(
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(boards)),
+            store=BoardStore(path=None), watermarks=marks
+        )
+        postings = asyncio.run(scout.run(["greenhouse:acme"], since_last_run=True))
+        scout.commit_watermark([p.url for p in postings])
+        return [p.posting_id for p in postings]
+    
+    assert run() == ["1"]
+    board["jobs"].append({"id": 2, "title": "Go Developer", "content": "Go"})
+    assert run() == ["2"]
+    assert fingerprint("a", "b") != fingerprint("ab", "")
+
+
+if __name__ == "__main__":
+    test_search_keys_ignore_order_and_spelling()
+    test_only_new_and_changed_postings_come_back()
+    test_postings_not_committed_come_back()
+    test_daily_scout_run_returns_only_new_postings()
+    test_board_postings_use_the_same_watermarks()
+    print("✅ All scout watermark tests passed!")
@@ -0,0 +1,99 @@
+"""
+Test Single-Flight Coalescing
+Identical concurrent LLM requests share one provider call (offline)
+"""
+import time
+import asyncio
+import threading
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core.single_flight import SingleFlight
+from src.core.llm_provider import UnifiedLLM
+
+
+CULTURE_PROMPT = [{"role": "user", "content": "Describe the culture at Acme Corp"}]
+
+
+@pytest.fixture
+def counting_llm(make_llm):
+    """Factory for a slow LLM that appends to `calls` on every provider call."""
+    def make(calls: list) -> UnifiedLLM:
+        class SlowCountingModel(FakeListChatModel):
+            async def _agenerate(self, *args, **kwargs):
+                # The async path ends up in _call, which does the counting
+                await asyncio.sleep(0.1)
+                return await super()._agenerate(*args, **kwargs)
+            
+            def _call(self, *args, **kwargs):
+                calls.append(1)
+                time.sleep(0.1)
+                return super()._call(*args, **kwargs)
+        
+        # High temperature keeps the response cache out of the picture
+        return make_llm(SlowCountingModel(responses=["Collaborative and fast-paced"]), temperature=0.9)
+    return make
+
+
+def test_async_duplicates_share_one_call(counting_llm):
+    calls = []
+    llm = counting_llm(calls)
+    
+    async def run():
+        return await asyncio.gather(*[llm.ainvoke(CULTURE_PROMPT) for _ in range(5)])
+    
+    results = asyncio.run(run())
+    
+    assert results == ["Collaborative and fast-paced"] * 5
+    assert len(calls) == 1
+
+
+def test_different_requests_are_not_coalesced(counting_llm):
+    calls = []
+    llm = counting_llm(calls)
+    other = [{"role": "user", "content": "Describe the culture at Globex"}]
+    
+    async def run():
+        return await asyncio.gather(llm.ainvoke(CULTURE_PROMPT), llm.ainvoke(other))
+    
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_sync_threads_share_one_call(counting_llm):
+    calls = []
+    llm = counting_llm(calls)
+    results = []
+    
+    threads = [threading.Thread(target=lambda: results.append(llm.invoke(CULTURE_PROMPT))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert results == ["Collaborative and fast-paced"] * 4
+    assert len(calls) == 1
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+    
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+    
+    async def run():
+        return await asyncio.gather(
+            flight.ado("key", failing),
+            flight.ado("key", failing),
+            return_exceptions=True
+        )
+    
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats() == {"executed": 1, "coalesced": 1}
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
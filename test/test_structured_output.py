@@ -0,0 +1,98 @@
+"""
+Test Structured Output
+Balanced-brace JSON extraction, schema validation and single repair requests (offline)
+"""
+import asyncio
+
+from src.core.structured_output import (
+    extract_json, parse_structured, parse_or_repair, aparse_or_repair, StructuredOutputError
+)
+from src.models.job import JobAnalysis
+
+
+ANALYSIS = '{"role": "Backend Engineer", "company": "Acme", "match_score": 82, "tech_stack": ["Python"]}'
+
+
+class ScriptedLLM:
+    """Returns canned repair responses and records the requests."""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+    
+    def invoke(self, messages, use_cache=None, caller=None):
+        self.requests.append(messages)
+        return self.responses.pop(0)
+    
+    async def ainvoke(self, messages, use_cache=None, caller=None):
+        return self.invoke(messages, use_cache, caller)
+
+
+def test_extracts_json_around_prose_and_fences():
+    text = f"Sure! Here is the analysis:\n```json\n{ANALYSIS}\n```\nLet me know if you need more."
+    assert extract_json(text)["company"] == "Acme"
+    
+    # The word "json" and braces inside values survive
+    tricky = 'Result: {"reasoning": "Uses json {heavily} and }braces{", "n": [1, {"a": 2}]} done'
+    assert extract_json(tricky) == {"reasoning": "Uses json {heavily} and }braces{", "n": [1, {"a": 2}]}
+
+
+def test_skips_unparseable_candidates():
+    text = 'Scores {like this} vary. {"match_score": 70}'
+    assert extract_json(text) == {"match_score": 70}
+    
+    try:
+        extract_json("no json here")
+        assert False, "expected StructuredOutputError"
+    except StructuredOutputError as e:
+        assert e.raw == "no json here"
+
+
+def test_schema_validation():
+    analysis = parse_structured(ANALYSIS, JobAnalysis)
+    assert isinstance(analysis, JobAnalysis)
+    assert analysis.match_score == 82
+    
+    try:
+        parse_structured('{"role": "Engineer"}', JobAnalysis)
+        assert False, "expected StructuredOutputError"
+    except StructuredOutputError as e:
+        assert "validation" in str(e)
+
+
+def test_valid_output_needs_no_repair():
+    llm = ScriptedLLM()
+    assert parse_or_repair(llm, ANALYSIS, JobAnalysis).company == "Acme"
+    assert llm.requests == []
+
+
+def test_one_short_repair_request():
+    broken = '{"role": "Backend Engineer", "company": "Acme", "match_score": 82,'
+    llm = ScriptedLLM(ANALYSIS)
+    
+    analysis = asyncio.run(aparse_or_repair(llm, broken, JobAnalysis))
+    
+    assert analysis.role == "Backend Engineer"
+    assert len(llm.requests) == 1
+    repair_prompt = llm.requests[0][-1]["content"]
+    assert broken in repair_prompt and "match_score" in repair_prompt
+
+
+def test_failed_repair_raises():
+    llm = ScriptedLLM("still not json")
+    try:
+        parse_or_repair(llm, "garbage", JobAnalysis)
+        assert False, "expected StructuredOutputError"
+    except StructuredOutputError:
+        pass
+    assert len(llm.requests) == 1
+
+
+if __name__ == "__main__":
+    test_extracts_json_around_prose_and_fences()
+    test_skips_unparseable_candidates()
+    test_schema_validation()
+    test_valid_output_needs_no_repair()
+    test_one_short_repair_request()
+    test_failed_repair_raises()
+    print("✅ All structured output tests passed!")